@@ -1,53 +1,65 @@
+import secrets
 from flask import Flask
 from flask_cors import CORS
 from app.models import db
-import os
+from app.view_counter import view_counter
+from app.cache import response_cache
+from app.hashing import password_hasher
+from app.pubsub import change_feed
+from app.trending import trending
+from app.recommendations import recommender
+from app.instrumentation import instrumentation
+from app.assets import assets
+from app.media import media
+from app.jobs import jobs
+from app.mail import mailer
+from app.digests import digests
+from app import search  # registers the index sync hooks on Event/Society
+from app import tasks  # registers the background job functions
+from app.config import Config, engine_options
+from app.database import configure_engine
 
-def create_app():
+def _check_secret_key(app):
+    """Bearer tokens are signed with SECRET_KEY, so a missing one must never fall back to a known value"""
+    if app.config.get('SECRET_KEY'):
+        return
+    if not (app.debug or app.testing):
+        raise RuntimeError('SECRET_KEY is not set; export a long random value before starting the app')
+    app.config['SECRET_KEY'] = secrets.token_hex(32)
+    app.logger.warning('SECRET_KEY is not set; using a random key, so issued tokens stop working on restart')
+
+def create_app(config=None):
     app = Flask(__name__)
     
-    # Configuration
-    app.config['SECRET_KEY'] = 'your-secret-key-here'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///hackathon.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Configuration (environment-driven, see config.py; config overrides it, e.g. in tests)
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    _check_secret_key(app)
     
     # Initialize extensions
     db.init_app(app)
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
-    
-    # Create tables and default admin
-    with app.app_context():
-        db.create_all()
-        
-        # Create default admin if not exists
-        try:
-            from app.models import User
-            admin = User.query.filter_by(email='admin@unievent.com').first()
-            
-            if not admin:
-                admin = User(
-                    username='admin',
-                    email='admin@unievent.com',
-                    first_name='Admin',
-                    last_name='User',
-                    role='admin'
-                )
-                admin.set_password('admin123')
-                db.session.add(admin)
-                db.session.commit()
-                print("✅ Default admin created!")
-                print("📧 Email: admin@unievent.com")
-                print("🔑 Password: admin123")
-            else:
-                print("✅ Admin already exists")
-        except Exception as e:
-            print(f"Note: {e}")
-            db.session.rollback()
-        
-        print("Database ready!")
+    configure_engine(app)
+    instrumentation.init_app(app)
+    view_counter.init_app(app)
+    response_cache.init_app(app)
+    password_hasher.init_app(app)
+    change_feed.init_app(app)
+    trending.init_app(app)
+    recommender.init_app(app)
+    assets.init_app(app)
+    media.init_app(app)
+    jobs.init_app(app)
+    mailer.init_app(app)
+    digests.init_app(app)
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=['X-Next-Cursor'])
     
     # Register blueprints
     from app.routes import main
     app.register_blueprint(main)
     
+    from app.commands import register_commands
+    register_commands(app)
+    
     return app
\ No newline at end of file
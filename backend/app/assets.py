@@ -0,0 +1,198 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from flask import Response, abort, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'frontend')
+
+# Directories whose files get content-hashed names; HTML pages keep their URLs
+ASSET_DIRS = ('style', 'script')
+
+# src="./script/app.js", href="/style/styles.css", ...
+_ASSET_REFERENCE = re.compile(r'''(?P<attr>(?:src|href)=["'])(?:\./|/)?(?P<path>(?:style|script)/[^"'?#]+)''')
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'no-cache'
+
+# Below this, compression headers cost more than they save
+MIN_COMPRESS_SIZE = 512
+
+
+class Asset:
+    """One file held in memory with its precompressed variants"""
+
+    def __init__(self, path, body, fingerprint):
+        self.path = path
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.fingerprint = fingerprint
+        self.variants = {'identity': body}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants['gzip'] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants['br'] = compressed
+
+    @property
+    def hashed_path(self):
+        root, ext = os.path.splitext(self.path)
+        return f'{root}.{self.fingerprint}{ext}'
+
+
+def _fingerprint(body):
+    return hashlib.sha256(body).hexdigest()[:12]
+
+
+class AssetPipeline:
+    """Fingerprinted, precompressed frontend files served from memory
+
+    On first use every file under frontend/style and frontend/script is read
+    once, given a content-hashed name (styles.<hash>.css) and compressed
+    with gzip, plus brotli when the brotli package is installed. HTML pages
+    are rewritten to reference the hashed names. Hashed URLs are served
+    with an immutable one-year Cache-Control; pages and unhashed asset URLs
+    revalidate with their ETag. ASSETS_AUTO_RELOAD rebuilds when a file
+    changes, for development. `flask build-assets` writes the same files to
+    disk for a web server to serve directly.
+    """
+
+    def __init__(self, app=None):
+        self.frontend_dir = DEFAULT_FRONTEND_DIR
+        self.auto_reload = False
+        self._assets = {}
+        self._pages = {}
+        self._urls = {}
+        self._built_mtime = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('FRONTEND_DIR', DEFAULT_FRONTEND_DIR)
+        app.config.setdefault('ASSETS_AUTO_RELOAD', app.debug)
+
+        self.frontend_dir = app.config['FRONTEND_DIR']
+        self.auto_reload = app.config['ASSETS_AUTO_RELOAD']
+        self._built_mtime = None
+        app.extensions['assets'] = self
+
+    def _source_files(self):
+        for name in sorted(os.listdir(self.frontend_dir)):
+            if name.endswith('.html'):
+                yield name
+        for directory in ASSET_DIRS:
+            root = os.path.join(self.frontend_dir, directory)
+            if not os.path.isdir(root):
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for filename in sorted(filenames):
+                    full = os.path.join(dirpath, filename)
+                    yield os.path.relpath(full, self.frontend_dir).replace(os.sep, '/')
+
+    def _latest_mtime(self):
+        return max(
+            (os.stat(os.path.join(self.frontend_dir, path)).st_mtime for path in self._source_files()),
+            default=0
+        )
+
+    def build(self):
+        """Read, fingerprint and compress every file; returns (assets by URL path, pages by name, hashed URLs)"""
+        assets, urls = {}, {}
+        pages = []
+        for path in self._source_files():
+            with open(os.path.join(self.frontend_dir, path), 'rb') as f:
+                body = f.read()
+            if path.endswith('.html'):
+                pages.append((path, body))
+                continue
+            asset = Asset(path, body, _fingerprint(body))
+            assets[asset.hashed_path] = asset
+            assets[path] = asset
+            urls[path] = '/' + asset.hashed_path
+
+        def rewrite(match):
+            url = urls.get(match.group('path'))
+            return match.group('attr') + url if url else match.group(0)
+
+        rendered = {}
+        for path, body in pages:
+            html = _ASSET_REFERENCE.sub(rewrite, body.decode('utf-8')).encode('utf-8')
+            rendered[path] = Asset(path, html, _fingerprint(html))
+        return assets, rendered, urls
+
+    def _ensure_built(self):
+        if self._built_mtime is not None and not self.auto_reload:
+            return
+        with self._lock:
+            mtime = self._latest_mtime() if self.auto_reload else 0
+            if self._built_mtime is None or (self.auto_reload and mtime > self._built_mtime):
+                self._assets, self._pages, self._urls = self.build()
+                self._built_mtime = mtime
+
+    def url_for(self, path):
+        """Hashed URL for an asset path such as 'script/app.js'"""
+        self._ensure_built()
+        return self._urls.get(path, '/' + path)
+
+    def _respond(self, asset, cache_control):
+        accepted = request.accept_encodings
+        encoding = 'identity'
+        for candidate in ('br', 'gzip'):
+            if candidate in asset.variants and accepted[candidate]:
+                encoding = candidate
+                break
+
+        response = Response(asset.variants[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.headers['Cache-Control'] = cache_control
+        response.set_etag(asset.fingerprint if encoding == 'identity' else f'{asset.fingerprint}-{encoding}')
+        return response.make_conditional(request)
+
+    def send_page(self, name):
+        self._ensure_built()
+        page = self._pages.get(name)
+        if page is None:
+            abort(404)
+        return self._respond(page, REVALIDATE)
+
+    def send_asset(self, directory, filename):
+        self._ensure_built()
+        path = f'{directory}/{filename}'
+        asset = self._assets.get(path)
+        if asset is None:
+            abort(404)
+        return self._respond(asset, IMMUTABLE if path == asset.hashed_path else REVALIDATE)
+
+    def write(self, out_dir):
+        """Write hashed files, their .gz/.br variants and rewritten pages for a web server; returns file count"""
+        assets, pages, _ = self.build()
+        written = 0
+        for asset in {id(asset): asset for asset in assets.values()}.values():
+            written += self._write_variants(out_dir, asset.hashed_path, asset)
+        for page in pages.values():
+            written += self._write_variants(out_dir, page.path, page)
+        return written
+
+    def _write_variants(self, out_dir, path, asset):
+        target = os.path.join(out_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        suffixes = {'identity': '', 'gzip': '.gz', 'br': '.br'}
+        for encoding, body in asset.variants.items():
+            with open(target + suffixes[encoding], 'wb') as f:
+                f.write(body)
+        return len(asset.variants)
+
+
+assets = AssetPipeline()
@@ -0,0 +1,209 @@
+import csv
+import io
+import json
+from datetime import datetime, time
+from flask import Response, current_app, stream_with_context
+from app.models import db, Society, Event
+from app import search
+from app.jobs import jobs
+
+IMPORT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+# Columns accepted on import and written on export, in CSV header order
+EVENT_FIELDS = [
+    'society_id', 'title', 'description', 'short_description', 'category',
+    'event_date', 'start_time', 'end_time', 'venue', 'poster', 'google_form_link'
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+class ImportReport:
+    def __init__(self):
+        self.imported = 0
+        self.errors = []
+        self.error_count = 0
+
+    def error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row_number, 'error': message})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'error_count': self.error_count,
+            'errors': self.errors
+        }
+
+
+def read_rows(stream, fmt):
+    """Yield (row_number, dict) from a CSV or NDJSON text stream without buffering it"""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if fmt == 'csv':
+        for row_number, row in enumerate(csv.DictReader(text), start=1):
+            yield row_number, row
+        return
+    for row_number, line in enumerate(text, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield row_number, None
+            continue
+        yield row_number, row if isinstance(row, dict) else None
+
+
+def _parse_date(value):
+    value = str(value).strip()
+    if len(value) == 10:
+        value += 'T00:00:00'
+    return datetime.fromisoformat(value)
+
+
+def _parse_time(value):
+    return time.fromisoformat(str(value).strip()) if value else None
+
+
+def _text(row, field):
+    """A text column's value as a string; NDJSON may carry numbers, but not objects or lists"""
+    value = row.get(field)
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        raise ValueError(f'{field} must be text')
+    return str(value)
+
+
+def validate_row(row, society_ids, forced_society_id=None):
+    """Turn one input row into Event insert values, raising ValueError with a readable message"""
+    if row is None:
+        raise ValueError('Malformed row')
+
+    title = _text(row, 'title').strip()
+    if not title:
+        raise ValueError('title is required')
+    if not row.get('event_date'):
+        raise ValueError('event_date is required')
+
+    if forced_society_id is not None:
+        society_id = forced_society_id
+    else:
+        try:
+            society_id = int(row.get('society_id'))
+        except (TypeError, ValueError):
+            raise ValueError('society_id must be an integer')
+        if society_id not in society_ids:
+            raise ValueError(f'Society {society_id} does not exist')
+
+    try:
+        event_date = _parse_date(row['event_date'])
+    except ValueError:
+        raise ValueError(f"Invalid event_date {row['event_date']!r}")
+    try:
+        start_time = _parse_time(row.get('start_time'))
+        end_time = _parse_time(row.get('end_time'))
+    except ValueError:
+        raise ValueError('Invalid start_time or end_time')
+
+    now = datetime.utcnow()
+    return {
+        'society_id': society_id,
+        'title': title[:200],
+        'description': _text(row, 'description') or title,
+        'short_description': _text(row, 'short_description'),
+        'category': _text(row, 'category'),
+        'event_date': event_date,
+        'start_time': start_time,
+        'end_time': end_time,
+        'venue': _text(row, 'venue'),
+        'poster': _text(row, 'poster') or None,
+        'google_form_link': _text(row, 'google_form_link'),
+        'created_at': now,
+        'updated_at': now
+    }
+
+
+def _insert_chunk(values):
+    """executemany INSERT of one chunk, then index the new rows for search and queue their digest fan-out"""
+    ids = db.session.execute(db.insert(Event).returning(Event.id), values).scalars().all()
+    search.index_events(db.session.connection(), ids)
+    if ids:
+        jobs.enqueue('fan_out_events', {'event_ids': ids})
+    return len(ids)
+
+
+def import_events(rows, forced_society_id=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """Validate and insert rows in chunks inside the caller's transaction
+
+    Invalid rows are reported and skipped; the caller commits or rolls back.
+    Returns (report, touched society ids).
+    """
+    report = ImportReport()
+    society_ids = set() if forced_society_id is not None else {
+        row[0] for row in db.session.execute(db.select(Society.id))
+    }
+    touched = set()
+    chunk = []
+
+    for row_number, row in rows:
+        try:
+            values = validate_row(row, society_ids, forced_society_id)
+        except ValueError as e:
+            report.error(row_number, str(e))
+            continue
+        chunk.append(values)
+        touched.add(values['society_id'])
+        if len(chunk) >= chunk_size:
+            report.imported += _insert_chunk(chunk)
+            chunk = []
+
+    if chunk:
+        report.imported += _insert_chunk(chunk)
+    return report, touched
+
+
+def _format_value(value):
+    if isinstance(value, (datetime, time)):
+        return value.isoformat()
+    return value
+
+
+def export_events(fmt, society_id=None, batch_size=IMPORT_CHUNK_SIZE):
+    """Stream events as CSV or NDJSON in the same shape import_events accepts"""
+    columns = [getattr(Event, field) for field in EVENT_FIELDS]
+    stmt = db.select(Event.id, *columns).order_by(Event.id)
+    if society_id is not None:
+        stmt = stmt.where(Event.society_id == society_id)
+    stmt = stmt.execution_options(yield_per=batch_size)
+    dumps = current_app.json.dumps
+    header = ['id'] + EVENT_FIELDS
+
+    def generate():
+        result = db.session.execute(stmt)
+        if fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(header)
+            for partition in result.partitions():
+                writer.writerows([_format_value(v) for v in row] for row in partition)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+            return
+        for partition in result.partitions():
+            yield ''.join(
+                dumps(dict(zip(header, (_format_value(v) for v in row)))) + '\n'
+                for row in partition
+            )
+
+    response = Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=events.{fmt}'
+    return response
@@ -0,0 +1,175 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, make_response
+
+
+class MemoryBackend:
+    """Per-process LRU store with a TTL on every entry"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def generation(self, key):
+        return self.get(key) or 0
+
+    def incr(self, key):
+        with self._lock:
+            value, expires_at = self._data.get(key, (0, None))
+            self._data[key] = (value + 1, expires_at)
+            self._data.move_to_end(key)
+            return value + 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisBackend:
+    """Shared store so every worker process sees the same entries and invalidations"""
+
+    def __init__(self, url, prefix='unievent:', client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND='redis' requires the redis package")
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self.prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def generation(self, key):
+        # Written by INCR, so stored as a plain integer rather than a pickle
+        raw = self._client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    def set(self, key, value, ttl=None):
+        self._client.set(self.prefix + key, pickle.dumps(value), ex=int(ttl) if ttl else None)
+
+    def incr(self, key):
+        # Generations are stored as plain integers so INCR stays atomic across workers; read them with generation()
+        return self._client.incr(self.prefix + key)
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + '*'):
+            self._client.delete(key)
+
+
+class ResponseCache:
+    """Caches GET responses keyed on path + query string, invalidated by tags
+
+    Every cached entry depends on a set of tags such as 'events' or
+    'event:42'. A tag's generation number is part of the cache key, so
+    bumping it from a write route makes every dependent entry unreachable.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = 60
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'memory')
+        app.config.setdefault('CACHE_DEFAULT_TTL', 60)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 1024)
+        app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+        backend = app.config['CACHE_BACKEND']
+        if backend == 'redis':
+            self.backend = RedisBackend(app.config['CACHE_REDIS_URL'])
+        elif backend == 'memory':
+            self.backend = MemoryBackend(app.config['CACHE_MAX_ENTRIES'])
+        else:
+            self.backend = None
+        self.default_ttl = app.config['CACHE_DEFAULT_TTL']
+        app.extensions['response_cache'] = self
+
+    def _generation(self, tag):
+        return self.backend.generation('tag:' + tag)
+
+    def invalidate(self, *tags):
+        """Drop every cached response that depends on any of the given tags"""
+        if self.backend is None:
+            return
+        for tag in tags:
+            self.backend.incr('tag:' + tag)
+
+    def _key(self, tags):
+        args = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+        generations = ','.join(f'{tag}@{self._generation(tag)}' for tag in tags)
+        return f'resp:{request.path}?{args}|{generations}'
+
+    def cached(self, *tags, ttl=None):
+        """Decorator for GET views; tags may use the view's kwargs, e.g. 'event:{event_id}'
+
+        A tag may also be a callable taking the view's kwargs and returning a
+        tag, or None when this request does not depend on it.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return view(*args, **kwargs)
+
+                resolved = [tag(**kwargs) if callable(tag) else tag.format(**kwargs) for tag in tags]
+                resolved = [tag for tag in resolved if tag is not None]
+                key = self._key(resolved)
+                entry = self.backend.get(key)
+
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    body = response.get_data()
+                    entry = {
+                        'body': body,
+                        'mimetype': response.mimetype,
+                        'headers': [(k, v) for k, v in response.headers.items() if k.startswith('X-')],
+                        'etag': hashlib.sha1(body).hexdigest(),
+                        'last_modified': time.time()
+                    }
+                    self.backend.set(key, entry, ttl or self.default_ttl)
+
+                response = make_response(entry['body'], 200)
+                response.mimetype = entry['mimetype']
+                for name, value in entry['headers']:
+                    response.headers[name] = value
+                response.set_etag(entry['etag'])
+                response.last_modified = entry['last_modified']
+                response.cache_control.no_cache = True
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
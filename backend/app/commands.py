@@ -0,0 +1,217 @@
+import click
+from flask.cli import with_appcontext
+from app.models import db, User, Society, Event
+from app import search
+from app.cache import response_cache
+from app.trending import trending
+from app.recommendations import recommender
+from app.assets import assets
+from app.media import media
+from app.jobs import jobs
+from app.digests import digests
+
+DEFAULT_ADMIN = {
+    'username': 'admin',
+    'email': 'admin@unievent.com',
+    'password': 'admin123'
+}
+
+
+def upgrade_schema():
+    """Bring a database created by an older version up to the models; returns the 'table.column' names added
+
+    create_all() only creates missing tables. Columns added to a model
+    since are appended with ALTER TABLE ... ADD COLUMN, their scalar
+    default becoming the SQL default of the existing rows, and indexes
+    that are missing or cover other columns are (re)built.
+    """
+    inspector = db.inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    db.create_all()
+    added = []
+    with db.engine.begin() as conn:
+        quote = conn.dialect.identifier_preparer.quote
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing:
+                continue
+            present = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                ddl = f'ALTER TABLE {quote(table.name)} ADD COLUMN {quote(column.name)} {column.type.compile(conn.dialect)}'
+                if column.default is not None and column.default.is_scalar:
+                    default = db.literal(column.default.arg, column.type).compile(
+                        dialect=conn.dialect, compile_kwargs={'literal_binds': True}
+                    )
+                    ddl += f'{"" if column.nullable else " NOT NULL"} DEFAULT {default}'
+                elif not column.nullable:
+                    raise RuntimeError(f'Cannot add {table.name}.{column.name}: NOT NULL without a default')
+                conn.execute(db.text(ddl))
+                added.append(f'{table.name}.{column.name}')
+
+            indexes = {index['name']: index['column_names'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                columns = [column.name for column in index.columns]
+                if indexes.get(index.name) == columns:
+                    continue
+                if index.name in indexes:
+                    index.drop(conn)
+                index.create(conn)
+    return added
+
+
+def init_db():
+    """Create all tables and the search index, upgrading older tables in place; safe to run repeatedly
+
+    Returns the columns that had to be added. Denormalized counters are
+    backfilled when any were, since new counter columns start at 0. Also
+    queues the first refresh_trending and refresh_recommendations jobs,
+    which then reschedule themselves.
+    """
+    added = upgrade_schema()
+    search.create_index()
+    if added:
+        Event.repair_counters()
+        Society.repair_member_counts()
+    trending.schedule()
+    recommender.schedule()
+    db.session.commit()
+    return added
+
+
+def seed_admin(username, email, password):
+    """Create the admin account if it does not exist, returning True when created"""
+    if User.query.filter_by(email=email).first():
+        return False
+    admin = User(
+        username=username,
+        email=email,
+        first_name='Admin',
+        last_name='User',
+        role='admin'
+    )
+    admin.set_password(password)
+    db.session.add(admin)
+    db.session.commit()
+    return True
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create database tables and the search index, adding columns missing from older databases"""
+    for column in init_db():
+        click.echo(f'Added column {column}')
+    click.echo('Database ready!')
+
+
+@click.command('seed-admin')
+@click.option('--username', default=DEFAULT_ADMIN['username'], envvar='ADMIN_USERNAME')
+@click.option('--email', default=DEFAULT_ADMIN['email'], envvar='ADMIN_EMAIL')
+@click.option('--password', default=DEFAULT_ADMIN['password'], envvar='ADMIN_PASSWORD')
+@with_appcontext
+def seed_admin_command(username, email, password):
+    """Create the default admin account if missing"""
+    if seed_admin(username, email, password):
+        click.echo('✅ Default admin created!')
+        click.echo(f'📧 Email: {email}')
+    else:
+        click.echo('✅ Admin already exists')
+
+
+@click.command('repair-counters')
+@with_appcontext
+def repair_counters_command():
+    """Recompute denormalized like/comment counters on events and member counts on societies"""
+    for column in upgrade_schema():
+        click.echo(f'Added column {column}')
+    updated = Event.repair_counters()
+    societies = Society.repair_member_counts()
+    db.session.commit()
+    click.echo(f'Repaired counters on {updated} events and {societies} societies')
+
+
+@click.command('rebuild-search-index')
+@with_appcontext
+def rebuild_search_index_command():
+    """Rebuild the full-text event search index from scratch"""
+    indexed = search.rebuild_index()
+    db.session.commit()
+    response_cache.invalidate('search')
+    click.echo(f'Indexed {indexed} events')
+
+
+@click.command('refresh-trending')
+@with_appcontext
+def refresh_trending_command():
+    """Fold recent likes, comments and views into the trending ranking"""
+    ranked = trending.refresh()
+    db.session.commit()
+    response_cache.invalidate('trending')
+    click.echo(f'Trending ranking holds {ranked} events')
+
+
+@click.command('refresh-recommendations')
+@with_appcontext
+def refresh_recommendations_command():
+    """Recompute "also liked" neighbors of every liked event"""
+    changed = recommender.refresh()
+    db.session.commit()
+    click.echo(f'Recomputed neighbors of {changed} events')
+
+
+@click.command('build-assets')
+@click.option('--out', 'out_dir', required=True, type=click.Path(file_okay=False), help='Directory to write into')
+@with_appcontext
+def build_assets_command(out_dir):
+    """Write fingerprinted, precompressed frontend files for a web server to serve"""
+    written = assets.write(out_dir)
+    click.echo(f'Wrote {written} files to {out_dir}')
+
+
+@click.command('render-thumbnails')
+@with_appcontext
+def render_thumbnails_command():
+    """Render missing WebP variants of stored images, e.g. after installing Pillow"""
+    rendered = 0
+    for image_id in media.stored_ids():
+        if media.missing_variants(image_id):
+            if not media.render_variants(image_id):
+                raise click.ClickException('Pillow is not installed')
+            rendered += 1
+    click.echo(f'Rendered variants of {rendered} images')
+
+
+@click.command('run-worker')
+@click.option('--threads', default=1, show_default=True, help='Jobs run concurrently')
+@click.option('--burst', is_flag=True, help='Exit once no job is ready instead of waiting for more')
+@with_appcontext
+def run_worker_command(threads, burst):
+    """Run queued background jobs (search indexing, image variants, ...)"""
+    # Restarts the refresh cycles if a failed job ended one
+    trending.schedule()
+    recommender.schedule()
+    db.session.commit()
+    ran = jobs.work(threads=threads, burst=burst)
+    click.echo(f'Ran {ran} jobs')
+
+
+@click.command('send-digests')
+@with_appcontext
+def send_digests_command():
+    """Mail all pending follower digests now instead of at the end of the window"""
+    sent = digests.send_due()
+    click.echo(f'Sent {sent} digests')
+
+
+def register_commands(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_admin_command)
+    app.cli.add_command(repair_counters_command)
+    app.cli.add_command(rebuild_search_index_command)
+    app.cli.add_command(refresh_trending_command)
+    app.cli.add_command(refresh_recommendations_command)
+    app.cli.add_command(build_assets_command)
+    app.cli.add_command(render_thumbnails_command)
+    app.cli.add_command(run_worker_command)
+    app.cli.add_command(send_digests_command)
@@ -0,0 +1,100 @@
+import os
+
+
+def _database_url():
+    url = os.environ.get('DATABASE_URL', 'sqlite:///hackathon.db')
+    # Some hosts still hand out the pre-1.4 scheme that SQLAlchemy no longer accepts
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+class Config:
+    # Signs access tokens; required outside debug/testing (see create_app)
+    SECRET_KEY = os.environ.get('SECRET_KEY')
+    SQLALCHEMY_DATABASE_URI = _database_url()
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    
+    # Auth tokens (seconds)
+    ACCESS_TOKEN_TTL = int(os.environ.get('ACCESS_TOKEN_TTL', 15 * 60))
+    REFRESH_TOKEN_TTL = int(os.environ.get('REFRESH_TOKEN_TTL', 30 * 24 * 3600))
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 30))
+    
+    # Password hashing: werkzeug method string (e.g. 'scrypt' or 'pbkdf2:sha256:600000'),
+    # process pool size (0 hashes inline) and how many hashes may wait before returning 429
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE', 4 * (os.cpu_count() or 1)))
+    
+    # SQLite connect-time PRAGMAs
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    
+    # Connection pool for server databases (Postgres, MySQL)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    
+    VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', 5))
+    VIEW_FLUSH_THRESHOLD = int(os.environ.get('VIEW_FLUSH_THRESHOLD', 500))
+    
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 60))
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    
+    # Trending ranking (GET /api/events/trending), rebuilt by the refresh_trending job every interval
+    TRENDING_HALF_LIFE_HOURS = float(os.environ.get('TRENDING_HALF_LIFE_HOURS', 24))
+    TRENDING_REFRESH_INTERVAL = int(os.environ.get('TRENDING_REFRESH_INTERVAL', 60))
+    
+    # Recommendations (GET /api/users/<id>/recommendations), neighbors rebuilt by the refresh_recommendations job
+    RECOMMENDATION_REFRESH_INTERVAL = int(os.environ.get('RECOMMENDATION_REFRESH_INTERVAL', 300))
+    
+    # Change notifications for /api/stream: 'local' (single process) or 'redis' (shared)
+    PUBSUB_BACKEND = os.environ.get('PUBSUB_BACKEND', 'local')
+    PUBSUB_REDIS_URL = os.environ.get('PUBSUB_REDIS_URL', 'redis://localhost:6379/0')
+    SSE_HEARTBEAT_INTERVAL = int(os.environ.get('SSE_HEARTBEAT_INTERVAL', 15))
+    
+    # Uploaded images (content-addressed; MEDIA_DIR defaults to instance/media)
+    MEDIA_DIR = os.environ.get('MEDIA_DIR')
+    MEDIA_MAX_BYTES = int(os.environ.get('MEDIA_MAX_BYTES', 10 * 1024 * 1024))
+    
+    # Background jobs: worker threads wsgi.py starts in each web process (0: `flask run-worker` runs them)
+    JOBS_WORKER_THREADS = int(os.environ.get('JOBS_WORKER_THREADS', 0))
+    JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', 1))
+    JOBS_MAX_ATTEMPTS = int(os.environ.get('JOBS_MAX_ATTEMPTS', 5))
+    
+    # Follower digests: one mail per subscriber per window, sent through MAIL_TRANSPORT
+    # ('console' prints, 'smtp' sends; point MAIL_SMTP_PORT at a local debugging server to inspect)
+    DIGEST_WINDOW_HOURS = float(os.environ.get('DIGEST_WINDOW_HOURS', 24))
+    PUBLIC_BASE_URL = os.environ.get('PUBLIC_BASE_URL', 'http://localhost:5000')
+    MAIL_TRANSPORT = os.environ.get('MAIL_TRANSPORT', 'console')
+    MAIL_FROM = os.environ.get('MAIL_FROM', 'UniEvent <no-reply@unievent.local>')
+    MAIL_SMTP_HOST = os.environ.get('MAIL_SMTP_HOST', 'localhost')
+    MAIL_SMTP_PORT = int(os.environ.get('MAIL_SMTP_PORT', 25))
+    MAIL_SMTP_USERNAME = os.environ.get('MAIL_SMTP_USERNAME')
+    MAIL_SMTP_PASSWORD = os.environ.get('MAIL_SMTP_PASSWORD')
+    MAIL_SMTP_STARTTLS = os.environ.get('MAIL_SMTP_STARTTLS', '0') == '1'
+    
+    # Per-request SQL/timing instrumentation: Server-Timing headers and /metrics (off by default)
+    INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', '0') == '1'
+    INSTRUMENTATION_N_PLUS_ONE = int(os.environ.get('INSTRUMENTATION_N_PLUS_ONE', 5))
+    # /metrics is admin-only unless set, e.g. when only a scraper on a private network can reach it
+    INSTRUMENTATION_METRICS_PUBLIC = os.environ.get('INSTRUMENTATION_METRICS_PUBLIC', '0') == '1'
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database"""
+    if config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+        # Each connection waits on locks itself via busy_timeout (see database.py)
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING']
+    }
@@ -0,0 +1,30 @@
+from sqlalchemy import event
+from app.models import db
+
+
+def configure_engine(app):
+    """Install per-connection PRAGMAs on SQLite engines
+
+    WAL lets readers proceed while a writer holds the lock, synchronous=NORMAL
+    drops the fsync on every commit (still durable at checkpoints under WAL),
+    and busy_timeout makes writers queue instead of failing with
+    "database is locked".
+    """
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite':
+        return
+
+    pragmas = [
+        f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}"
+    ]
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
@@ -0,0 +1,241 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+from email.message import EmailMessage
+from app.jobs import jobs
+from app.mail import mailer
+from app.models import (
+    db, User, Society, Event, digest_entries, user_follows_categories, user_follows_societies
+)
+
+MAX_CATEGORY_LENGTH = 50
+
+
+def normalize_category(category):
+    """Categories are matched case-insensitively; raises ValueError on empty or overlong names"""
+    category = (category or '').strip().lower()
+    if not category or len(category) > MAX_CATEGORY_LENGTH:
+        raise ValueError(f'category must be 1-{MAX_CATEGORY_LENGTH} characters')
+    return category
+
+
+def add_society_follow(user_id, society_id):
+    """Follow a society, returning True if added, False if already followed, None if it does not exist
+
+    The caller commits.
+    """
+    already_following = db.select(user_follows_societies.c.user_id).where(
+        user_follows_societies.c.user_id == user_id,
+        user_follows_societies.c.society_id == society_id
+    ).exists()
+    inserted = db.session.execute(
+        user_follows_societies.insert().from_select(
+            ['user_id', 'society_id', 'created_at'],
+            db.select(db.literal(user_id), Society.id, db.literal(datetime.utcnow()))
+            .where(Society.id == society_id, ~already_following)
+        )
+    ).rowcount
+    if inserted:
+        return True
+    exists = db.session.execute(db.select(Society.id).where(Society.id == society_id)).scalar()
+    return False if exists is not None else None
+
+
+def add_category_follow(user_id, category):
+    """Follow a normalized category, returning True if added; the caller commits"""
+    already_following = db.select(user_follows_categories.c.user_id).where(
+        user_follows_categories.c.user_id == user_id,
+        user_follows_categories.c.category == category
+    ).exists()
+    return bool(db.session.execute(
+        user_follows_categories.insert().from_select(
+            ['user_id', 'category', 'created_at'],
+            db.select(db.literal(user_id), db.literal(category), db.literal(datetime.utcnow()))
+            .where(~already_following)
+        )
+    ).rowcount)
+
+
+def remove_follow(table, user_id, column, value):
+    """Remove one follow row, returning whether it existed; the caller commits"""
+    return bool(db.session.execute(
+        table.delete().where(table.c.user_id == user_id, table.c[column] == value)
+    ).rowcount)
+
+
+def list_follows(user_id):
+    """{'societies': [{id, name}], 'categories': [...]} followed by a user"""
+    societies = db.session.execute(
+        db.select(Society.id, Society.name)
+        .join(user_follows_societies, user_follows_societies.c.society_id == Society.id)
+        .where(user_follows_societies.c.user_id == user_id)
+        .order_by(Society.name)
+    ).all()
+    categories = db.session.execute(
+        db.select(user_follows_categories.c.category)
+        .where(user_follows_categories.c.user_id == user_id)
+        .order_by(user_follows_categories.c.category)
+    ).scalars().all()
+    return {
+        'societies': [{'id': society_id, 'name': name} for society_id, name in societies],
+        'categories': categories
+    }
+
+
+class DigestEngine:
+    """Collects new events per follower and mails them as one digest per window
+
+    Fan-out is one INSERT ... SELECT: the followers of each event's society
+    and of its category are unioned in SQL and written to digest_entries,
+    so an event with 20k followers costs a single statement, not a loop.
+    Only published, upcoming events of verified societies are fanned out;
+    verifying a society releases its upcoming events. Each fan-out queues
+    one send_digests job per DIGEST_WINDOW_HOURS slot (by idempotency key),
+    which renders DIGEST_BATCH_SIZE subscribers at a time and hands each
+    batch to the mailer as one send.
+    """
+
+    def __init__(self, app=None):
+        self.window = 24 * 3600
+        self.batch_size = 500
+        self.base_url = 'http://localhost:5000'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('DIGEST_WINDOW_HOURS', 24)
+        app.config.setdefault('DIGEST_BATCH_SIZE', 500)
+        app.config.setdefault('PUBLIC_BASE_URL', 'http://localhost:5000')
+
+        self.window = float(app.config['DIGEST_WINDOW_HOURS']) * 3600
+        self.batch_size = int(app.config['DIGEST_BATCH_SIZE'])
+        self.base_url = app.config['PUBLIC_BASE_URL'].rstrip('/')
+        app.extensions['digests'] = self
+
+    def fan_out(self, event_ids=None, society_id=None, now=None):
+        """Add the given events (or a society's upcoming events) to their followers' digests; returns rows added"""
+        now = now or datetime.utcnow()
+        events = db.select(Event.id, Event.society_id, db.func.lower(Event.category).label('category')).join(
+            Society, Society.id == Event.society_id
+        ).where(
+            Society.is_verified.is_(True),
+            Event.is_published.is_(True),
+            Event.event_date > now
+        )
+        if event_ids is not None:
+            events = events.where(Event.id.in_(event_ids))
+        if society_id is not None:
+            events = events.where(Event.society_id == society_id)
+        events = events.subquery()
+
+        by_society = db.select(
+            user_follows_societies.c.user_id.label('user_id'), events.c.id.label('event_id')
+        ).join(events, events.c.society_id == user_follows_societies.c.society_id)
+        by_category = db.select(
+            user_follows_categories.c.user_id.label('user_id'), events.c.id.label('event_id')
+        ).join(events, events.c.category == user_follows_categories.c.category)
+        targets = db.union(by_society, by_category).subquery()
+
+        already_queued = db.select(digest_entries.c.user_id).where(
+            digest_entries.c.user_id == targets.c.user_id,
+            digest_entries.c.event_id == targets.c.event_id
+        ).exists()
+        added = db.session.execute(
+            digest_entries.insert().from_select(
+                ['user_id', 'event_id', 'created_at'],
+                db.select(targets.c.user_id, targets.c.event_id, db.literal(now)).where(~already_queued)
+            )
+        ).rowcount
+        if added:
+            self.schedule()
+        return added
+
+    def schedule(self):
+        """Queue the digest run at the end of the current window, once per window"""
+        now = time.time()
+        slot = int(now // self.window)
+        jobs.enqueue(
+            'send_digests', key=f'send-digests:{int(self.window)}:{slot}',
+            delay=(slot + 1) * self.window - now
+        )
+
+    def render(self, user, events):
+        message = EmailMessage()
+        message['To'] = user.email
+        count = len(events)
+        message['Subject'] = f"{count} new event{'s' if count != 1 else ''} from what you follow on UniEvent"
+        lines = [f'Hi {user.first_name or user.username},', '']
+        for event in events:
+            when = event.event_date.strftime('%a %d %b %Y')
+            if event.start_time:
+                when += event.start_time.strftime(' %H:%M')
+            lines.append(f'- {event.title} ({event.society_name})')
+            lines.append(f"  {when}{', ' + event.venue if event.venue else ''}")
+        lines += ['', f'See all events: {self.base_url}/app']
+        message.set_content('\n'.join(lines))
+        return message
+
+    def send_due(self, batch_size=None):
+        """Mail every pending digest, a batch of subscribers at a time; returns digests sent
+
+        Entries added while this runs are left for the next window.
+        """
+        batch_size = batch_size or self.batch_size
+        cutoff = datetime.utcnow()
+        pending = digest_entries.c.created_at <= cutoff
+        after = 0
+        sent = 0
+        while True:
+            user_ids = db.session.execute(
+                db.select(digest_entries.c.user_id).distinct()
+                .where(pending, digest_entries.c.user_id > after)
+                .order_by(digest_entries.c.user_id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not user_ids:
+                return sent
+
+            rows = db.session.execute(
+                db.select(
+                    User.id, User.email, User.username, User.first_name,
+                    Event.title, Event.event_date, Event.start_time, Event.venue,
+                    Society.name.label('society_name')
+                )
+                .select_from(digest_entries)
+                .join(User, User.id == digest_entries.c.user_id)
+                .join(Event, Event.id == digest_entries.c.event_id)
+                .join(Society, Society.id == Event.society_id)
+                .where(pending, digest_entries.c.user_id.in_(user_ids), User.is_active.is_(True))
+                .order_by(User.id, Event.event_date, Event.id)
+            ).all()
+            by_user = defaultdict(list)
+            for row in rows:
+                by_user[row.id].append(row)
+
+            sent += mailer.send([self.render(events[0], events) for events in by_user.values()])
+            db.session.execute(
+                digest_entries.delete().where(pending, digest_entries.c.user_id.in_(user_ids))
+            )
+            db.session.commit()
+            after = user_ids[-1]
+
+    def society_verified_message(self, society_id):
+        row = db.session.execute(
+            db.select(Society.name, User.email, User.username, User.first_name)
+            .join(User, User.id == Society.user_id)
+            .where(Society.id == society_id)
+        ).first()
+        if row is None:
+            return None
+        message = EmailMessage()
+        message['To'] = row.email
+        message['Subject'] = f'{row.name} is now verified on UniEvent'
+        message.set_content(
+            f'Hi {row.first_name or row.username},\n\n'
+            f'{row.name} has been approved. Its events now reach your followers '
+            f'in their UniEvent digests.\n\n{self.base_url}/dashboard'
+        )
+        return message
+
+
+digests = DigestEngine()
@@ -0,0 +1,108 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import generate_password_hash, check_password_hash
+from app.instrumentation import instrumentation
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing pool already has a full queue"""
+    pass
+
+
+def method_prefix(method):
+    """The full parameter prefix werkzeug writes for a method, e.g. 'scrypt' -> 'scrypt:32768:8:1'"""
+    return generate_password_hash('', method).split('$', 1)[0]
+
+
+def _pool_context():
+    # Forking a multithreaded server can copy locks held by other threads into the child
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class PasswordHasher:
+    """Runs password hashing in a bounded process pool
+
+    Hashing is CPU-bound for hundreds of milliseconds, so it is moved off the
+    request worker. At most PASSWORD_HASH_QUEUE hashes may be queued or
+    running; beyond that callers get HashingBusy (served as 429) instead of
+    piling up, and a hash still running after PASSWORD_HASH_TIMEOUT seconds
+    raises concurrent.futures.TimeoutError (served as 503).
+    PASSWORD_HASH_WORKERS=0 hashes inline, e.g. in tests.
+    Workers are started with forkserver (spawn where unavailable), and the
+    pool's first job learns the method's full prefix for needs_rehash.
+    """
+
+    def __init__(self, app=None):
+        self.method = 'scrypt'
+        self.workers = 0
+        self.timeout = 30
+        self._slots = None
+        self._executor = None
+        self._calibration = None
+        self._lock = threading.Lock()
+        self._method_prefix = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt')
+        app.config.setdefault('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+        app.config.setdefault('PASSWORD_HASH_QUEUE', 4 * (os.cpu_count() or 1))
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 30)
+
+        self.method = app.config['PASSWORD_HASH_METHOD']
+        self.workers = int(app.config['PASSWORD_HASH_WORKERS'])
+        self.timeout = app.config['PASSWORD_HASH_TIMEOUT']
+        self._slots = threading.BoundedSemaphore(max(1, int(app.config['PASSWORD_HASH_QUEUE'])))
+        self._method_prefix = None
+        self._calibration = None
+        app.extensions['password_hasher'] = self
+
+    def _run(self, fn, *args):
+        with instrumentation.span('hash'):
+            return self._dispatch(fn, *args)
+
+    def _dispatch(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy('Too many login or signup requests right now, please retry shortly')
+        try:
+            return self._get_executor().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+                atexit.register(self._executor.shutdown, wait=False)
+            if self._calibration is None:
+                self._calibration = self._executor.submit(method_prefix, self.method)
+            return self._executor
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash (of any supported method)"""
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with different method or cost parameters"""
+        if self._method_prefix is None:
+            if self.workers <= 0:
+                self._method_prefix = method_prefix(self.method)
+            else:
+                # Computed by the pool when it started, usually long done by now
+                self._get_executor()
+                self._method_prefix = self._calibration.result(timeout=self.timeout)
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+from flask import Response, stream_with_context
+from app.streaming import iter_batches
+
+PRODID = '-//UniEvent//Campus Events//EN'
+
+
+def _escape(text):
+    return (
+        (text or '')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Fold content lines at 75 octets as RFC 5545 requires"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts = []
+    while len(encoded) > 75:
+        cut = 75 if not parts else 74
+        # Never split inside a multi-byte character
+        while cut and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode('utf-8'))
+        encoded = encoded[cut:]
+    parts.append(encoded.decode('utf-8'))
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _stamp(value):
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+
+def vevent(event, dtstamp, host):
+    """One VEVENT block; times are stored as UTC so they are written with a Z suffix"""
+    start = event.event_date
+    if event.start_time:
+        start = datetime.combine(start.date(), event.start_time)
+    if event.end_time:
+        end = datetime.combine(start.date(), event.end_time)
+    else:
+        end = start + timedelta(hours=2)
+    organizer = event.organizer
+    # Quotes cannot be escaped inside a quoted parameter value
+    organizer_name = organizer.name.replace('"', '')
+
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:event-{event.id}@{host}',
+        f'DTSTAMP:{dtstamp}',
+        f'DTSTART:{_stamp(start)}',
+        f'DTEND:{_stamp(end)}',
+        f'SUMMARY:{_escape(event.title)}',
+        f'LOCATION:{_escape(event.venue)}',
+        f'DESCRIPTION:{_escape(event.short_description or event.description)}',
+        f'CATEGORIES:{_escape(event.category)}' if event.category else None,
+        f'ORGANIZER;CN="{organizer_name}":mailto:{organizer.email}' if organizer.email else None,
+        'END:VEVENT'
+    ]
+    return ''.join(_fold(line) for line in lines if line)
+
+
+def ical_response(query, host, calendar_name='UniEvent'):
+    """Stream an iCalendar feed for the events in query"""
+    dtstamp = _stamp(datetime.utcnow())
+
+    def generate():
+        yield ''.join(_fold(line) for line in [
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            f'PRODID:{PRODID}',
+            'CALSCALE:GREGORIAN',
+            f'X-WR-CALNAME:{_escape(calendar_name)}'
+        ])
+        for batch in iter_batches(query):
+            yield ''.join(vevent(event, dtstamp, host) for event in batch)
+        yield _fold('END:VCALENDAR')
+
+    response = Response(stream_with_context(generate()), mimetype='text/calendar')
+    response.headers['Content-Disposition'] = 'inline; filename=unievent.ics'
+    return response
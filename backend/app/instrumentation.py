@@ -0,0 +1,261 @@
+import bisect
+import re
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from flask import Response, current_app, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+
+_NULL_SPAN = nullcontext()
+
+# Parameter lists vary in length ("IN (?, ?, ?)"), so they are collapsed before comparing shapes
+_PARAM_LIST = re.compile(r'\((?:\s*(?:\?|%s|:\w+)\s*,)+\s*(?:\?|%s|:\w+)\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def statement_shape(statement):
+    return _PARAM_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.shapes = defaultdict(lambda: [0, 0.0])
+        self.spans = defaultdict(float)
+
+
+class _Span:
+    __slots__ = ('stats', 'name', 'started')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.stats.spans[self.name] += time.perf_counter() - self.started
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {labels: (list(counts), total, count) for labels, (counts, total, count) in self._series.items()}
+        for labels, (counts, total, count) in sorted(series.items()):
+            label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {total}')
+            lines.append(f'{self.name}_count{{{label_text}}} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] += amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+            lines.append(f'{self.name}{{{label_text}}} {value}')
+        return lines
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Counts jsonify encoding as the 'serialize' span"""
+
+    def dumps(self, obj, **kwargs):
+        with instrumentation.span('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
+class InstrumentationState:
+    """One app's settings and metrics, kept in app.extensions['instrumentation']"""
+
+    def __init__(self, app):
+        self.enabled = app.config['INSTRUMENTATION_ENABLED']
+        self.slow_statements = app.config['INSTRUMENTATION_SLOW_STATEMENTS']
+        self.n_plus_one_threshold = app.config['INSTRUMENTATION_N_PLUS_ONE']
+        self.sql_text = app.debug
+        self.request_duration = Histogram(
+            'unievent_request_duration_seconds', 'Request latency by route', DURATION_BUCKETS
+        )
+        self.request_db_time = Histogram(
+            'unievent_request_db_seconds', 'Time spent in SQL per request by route', DURATION_BUCKETS
+        )
+        self.request_queries = Histogram(
+            'unievent_request_queries', 'SQL statements per request by route', QUERY_BUCKETS
+        )
+        self.n_plus_one = Counter(
+            'unievent_n_plus_one_total', 'Requests with a statement shape repeated past the threshold'
+        )
+
+
+class Instrumentation:
+    """Opt-in per-request SQL and timing instrumentation (INSTRUMENTATION_ENABLED)
+
+    When enabled, engine events count statements and their time for the
+    request running on the current thread, named spans (serialize, hash)
+    time the non-SQL work, and each response gets a Server-Timing header
+    with the totals and the durations of the slowest statements (their SQL
+    text only in debug mode, as every client sees the header). A statement
+    shape repeated more than INSTRUMENTATION_N_PLUS_ONE times in one
+    request is logged and counted as a likely N+1. Per-route histograms are
+    served as Prometheus text on INSTRUMENTATION_METRICS_PATH to admins
+    only, unless INSTRUMENTATION_METRICS_PUBLIC is set; each app and worker
+    process keeps its own.
+
+    When disabled nothing is registered; span() costs one attribute check.
+    Work done while a streamed body is read falls after the response and is
+    not counted.
+    """
+
+    def __init__(self, app=None):
+        self._local = threading.local()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('INSTRUMENTATION_ENABLED', False)
+        app.config.setdefault('INSTRUMENTATION_SLOW_STATEMENTS', 3)
+        app.config.setdefault('INSTRUMENTATION_N_PLUS_ONE', 5)
+        app.config.setdefault('INSTRUMENTATION_METRICS_PATH', '/metrics')
+        app.config.setdefault('INSTRUMENTATION_METRICS_PUBLIC', False)
+
+        state = app.extensions['instrumentation'] = InstrumentationState(app)
+        if not state.enabled:
+            return
+
+        from app.models import db
+        from app.tokens import role_required
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+
+        app.json = TimedJSONProvider(app)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._clear_request)
+        view = self.metrics_view
+        if not app.config['INSTRUMENTATION_METRICS_PUBLIC']:
+            view = role_required('admin')(view)
+        app.add_url_rule(app.config['INSTRUMENTATION_METRICS_PATH'], 'metrics', view)
+
+    def _state(self, app=None):
+        return (app or current_app).extensions['instrumentation']
+
+    def span(self, name):
+        """Context manager timing a named phase of the current request"""
+        # Stats are only set while a request of an app with instrumentation enabled runs
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            return _NULL_SPAN
+        return _Span(stats, name)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if getattr(self._local, 'stats', None) is not None:
+            conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None or not conn.info.get('query_started'):
+            return
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        stats.queries += 1
+        stats.db_time += elapsed
+        shape = stats.shapes[statement_shape(statement)]
+        shape[0] += 1
+        shape[1] += elapsed
+
+    def _start_request(self):
+        self._local.stats = RequestStats()
+
+    def _clear_request(self, exc):
+        self._local.stats = None
+
+    def _finish_request(self, response):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            return response
+        state = self._state()
+        total = time.perf_counter() - stats.started
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        labels = (('method', request.method), ('route', route))
+        state.request_duration.observe(labels, total)
+        state.request_db_time.observe(labels, stats.db_time)
+        state.request_queries.observe(labels, stats.queries)
+
+        repeated = [
+            (shape, count) for shape, (count, _) in stats.shapes.items() if count > state.n_plus_one_threshold
+        ]
+        if repeated:
+            state.n_plus_one.inc(labels)
+            for shape, count in repeated:
+                current_app.logger.warning('Possible N+1 on %s %s: %d x %s', request.method, route, count, shape)
+
+        response.headers['Server-Timing'] = self.server_timing(state, stats, total, len(repeated))
+        return response
+
+    def server_timing(self, state, stats, total, repeated):
+        entries = [f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries"']
+        for name, seconds in sorted(stats.spans.items()):
+            entries.append(f'{name};dur={seconds * 1000:.2f}')
+        slowest = sorted(stats.shapes.items(), key=lambda item: item[1][1], reverse=True)[:state.slow_statements]
+        for rank, (shape, (count, seconds)) in enumerate(slowest, start=1):
+            desc = f'{count}x'
+            if state.sql_text:
+                desc += ' ' + shape[:80].replace('\\', '').replace('"', "'")
+            entries.append(f'sql{rank};dur={seconds * 1000:.2f};desc="{desc}"')
+        if repeated:
+            entries.append(f'nplusone;desc="{repeated} repeated statement shapes"')
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+    def metrics_view(self):
+        state = self._state()
+        lines = []
+        for metric in (state.request_duration, state.request_db_time, state.request_queries, state.n_plus_one):
+            lines.extend(metric.render())
+        return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+instrumentation = Instrumentation()
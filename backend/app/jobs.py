@@ -0,0 +1,256 @@
+import atexit
+import json
+import random
+import threading
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from sqlalchemy import event as sa_event
+from app.models import db, Job
+
+# Longest a worker waits between polls while the queue cannot be read
+POLL_ERROR_BACKOFF_MAX = 60.0
+
+
+class Task:
+    def __init__(self, name, fn, max_attempts):
+        self.name = name
+        self.fn = fn
+        self.max_attempts = max_attempts
+
+
+class QueueState:
+    """One app's queue settings and worker threads, kept in app.extensions['jobs']"""
+
+    def __init__(self, app):
+        self.app = app
+        self.poll_interval = float(app.config['JOBS_POLL_INTERVAL'])
+        self.max_attempts = int(app.config['JOBS_MAX_ATTEMPTS'])
+        self.backoff_base = float(app.config['JOBS_BACKOFF_BASE'])
+        self.backoff_max = float(app.config['JOBS_BACKOFF_MAX'])
+        self.lease = int(app.config['JOBS_LEASE_SECONDS'])
+        self.threads = []
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+
+
+class JobQueue:
+    """Durable job queue on the jobs table of the application database
+
+    enqueue() inserts on the caller's connection, so a job commits or rolls
+    back with the write that produced it and the route only pays for one
+    commit. Workers claim a ready job with a single UPDATE ... RETURNING,
+    which also takes over jobs whose JOBS_LEASE_SECONDS lease ran out (a
+    worker died mid-job). A failing job is retried after an exponential,
+    jittered backoff until its max_attempts, then left as 'failed'.
+
+    create_app starts no workers. `flask run-worker` runs jobs in a
+    process of its own; start() runs JOBS_WORKER_THREADS threads inside a
+    web process instead (see wsgi.py and run.py), woken by commits that
+    enqueued something.
+    """
+
+    def __init__(self, app=None):
+        self._tasks = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('JOBS_WORKER_THREADS', 0)
+        app.config.setdefault('JOBS_POLL_INTERVAL', 1.0)
+        app.config.setdefault('JOBS_MAX_ATTEMPTS', 5)
+        app.config.setdefault('JOBS_BACKOFF_BASE', 2.0)
+        app.config.setdefault('JOBS_BACKOFF_MAX', 600.0)
+        app.config.setdefault('JOBS_LEASE_SECONDS', 300)
+        app.extensions['jobs'] = QueueState(app)
+
+    def _state(self, app=None):
+        return (app or current_app).extensions['jobs']
+
+    def start(self, app, threads=None):
+        """Run jobs on background threads of this process; threads defaults to JOBS_WORKER_THREADS"""
+        state = self._state(app)
+        if threads is None:
+            threads = int(app.config['JOBS_WORKER_THREADS'])
+        if threads and not state.threads:
+            atexit.register(self.shutdown, app)
+        for n in range(len(state.threads), threads):
+            thread = threading.Thread(target=self._loop, args=(state,), name=f'job-worker-{n}', daemon=True)
+            thread.start()
+            state.threads.append(thread)
+        return len(state.threads)
+
+    def task(self, name=None, max_attempts=None):
+        """Register a function as a job; it is called with the enqueued payload as keyword arguments"""
+        def decorator(fn):
+            task_name = name or fn.__name__
+            self._tasks[task_name] = Task(task_name, fn, max_attempts)
+            return fn
+        return decorator
+
+    def enqueue(self, name, payload=None, key=None, delay=0, connection=None):
+        """Add a job to the caller's transaction; with a key, skipped if that key was ever enqueued
+
+        connection is for callers inside a flush (mapper events); otherwise
+        the session's connection is used and the job runs after the commit.
+        """
+        task = self._tasks.get(name)
+        if task is None:
+            raise ValueError(f'Unknown job {name!r}')
+
+        values = {
+            'name': name,
+            'payload': json.dumps(payload or {}),
+            'idempotency_key': key,
+            'status': 'pending',
+            'attempts': 0,
+            'max_attempts': task.max_attempts or self._state().max_attempts,
+            'run_at': datetime.utcnow() + timedelta(seconds=delay),
+            'created_at': datetime.utcnow()
+        }
+        table = Job.__table__
+        if key is None:
+            stmt = table.insert().values(**values)
+        else:
+            already_enqueued = db.select(table.c.id).where(table.c.idempotency_key == key).exists()
+            stmt = table.insert().from_select(
+                list(values),
+                db.select(*(db.literal(value) for value in values.values())).where(~already_enqueued)
+            )
+        (connection or db.session.connection()).execute(stmt)
+        db.session.info['jobs_enqueued'] = True
+
+    def wake(self, app=None):
+        self._state(app).wake.set()
+
+    def _claim(self, lease):
+        now = datetime.utcnow()
+        ready = db.or_(
+            db.and_(Job.status == 'pending', Job.run_at <= now),
+            db.and_(Job.status == 'running', Job.locked_until < now)
+        )
+        candidate = db.select(Job.id).where(ready).order_by(Job.run_at, Job.id).limit(1).scalar_subquery()
+        # Re-checking ready in the outer WHERE makes a concurrent claim of the same row update nothing
+        stmt = (
+            db.update(Job)
+            .where(Job.id == candidate, ready)
+            .values(status='running', attempts=Job.attempts + 1, locked_until=now + timedelta(seconds=lease))
+            .returning(Job.id, Job.name, Job.payload, Job.idempotency_key, Job.attempts, Job.max_attempts)
+        )
+        with db.engine.begin() as conn:
+            return conn.execute(stmt).first()
+
+    def backoff(self, attempts):
+        """Seconds before retry number attempts: exponential, capped, with jitter so failures spread out"""
+        state = self._state()
+        delay = min(state.backoff_base * 2 ** (attempts - 1), state.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_next(self):
+        """Claim and run one ready job; returns False when none is ready"""
+        job = self._claim(self._state().lease)
+        if job is None:
+            return False
+
+        task = self._tasks.get(job.name)
+        try:
+            if task is None:
+                raise LookupError(f'No task registered as {job.name!r}')
+            task.fn(**json.loads(job.payload))
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            self._failed(job, e)
+        else:
+            self._finished(job)
+        finally:
+            db.session.remove()
+        return True
+
+    def _finished(self, job):
+        with db.engine.begin() as conn:
+            if job.idempotency_key is None:
+                conn.execute(db.delete(Job).where(Job.id == job.id))
+            else:
+                conn.execute(
+                    db.update(Job).where(Job.id == job.id)
+                    .values(status='done', locked_until=None, last_error=None, finished_at=datetime.utcnow())
+                )
+
+    def _failed(self, job, error):
+        now = datetime.utcnow()
+        message = f'{type(error).__name__}: {error}'[:2000]
+        if job.attempts >= job.max_attempts:
+            values = {'status': 'failed', 'finished_at': now}
+            current_app.logger.error('Job %s (%s) failed for good after %d attempts: %s', job.id, job.name, job.attempts, message)
+        else:
+            values = {'status': 'pending', 'run_at': now + timedelta(seconds=self.backoff(job.attempts))}
+            current_app.logger.warning('Job %s (%s) attempt %d failed, will retry: %s', job.id, job.name, job.attempts, message)
+        with db.engine.begin() as conn:
+            conn.execute(
+                db.update(Job).where(Job.id == job.id)
+                .values(locked_until=None, last_error=message, **values)
+            )
+
+    def _loop(self, state, burst=False):
+        ran = 0
+        idle = state.poll_interval
+        while not state.stopped.is_set():
+            if not burst:
+                state.wake.wait(idle)
+            state.wake.clear()
+            try:
+                with state.app.app_context():
+                    while not state.stopped.is_set() and self.run_next():
+                        ran += 1
+                idle = state.poll_interval
+            except Exception as e:
+                # e.g. no jobs table before init-db: poll less and less often instead of failing every second
+                idle = min(max(idle, state.poll_interval) * 2, POLL_ERROR_BACKOFF_MAX)
+                state.app.logger.warning('Job worker could not poll the queue, retrying in %gs: %s',
+                                         idle, getattr(e, 'orig', e))
+            if burst:
+                break
+        return ran
+
+    def work(self, threads=1, burst=False):
+        """Run the current app's jobs on this many threads until interrupted (or, with burst, until none is ready)
+
+        Returns how many jobs ran.
+        """
+        state = self._state()
+        counts = []
+        workers = [
+            threading.Thread(target=lambda: counts.append(self._loop(state, burst)), name=f'job-runner-{n}')
+            for n in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(0.5)
+        except KeyboardInterrupt:
+            self.shutdown(state.app)
+            for worker in workers:
+                worker.join()
+        return sum(counts)
+
+    def shutdown(self, app=None):
+        """Stop an app's worker threads after their current job"""
+        state = self._state(app)
+        state.stopped.set()
+        state.wake.set()
+
+
+jobs = JobQueue()
+
+
+@sa_event.listens_for(db.session, 'after_commit')
+def _wake_workers(session):
+    if session.info.pop('jobs_enqueued', False) and has_app_context():
+        jobs.wake()
+
+
+@sa_event.listens_for(db.session, 'after_rollback')
+def _forget_enqueued(session):
+    session.info.pop('jobs_enqueued', None)
@@ -0,0 +1,98 @@
+import smtplib
+import threading
+
+
+class ConsoleTransport:
+    """Prints messages instead of sending them; the default for development"""
+
+    def send(self, messages):
+        for message in messages:
+            print(f"--- mail to {message['To']}: {message['Subject']}\n{message.get_content()}")
+
+
+class MemoryTransport:
+    """Keeps sent messages in outbox, for benchmarks and manual testing"""
+
+    def __init__(self):
+        self.outbox = []
+        self._lock = threading.Lock()
+
+    def send(self, messages):
+        with self._lock:
+            self.outbox.extend(messages)
+
+
+class SMTPTransport:
+    """Sends a batch of messages over one SMTP connection
+
+    Any SMTP server works, including a local debugging server such as
+    `python -m aiosmtpd -n -l localhost:1025` with MAIL_SMTP_PORT=1025.
+    """
+
+    def __init__(self, host, port, username=None, password=None, starttls=False, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def send(self, messages):
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                smtp.send_message(message)
+
+
+class Mailer:
+    """Pluggable outgoing mail: MAIL_TRANSPORT is 'console', 'smtp', 'memory' or an object with send(messages)"""
+
+    def __init__(self, app=None):
+        self.transport = ConsoleTransport()
+        self.sender = 'UniEvent <no-reply@unievent.local>'
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MAIL_TRANSPORT', 'console')
+        app.config.setdefault('MAIL_FROM', 'UniEvent <no-reply@unievent.local>')
+        app.config.setdefault('MAIL_SMTP_HOST', 'localhost')
+        app.config.setdefault('MAIL_SMTP_PORT', 25)
+        app.config.setdefault('MAIL_SMTP_USERNAME', None)
+        app.config.setdefault('MAIL_SMTP_PASSWORD', None)
+        app.config.setdefault('MAIL_SMTP_STARTTLS', False)
+
+        transport = app.config['MAIL_TRANSPORT']
+        if transport == 'smtp':
+            self.transport = SMTPTransport(
+                app.config['MAIL_SMTP_HOST'],
+                int(app.config['MAIL_SMTP_PORT']),
+                app.config['MAIL_SMTP_USERNAME'],
+                app.config['MAIL_SMTP_PASSWORD'],
+                app.config['MAIL_SMTP_STARTTLS']
+            )
+        elif transport == 'memory':
+            self.transport = MemoryTransport()
+        elif transport == 'console':
+            self.transport = ConsoleTransport()
+        elif hasattr(transport, 'send'):
+            self.transport = transport
+        else:
+            raise RuntimeError(f'Unknown MAIL_TRANSPORT {transport!r}')
+        self.sender = app.config['MAIL_FROM']
+        app.extensions['mailer'] = self
+
+    def send(self, messages):
+        """Send EmailMessages in one batch, filling in From; returns how many were sent"""
+        for message in messages:
+            if 'From' not in message:
+                message['From'] = self.sender
+        if messages:
+            self.transport.send(messages)
+        return len(messages)
+
+
+mailer = Mailer()
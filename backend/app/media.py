@@ -0,0 +1,199 @@
+import hashlib
+import os
+import re
+import tempfile
+from flask import abort, send_file
+from sqlalchemy import case
+from app.assets import IMMUTABLE, REVALIDATE
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+MEDIA_URL_PREFIX = '/media/'
+
+# Bounding width of each WebP variant; height follows the aspect ratio
+THUMBNAIL_WIDTHS = {
+    'thumbnail': 480,
+    'large': 1280
+}
+
+_SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif')
+)
+
+_IMAGE_ID = re.compile(r'^[0-9a-f]{64}$')
+
+
+class InvalidImage(ValueError):
+    """Raised for uploads that are empty, too large or not a supported image type"""
+    pass
+
+
+def sniff_mimetype(head):
+    """Image type from the leading bytes; the client's Content-Type is not trusted"""
+    for signature, mimetype in _SIGNATURES:
+        if head.startswith(signature):
+            return mimetype
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def image_url(image_id):
+    return MEDIA_URL_PREFIX + image_id
+
+
+def variant_url(url, variant):
+    """URL of a resized variant for a stored image URL; other URLs are returned unchanged"""
+    if url and url.startswith(MEDIA_URL_PREFIX):
+        return f'{url}/{variant}.webp'
+    return url
+
+
+def variant_url_expression(column, variant):
+    """variant_url() as SQL, for column projections"""
+    return case(
+        (column.like(MEDIA_URL_PREFIX + '%'), column + f'/{variant}.webp'),
+        else_=column
+    )
+
+
+def _render_variants(source, targets):
+    """Write (path, width) WebP variants of one image"""
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.mode else 'RGB')
+        for target, width in targets:
+            resized = image.copy()
+            # thumbnail() never upscales: a small original is re-encoded at its own size
+            resized.thumbnail((width, image.height), Image.LANCZOS)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                resized.save(f, 'WEBP', quality=80, method=4)
+            os.replace(tmp, target)
+    return len(targets)
+
+
+class MediaStore:
+    """Content-addressed image storage with WebP variants built off the request path
+
+    Uploads are named by the SHA-256 of their bytes, so identical uploads
+    share one file and a URL never changes meaning: originals and variants
+    are served with an immutable Cache-Control and the hash as ETag, and
+    send_file answers Range and conditional requests. Variants listed in
+    THUMBNAIL_WIDTHS are rendered by the job workers when Pillow is
+    installed. Until a variant exists, or without Pillow, its URL serves
+    the original uncached.
+    """
+
+    def __init__(self, app=None):
+        self.root = None
+        self.max_bytes = 10 * 1024 * 1024
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('MEDIA_DIR', None)
+        app.config.setdefault('MEDIA_MAX_BYTES', 10 * 1024 * 1024)
+
+        self.root = app.config['MEDIA_DIR'] or os.path.join(app.instance_path, 'media')
+        self.max_bytes = app.config['MEDIA_MAX_BYTES']
+        app.extensions['media'] = self
+
+    def _path(self, image_id, variant=None):
+        name = image_id if variant is None else f'{image_id}.{variant}.webp'
+        return os.path.join(self.root, image_id[:2], name)
+
+    def store(self, stream):
+        """Save an uploaded image; returns (image_id, created), created False for a duplicate
+
+        The caller queues render_variants (see tasks.py) so resizing happens off the request.
+        """
+        body = stream.read(self.max_bytes + 1)
+        if not body:
+            raise InvalidImage('No image uploaded')
+        if len(body) > self.max_bytes:
+            raise InvalidImage(f'Images are limited to {self.max_bytes // (1024 * 1024)} MB')
+        if sniff_mimetype(body[:12]) is None:
+            raise InvalidImage('Only JPEG, PNG, GIF and WebP images are supported')
+
+        image_id = hashlib.sha256(body).hexdigest()
+        path = self._path(image_id)
+        created = not os.path.exists(path)
+        if created:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(body)
+            # Concurrent uploads of the same bytes write identical files, so the last rename wins harmlessly
+            os.replace(tmp, path)
+        return image_id, created
+
+    def discard(self, image_id):
+        """Delete an image stored by a request whose row never committed, with any variants"""
+        for path in [self._path(image_id)] + [self._path(image_id, variant) for variant in THUMBNAIL_WIDTHS]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def missing_variants(self, image_id):
+        return [
+            (self._path(image_id, variant), width)
+            for variant, width in THUMBNAIL_WIDTHS.items()
+            if not os.path.exists(self._path(image_id, variant))
+        ]
+
+    def render_variants(self, image_id):
+        """Render missing variants in the calling thread; returns how many were written (0 without Pillow)"""
+        if Image is None:
+            return 0
+        targets = self.missing_variants(image_id)
+        if targets:
+            _render_variants(self._path(image_id), targets)
+        return len(targets)
+
+    def stored_ids(self):
+        if not os.path.isdir(self.root):
+            return
+        for shard in sorted(os.listdir(self.root)):
+            directory = os.path.join(self.root, shard)
+            if not os.path.isdir(directory):
+                continue
+            for name in sorted(os.listdir(directory)):
+                if _IMAGE_ID.match(name):
+                    yield name
+
+    def send(self, image_id, variant=None):
+        """Serve an original or a variant with Range/ETag support"""
+        if not _IMAGE_ID.match(image_id) or (variant is not None and variant not in THUMBNAIL_WIDTHS):
+            abort(404)
+        original = self._path(image_id)
+        if not os.path.exists(original):
+            abort(404)
+
+        path, etag, cache_control = original, image_id, IMMUTABLE
+        if variant is not None:
+            if os.path.exists(self._path(image_id, variant)):
+                path, etag = self._path(image_id, variant), f'{image_id}-{variant}'
+            else:
+                # Not rendered yet (or no Pillow): the original stands in, but must not be cached as the variant
+                cache_control = REVALIDATE
+
+        if path == original:
+            with open(original, 'rb') as f:
+                mimetype = sniff_mimetype(f.read(12))
+        else:
+            mimetype = 'image/webp'
+        response = send_file(path, mimetype=mimetype, etag=etag, conditional=True)
+        response.headers['Cache-Control'] = cache_control
+        return response
+
+
+media = MediaStore()
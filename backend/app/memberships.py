@@ -0,0 +1,116 @@
+from collections import Counter
+from datetime import datetime
+from app.models import db, User, Society, society_memberships
+
+PENDING = 'pending'
+APPROVED = 'approved'
+
+# (society_id, user_id) pairs per review statement; each pair binds two parameters
+REVIEW_CHUNK_SIZE = 400
+REVIEW_MAX_REQUESTS = 10000
+
+
+def _membership(society_id, user_id):
+    return db.and_(
+        society_memberships.c.society_id == society_id,
+        society_memberships.c.user_id == user_id
+    )
+
+
+def membership_status(society_id, user_id):
+    return db.session.execute(
+        db.select(society_memberships.c.status).where(_membership(society_id, user_id))
+    ).scalar()
+
+
+def request_membership(user_id, society_id):
+    """Ask to join an active society, returning (status, created); status is None if there is no such society
+
+    New requests stay pending until the owner or an admin approves them.
+    Both statements are primary-key probes, so a join costs the same in a
+    society of ten members or of fifty thousand. The caller commits.
+    """
+    already_requested = db.select(society_memberships.c.user_id).where(_membership(society_id, user_id)).exists()
+    inserted = db.session.execute(
+        society_memberships.insert().from_select(
+            ['society_id', 'user_id', 'status', 'created_at'],
+            db.select(Society.id, db.literal(user_id), db.literal(PENDING), db.literal(datetime.utcnow()))
+            .where(Society.id == society_id, Society.is_active.is_(True), ~already_requested)
+        )
+    ).rowcount
+    if inserted:
+        return PENDING, True
+    return membership_status(society_id, user_id), False
+
+
+def remove_membership(society_id, user_id):
+    """Leave a society, withdraw a request or reject one; returns (removed status or None, member_count)
+
+    member_count is only touched, and only returned, when an approved member left. The caller commits.
+    """
+    status = db.session.execute(
+        society_memberships.delete().where(_membership(society_id, user_id)).returning(society_memberships.c.status)
+    ).scalar()
+    if status != APPROVED:
+        return status, None
+    return status, Society.adjust_member_counts({society_id: -1}).get(society_id)
+
+
+def review(requests, approve):
+    """Approve or reject pending (society_id, user_id) requests; returns ({society_id: reviewed}, {society_id: member_count})
+
+    Each chunk of requests is one UPDATE (approve) or DELETE (reject) ...
+    RETURNING over the rows still pending, and approvals then move every
+    affected member_count in a single statement, so thousands of requests
+    cost a handful of statements. Requests that are not pending are
+    skipped. The caller commits, making the whole batch one transaction.
+    """
+    requests = list(dict.fromkeys(requests))
+    now = datetime.utcnow()
+    reviewed = Counter()
+    for start in range(0, len(requests), REVIEW_CHUNK_SIZE):
+        pending = db.and_(
+            db.tuple_(society_memberships.c.society_id, society_memberships.c.user_id).in_(
+                requests[start:start + REVIEW_CHUNK_SIZE]
+            ),
+            society_memberships.c.status == PENDING
+        )
+        if approve:
+            stmt = society_memberships.update().where(pending).values(status=APPROVED, approved_at=now)
+        else:
+            stmt = society_memberships.delete().where(pending)
+        for (society_id,) in db.session.execute(stmt.returning(society_memberships.c.society_id)):
+            reviewed[society_id] += 1
+    member_counts = Society.adjust_member_counts(reviewed) if approve else {}
+    return dict(reviewed), member_counts
+
+
+def list_members(society_id, status, after_user_id=0, limit=50):
+    """One page of a society's members (or requests) in user id order, read straight off idx_membership_status"""
+    rows = db.session.execute(
+        db.select(
+            User.id, User.username, User.first_name, User.last_name, User.profile_image,
+            society_memberships.c.created_at, society_memberships.c.approved_at
+        )
+        .select_from(society_memberships)
+        .join(User, User.id == society_memberships.c.user_id)
+        .where(
+            society_memberships.c.society_id == society_id,
+            society_memberships.c.status == status,
+            society_memberships.c.user_id > after_user_id
+        )
+        .order_by(society_memberships.c.user_id)
+        .limit(limit)
+    ).all()
+    return [
+        {
+            'id': row.id,
+            'username': row.username,
+            'first_name': row.first_name,
+            'last_name': row.last_name,
+            'profile_image': row.profile_image,
+            'requested_at': row.created_at.isoformat(),
+            'approved_at': row.approved_at.isoformat() if row.approved_at else None
+        }
+        for row in rows
+    ]
@@ -1,9 +1,14 @@
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.hashing import password_hasher
+from app.pagination import encode_cursor
+from app.media import variant_url
 from datetime import datetime, timezone
 
 db = SQLAlchemy()
 
+# Comments embedded in an event detail; the rest are paged through /api/events/<id>/comments
+COMMENTS_PAGE_SIZE = 20
+
 
 # Association table for many-to-many relationship between users and events (likes)
 user_likes_events = db.Table(
@@ -13,6 +18,45 @@ user_likes_events = db.Table(
     db.Column('created_at', db.DateTime, default=datetime.utcnow, nullable=False)
 )
 
+# Follows drive digest fan-out (digests.py); the second index serves "who follows X" lookups
+user_follows_societies = db.Table(
+    'user_follows_societies',
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('society_id', db.Integer, db.ForeignKey('societies.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('created_at', db.DateTime, default=datetime.utcnow, nullable=False),
+    db.Index('idx_follow_society_user', 'society_id', 'user_id')
+)
+
+user_follows_categories = db.Table(
+    'user_follows_categories',
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('category', db.String(50), primary_key=True),
+    db.Column('created_at', db.DateTime, default=datetime.utcnow, nullable=False),
+    db.Index('idx_follow_category_user', 'category', 'user_id')
+)
+
+# Members and join requests of a society (see memberships.py). Joining probes the primary key
+# only, so it costs the same however many members a society has; the status index serves
+# member listings and review queues in user id order.
+society_memberships = db.Table(
+    'society_memberships',
+    db.Column('society_id', db.Integer, db.ForeignKey('societies.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('status', db.String(20), default='pending', nullable=False),
+    db.Column('created_at', db.DateTime, default=datetime.utcnow, nullable=False),
+    db.Column('approved_at', db.DateTime, nullable=True),
+    db.Index('idx_membership_status', 'society_id', 'status', 'user_id'),
+    db.Index('idx_membership_user', 'user_id')
+)
+
+# Events waiting for a subscriber's next digest; rows are deleted once the digest is sent
+digest_entries = db.Table(
+    'digest_entries',
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('event_id', db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('created_at', db.DateTime, default=datetime.utcnow, nullable=False)
+)
+
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -70,11 +114,15 @@ class User(db.Model):
         """Hash and set the user password"""
         if not password or len(password) < 6:
             raise ValueError("Password must be at least 6 characters long")
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
         """Verify the user password"""
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Check whether the stored hash predates the current hashing parameters"""
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self, include_email=False, include_society=False):
         """Convert user object to dictionary"""
@@ -147,7 +195,51 @@ class Society(db.Model):
     def __repr__(self):
         return f'<Society {self.name}>'
     
-    def to_dict(self, include_owner=False, include_event_count=False):
+    @staticmethod
+    def event_stats(society_ids):
+        """(event_count, upcoming_event_count) per society in one grouped query"""
+        if not society_ids:
+            return {}
+        upcoming = db.case((Event.event_date > datetime.utcnow(), 1), else_=0)
+        rows = db.session.query(
+            Event.society_id,
+            db.func.count(Event.id),
+            db.func.coalesce(db.func.sum(upcoming), 0)
+        ).filter(
+            Event.society_id.in_(society_ids)
+        ).group_by(Event.society_id).all()
+        return {society_id: (total, upcoming_total) for society_id, total, upcoming_total in rows}
+    
+    @staticmethod
+    def adjust_member_counts(deltas):
+        """Shift member_count of several societies in one UPDATE, returning {society_id: new count}"""
+        deltas = {society_id: delta for society_id, delta in deltas.items() if delta}
+        if not deltas:
+            return {}
+        rows = db.session.execute(
+            db.update(Society)
+            .where(Society.id.in_(deltas))
+            .values(member_count=Society.member_count + db.case(deltas, value=Society.id, else_=0))
+            .returning(Society.id, Society.member_count)
+            .execution_options(synchronize_session=False)
+        ).all()
+        return dict(rows)
+    
+    @staticmethod
+    def repair_member_counts():
+        """Recompute member_count for every society from its approved memberships"""
+        members = db.select(db.func.count()).where(
+            society_memberships.c.society_id == Society.id,
+            society_memberships.c.status == 'approved'
+        ).scalar_subquery()
+        result = db.session.execute(
+            db.update(Society)
+            .values(member_count=members)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    def to_dict(self, include_owner=False, include_event_count=False, event_stats=None):
         """Convert society object to dictionary"""
         data = {
             'id': self.id,
@@ -167,7 +259,9 @@ class Society(db.Model):
         if include_owner:
             data['owner'] = self.user.to_dict()
         if include_event_count:
-            data['event_count'] = self.events.count()
+            if event_stats is None:
+                event_stats = Society.event_stats([self.id])
+            data['event_count'], data['upcoming_event_count'] = event_stats.get(self.id, (0, 0))
         return data
 
 
@@ -205,6 +299,14 @@ class Event(db.Model):
     # Status and metrics
     is_published = db.Column(db.Boolean, default=True, nullable=False, index=True)
     view_count = db.Column(db.Integer, default=0, nullable=False)
+    # Views not yet folded into the trending ranking (see trending.py)
+    trending_views = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Denormalized counters, kept in step by toggle_like/add_comment (see repair-counters)
+    likes_count = db.Column(db.Integer, default=0, nullable=False)
+    comments_count = db.Column(db.Integer, default=0, nullable=False)
+    # Likes and unlikes not yet folded into the event's neighbors; refresh_recommendations subtracts what it saw
+    like_changes = db.Column(db.Integer, default=0, nullable=False)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -228,16 +330,86 @@ class Event(db.Model):
     def __repr__(self):
         return f'<Event {self.title}>'
     
-    def is_upcoming(self):
-        """Check if event is in the future"""
-        return self.event_date > datetime.utcnow()
+    def is_upcoming(self, now=None):
+        """Check if event is in the future; pass now to evaluate a whole page against one instant"""
+        return self.event_date > (now or datetime.utcnow())
     
-    def increment_view(self):
-        """Increment view count"""
-        self.view_count += 1
-        db.session.commit()
-    
-    def to_dict(self, include_organizer=False, include_comments=False, include_likes=True):
+    @staticmethod
+    def toggle_like(user_id, event_id):
+        """Like or unlike an event, returning (liked, likes_count) or None if the event is missing
+        
+        The caller commits; the association row and the counter change in the same transaction.
+        """
+        removed = db.session.execute(
+            user_likes_events.delete().where(
+                user_likes_events.c.user_id == user_id,
+                user_likes_events.c.event_id == event_id
+            )
+        ).rowcount
+        
+        if removed:
+            delta = -1
+        else:
+            already_liked = db.select(user_likes_events.c.user_id).where(
+                user_likes_events.c.user_id == user_id,
+                user_likes_events.c.event_id == event_id
+            ).exists()
+            inserted = db.session.execute(
+                user_likes_events.insert().from_select(
+                    ['user_id', 'event_id', 'created_at'],
+                    db.select(
+                        db.literal(user_id),
+                        db.literal(event_id),
+                        db.literal(datetime.utcnow())
+                    ).where(~already_liked)
+                )
+            ).rowcount
+            delta = 1 if inserted else 0
+        
+        values = {'likes_count': Event.likes_count + delta}
+        if delta:
+            values['like_changes'] = Event.like_changes + 1
+        likes_count = db.session.execute(
+            db.update(Event)
+            .where(Event.id == event_id)
+            .values(**values)
+            .returning(Event.likes_count)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if likes_count is None:
+            return None
+        return not removed, likes_count
+    
+    @staticmethod
+    def adjust_comments_count(event_id, delta):
+        """Shift the comments counter of an event without loading it, returning the new count or None"""
+        return db.session.execute(
+            db.update(Event)
+            .where(Event.id == event_id)
+            .values(comments_count=Event.comments_count + delta)
+            .returning(Event.comments_count)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+    
+    @staticmethod
+    def repair_counters():
+        """Recompute likes_count and comments_count for every event from the source tables"""
+        likes = db.select(db.func.count()).where(
+            user_likes_events.c.event_id == Event.id
+        ).scalar_subquery()
+        comments = db.select(db.func.count(Comment.id)).where(
+            Comment.event_id == Event.id,
+            Comment.is_approved.is_(True),
+            Comment.is_deleted.is_(False)
+        ).scalar_subquery()
+        result = db.session.execute(
+            db.update(Event)
+            .values(likes_count=likes, comments_count=comments)
+            .execution_options(synchronize_session=False)
+        )
+        return result.rowcount
+    
+    def to_dict(self, include_organizer=False, include_comments=False, include_likes=True, now=None):
         """Convert event object to dictionary"""
         data = {
             'id': self.id,
@@ -250,24 +422,28 @@ class Event(db.Model):
             'end_time': self.end_time.isoformat() if self.end_time else None,
             'venue': self.venue,
             'poster': self.poster,
+            'poster_thumbnail': variant_url(self.poster, 'thumbnail'),
+            'poster_large': variant_url(self.poster, 'large'),
             'google_form_link': self.google_form_link,
             'is_published': self.is_published,
             'view_count': self.view_count,
-            'is_upcoming': self.is_upcoming(),
+            'is_upcoming': self.is_upcoming(now),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
         
         if include_likes:
-            data['likes_count'] = self.liked_by.count()
+            data['likes_count'] = self.likes_count
         
         if include_organizer:
             data['organizer'] = self.organizer.to_dict()
         
         if include_comments:
-            approved_comments = self.comments.filter_by(is_approved=True, is_deleted=False)
-            data['comments'] = [c.to_dict(include_author=True) for c in approved_comments]
-            data['comments_count'] = approved_comments.count()
+            # Only the newest page; the rest comes from GET /api/events/<id>/comments?cursor=
+            comments, next_key = Comment.page_for_event(self.id, COMMENTS_PAGE_SIZE)
+            data['comments'] = [c.to_dict(include_author=True) for c in comments]
+            data['comments_count'] = self.comments_count
+            data['comments_next_cursor'] = encode_cursor(*next_key) if next_key else None
         
         return data
 
@@ -302,15 +478,42 @@ class Comment(db.Model):
     
     # Composite indexes
     __table_args__ = (
-        db.Index('idx_comment_event_approved', 'event_id', 'is_approved', 'is_deleted'),
+        db.Index('idx_comment_event_approved', 'event_id', 'is_approved', 'is_deleted', 'created_at'),
         db.Index('idx_comment_user_created', 'user_id', 'created_at'),
     )
     
     def __repr__(self):
         return f'<Comment {self.id} by User {self.user_id}>'
     
+    @staticmethod
+    def page_for_event(event_id, limit, after=None):
+        """One page of approved comments, newest first, authors loaded with a single IN query
+        
+        after is the (created_at, id) key of the last comment already returned;
+        the second return value is the key to continue from, or None on the last page.
+        """
+        query = Comment.query.options(db.selectinload(Comment.user)).filter_by(
+            event_id=event_id,
+            is_approved=True,
+            is_deleted=False
+        )
+        if after:
+            created_at, comment_id = after
+            query = query.filter(db.or_(
+                Comment.created_at < created_at,
+                db.and_(Comment.created_at == created_at, Comment.id < comment_id)
+            ))
+        
+        comments = query.order_by(Comment.created_at.desc(), Comment.id.desc()).limit(limit + 1).all()
+        if len(comments) > limit:
+            comments = comments[:limit]
+            return comments, (comments[-1].created_at.isoformat(), comments[-1].id)
+        return comments, None
+    
     def soft_delete(self):
         """Soft delete the comment"""
+        if not self.is_deleted and self.is_approved:
+            Event.adjust_comments_count(self.event_id, -1)
         self.is_deleted = True
         db.session.commit()
     
@@ -334,4 +537,105 @@ class Comment(db.Model):
                 'title': self.event.title
             }
         
-        return data
\ No newline at end of file
+        return data
+
+
+class RefreshToken(db.Model):
+    __tablename__ = 'refresh_tokens'
+    
+    # Primary fields
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(
+        db.Integer, 
+        db.ForeignKey('users.id', ondelete='CASCADE'), 
+        nullable=False, 
+        index=True
+    )
+    jti = db.Column(db.String(64), unique=True, nullable=False, index=True)
+    
+    # Rotation state: a token is usable once, then replaced by its successor
+    expires_at = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=True)
+    replaced_by = db.Column(db.String(64), nullable=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<RefreshToken {self.jti[:8]} for User {self.user_id}>'
+    
+    def is_usable(self):
+        """Check the token has not been rotated, revoked or expired"""
+        return self.revoked_at is None and self.expires_at > datetime.utcnow()
+
+
+
+class TrendingScore(db.Model):
+    __tablename__ = 'trending_scores'
+    
+    __table_args__ = (
+        # GET /api/events/trending reads the ranking best first
+        db.Index('idx_trending_score', 'score', 'event_id'),
+    )
+    
+    # The trending ranking, rewritten by the refresh_trending job (see trending.py)
+    event_id = db.Column(
+        db.Integer, 
+        db.ForeignKey('events.id', ondelete='CASCADE'), 
+        primary_key=True
+    )
+    score = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<TrendingScore {self.event_id}: {self.score:.2f}>'
+
+
+class EventNeighbor(db.Model):
+    __tablename__ = 'event_neighbors'
+    
+    # Best "also liked" events per event, rewritten by the refresh_recommendations job (see recommendations.py)
+    event_id = db.Column(
+        db.Integer, 
+        db.ForeignKey('events.id', ondelete='CASCADE'), 
+        primary_key=True
+    )
+    neighbor_id = db.Column(
+        db.Integer, 
+        db.ForeignKey('events.id', ondelete='CASCADE'), 
+        primary_key=True
+    )
+    score = db.Column(db.Float, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f'<EventNeighbor {self.event_id} -> {self.neighbor_id}: {self.score:.2f}>'
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+    
+    # Durable background work, claimed and run by jobs.py workers
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default='{}')
+    
+    # Enqueuing twice with the same key is a no-op; keyed rows are kept after they finish
+    idempotency_key = db.Column(db.String(200), unique=True, nullable=True)
+    
+    # pending -> running -> (deleted | done), or back to pending with a later run_at, or failed
+    status = db.Column(db.String(20), default='pending', nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=5, nullable=False)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        db.Index('idx_job_status_run_at', 'status', 'run_at'),
+    )
+    
+    def __repr__(self):
+        return f'<Job {self.id} {self.name} {self.status}>'
@@ -0,0 +1,209 @@
+import json
+from datetime import date, datetime, time
+from flask import Response
+from app.models import db, User, Society, Event, Comment
+from app.instrumentation import instrumentation
+from app.media import variant_url_expression
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_VIEW = 'summary'
+
+
+def _encode_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj):
+    """Compact JSON; orjson when installed, which also writes datetimes without isoformat() calls"""
+    with instrumentation.span('serialize'):
+        if orjson is not None:
+            return orjson.dumps(obj).decode()
+        return json.dumps(obj, default=_encode_default, separators=(',', ':'))
+
+
+def json_response(obj, status=200):
+    return Response(dumps(obj), status=status, mimetype='application/json')
+
+
+class Nested:
+    """A group of joined columns serialized as one sub-object, e.g. an event's organizer"""
+
+    def __init__(self, join, onclause, **fields):
+        self.join = join
+        self.onclause = onclause
+        self.fields = fields
+
+
+class Projection:
+    """Declarative field sets for list endpoints
+
+    fields maps public names to a column, a callable taking the request's
+    now and returning a SQL expression, or a Nested group. Only the columns
+    behind the requested names are selected, and rows come back as tuples,
+    so no ORM instances are built. 'id' is always included.
+    """
+
+    def __init__(self, entity, fields, views):
+        self.entity = entity
+        self.fields = fields
+        self.views = views
+
+    def resolve(self, args, default=DEFAULT_VIEW):
+        """Field names from ?fields=a,b or ?view=summary|detail; raises ValueError on unknown names"""
+        if args.get('fields'):
+            names = [name.strip() for name in args['fields'].split(',') if name.strip()]
+            unknown = [name for name in names if name not in self.fields]
+            if unknown:
+                raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        else:
+            view = args.get('view', default)
+            if view not in self.views:
+                raise ValueError(f"view must be one of {', '.join(self.views)}")
+            names = self.views[view]
+        return ['id'] + [name for name in dict.fromkeys(names) if name != 'id']
+
+    def query(self, names, now=None, keys=()):
+        """(query, serialize) for the given names
+
+        keys are extra columns appended after the projected ones, for callers
+        that need a sort key for the cursor; serialize ignores them.
+        """
+        columns, flat, nested, joins = [], [], [], []
+        for name in names:
+            field = self.fields[name]
+            if isinstance(field, Nested):
+                joins.append((field.join, field.onclause))
+                continue
+            columns.append(field(now) if callable(field) else field)
+            flat.append(name)
+        for name in names:
+            field = self.fields[name]
+            if isinstance(field, Nested):
+                start = len(columns)
+                columns.extend(field.fields.values())
+                nested.append((name, list(field.fields), start, len(columns)))
+
+        query = db.session.query(*columns, *keys).select_from(self.entity)
+        for target, onclause in joins:
+            query = query.join(target, onclause)
+
+        width = len(flat)
+
+        def serialize(row):
+            item = dict(zip(flat, row[:width]))
+            for name, sub_names, start, end in nested:
+                item[name] = dict(zip(sub_names, row[start:end]))
+            return item
+
+        return query, serialize
+
+    def by_id(self, names, ids, now=None):
+        """Serialized rows for a list of ids, keyed by id, for endpoints that rank ids elsewhere"""
+        query, serialize = self.query(names, now)
+        return {item['id']: item for item in map(serialize, query.filter(self.entity.id.in_(ids)))}
+
+
+def _upcoming_event_count(now):
+    return db.select(db.func.count(Event.id)).where(
+        Event.society_id == Society.id, Event.event_date > now
+    ).scalar_subquery()
+
+
+EVENT_PROJECTION = Projection(Event, {
+    'id': Event.id,
+    'title': Event.title,
+    'description': Event.description,
+    'short_description': Event.short_description,
+    'category': Event.category,
+    'event_date': Event.event_date,
+    'start_time': Event.start_time,
+    'end_time': Event.end_time,
+    'venue': Event.venue,
+    'poster': Event.poster,
+    'poster_thumbnail': variant_url_expression(Event.poster, 'thumbnail').label('poster_thumbnail'),
+    'poster_large': variant_url_expression(Event.poster, 'large').label('poster_large'),
+    'google_form_link': Event.google_form_link,
+    'is_published': Event.is_published,
+    'view_count': Event.view_count,
+    'likes_count': Event.likes_count,
+    'comments_count': Event.comments_count,
+    'is_upcoming': lambda now: (Event.event_date > now).label('is_upcoming'),
+    'created_at': Event.created_at,
+    'updated_at': Event.updated_at,
+    'organizer': Nested(
+        Society, Society.id == Event.society_id,
+        id=Society.id,
+        name=Society.name,
+        logo_url=Society.logo_url,
+        is_verified=Society.is_verified
+    )
+}, views={
+    'summary': [
+        'title', 'short_description', 'category', 'event_date', 'start_time', 'end_time',
+        'venue', 'poster', 'poster_thumbnail', 'likes_count', 'comments_count', 'is_upcoming', 'organizer'
+    ],
+    'detail': [
+        'title', 'description', 'short_description', 'category', 'event_date', 'start_time',
+        'end_time', 'venue', 'poster', 'poster_thumbnail', 'poster_large', 'google_form_link',
+        'is_published', 'view_count', 'likes_count', 'comments_count', 'is_upcoming', 'created_at',
+        'updated_at', 'organizer'
+    ]
+})
+
+SOCIETY_PROJECTION = Projection(Society, {
+    'id': Society.id,
+    'name': Society.name,
+    'description': Society.description,
+    'logo_url': Society.logo_url,
+    'cover_image': Society.cover_image,
+    'email': Society.email,
+    'whatsapp_number': Society.whatsapp_number,
+    'instagram_handle': Society.instagram_handle,
+    'website': Society.website,
+    'is_verified': Society.is_verified,
+    'is_active': Society.is_active,
+    'member_count': Society.member_count,
+    'created_at': Society.created_at,
+    'event_count': db.select(db.func.count(Event.id)).where(
+        Event.society_id == Society.id
+    ).scalar_subquery().label('event_count'),
+    'upcoming_event_count': lambda now: _upcoming_event_count(now).label('upcoming_event_count'),
+    'owner': Nested(
+        User, User.id == Society.user_id,
+        id=User.id,
+        username=User.username,
+        first_name=User.first_name,
+        last_name=User.last_name
+    )
+}, views={
+    'summary': ['name', 'logo_url', 'email', 'is_verified', 'member_count'],
+    'detail': [
+        'name', 'description', 'logo_url', 'cover_image', 'email', 'whatsapp_number',
+        'instagram_handle', 'website', 'is_verified', 'is_active', 'member_count', 'created_at',
+        'event_count', 'upcoming_event_count', 'owner'
+    ]
+})
+
+COMMENT_PROJECTION = Projection(Comment, {
+    'id': Comment.id,
+    'content': Comment.content,
+    'created_at': Comment.created_at,
+    'updated_at': Comment.updated_at,
+    'author': Nested(
+        User, User.id == Comment.user_id,
+        id=User.id,
+        username=User.username,
+        first_name=User.first_name,
+        last_name=User.last_name,
+        profile_image=User.profile_image
+    )
+}, views={
+    'summary': ['content', 'created_at', 'author'],
+    'detail': ['content', 'created_at', 'updated_at', 'author']
+})
@@ -0,0 +1,151 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+
+class Subscription:
+    def __init__(self, broker, maxsize):
+        self._broker = broker
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def get(self, timeout=None):
+        """Next message, or None if nothing arrived within timeout"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self._broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LocalBroker:
+    """In-process fan-out; also the stand-in for the Redis broker in tests and development
+
+    A subscriber that stops reading loses its oldest messages rather than
+    blocking publishers or growing without bound.
+    """
+
+    def __init__(self, queue_size=256):
+        self.queue_size = queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription(self, self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            while True:
+                try:
+                    subscription.queue.put_nowait(message)
+                    break
+                except queue.Full:
+                    try:
+                        subscription.queue.get_nowait()
+                    except queue.Empty:
+                        pass
+
+
+class RedisBroker:
+    """Fan-out across worker processes through a Redis channel
+
+    Each process relays the channel into a LocalBroker, so a process holds one
+    Redis connection no matter how many SSE clients it serves.
+    """
+
+    def __init__(self, url, channel='unievent:changes', queue_size=256):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("PUBSUB_BACKEND='redis' requires the redis package")
+        self._client = redis.Redis.from_url(url)
+        self.channel = channel
+        self._local = LocalBroker(queue_size)
+        self._relay = None
+        self._relay_lock = threading.Lock()
+
+    def _start_relay(self):
+        with self._relay_lock:
+            if self._relay is not None:
+                return
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+
+            def relay():
+                for item in pubsub.listen():
+                    self._local.publish(json.loads(item['data']))
+
+            self._relay = threading.Thread(target=relay, name='pubsub-relay', daemon=True)
+            self._relay.start()
+
+    def subscribe(self):
+        self._start_relay()
+        return self._local.subscribe()
+
+    def unsubscribe(self, subscription):
+        self._local.unsubscribe(subscription)
+
+    def publish(self, message):
+        self._client.publish(self.channel, json.dumps(message))
+
+
+class ChangeFeed:
+    """Publishes compact change notifications for the SSE stream
+
+    A notification is {'entity', 'id', 'version', 'counters'}; version is a
+    nanosecond timestamp so clients can drop out-of-order deltas.
+    """
+
+    def __init__(self, app=None):
+        self.broker = LocalBroker()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PUBSUB_BACKEND', 'local')
+        app.config.setdefault('PUBSUB_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('PUBSUB_QUEUE_SIZE', 256)
+
+        if app.config['PUBSUB_BACKEND'] == 'redis':
+            self.broker = RedisBroker(app.config['PUBSUB_REDIS_URL'], queue_size=app.config['PUBSUB_QUEUE_SIZE'])
+        else:
+            self.broker = LocalBroker(app.config['PUBSUB_QUEUE_SIZE'])
+        app.extensions['change_feed'] = self
+
+    def publish(self, entity, entity_id, **counters):
+        message = {
+            'entity': entity,
+            'id': entity_id,
+            'version': time.time_ns(),
+            'counters': counters
+        }
+        try:
+            self.broker.publish(message)
+        except Exception:
+            # Notifications are best-effort; the write itself already committed
+            logging.getLogger(__name__).warning('Change feed publish failed', exc_info=True)
+        return message
+
+    def subscribe(self):
+        return self.broker.subscribe()
+
+
+change_feed = ChangeFeed()
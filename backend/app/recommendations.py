@@ -0,0 +1,202 @@
+import math
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import datetime, timedelta
+from app.jobs import jobs
+from app.models import db, Event, EventNeighbor, Job, user_likes_events
+
+
+class Recommender:
+    """Item-item "people who liked this also liked" recommendations
+
+    Co-like counts come from a self-join of user_likes_events grouped by
+    event pair, computed for a batch of events per query, and are
+    normalized to cosine similarity with the likes_count counters. Each
+    event keeps its best RECOMMENDATION_NEIGHBORS neighbors in
+    event_neighbors, which the refresh_recommendations job rewrites every
+    RECOMMENDATION_REFRESH_INTERVAL seconds for the events that gained or
+    lost likes since the previous run started. Requests only read that
+    table and fall back to popular events until it has neighbors for what
+    the user liked.
+    Per-user results are cached for one refresh interval and dropped when
+    that user likes or unlikes something.
+    """
+
+    def __init__(self, app=None):
+        self._user_cache = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RECOMMENDATION_NEIGHBORS', 20)
+        app.config.setdefault('RECOMMENDATION_BATCH_SIZE', 500)
+        app.config.setdefault('RECOMMENDATION_REFRESH_INTERVAL', 300)
+        app.config.setdefault('RECOMMENDATION_CACHE_SIZE', 10000)
+        app.config.setdefault('RECOMMENDATION_WINDOW_OVERLAP', 60)
+
+        self.neighbors_per_event = app.config['RECOMMENDATION_NEIGHBORS']
+        self.batch_size = app.config['RECOMMENDATION_BATCH_SIZE']
+        self.refresh_interval = app.config['RECOMMENDATION_REFRESH_INTERVAL']
+        self.cache_size = app.config['RECOMMENDATION_CACHE_SIZE']
+        self.window_overlap = app.config['RECOMMENDATION_WINDOW_OVERLAP']
+        app.extensions['recommender'] = self
+
+    def _compute_neighbors(self, event_ids):
+        """Top neighbors for a batch of events from one grouped self-join"""
+        a = user_likes_events.alias('a')
+        b = user_likes_events.alias('b')
+        rows = db.session.execute(
+            db.select(a.c.event_id, b.c.event_id, db.func.count())
+            .join(b, db.and_(a.c.user_id == b.c.user_id, a.c.event_id != b.c.event_id))
+            .where(a.c.event_id.in_(event_ids))
+            .group_by(a.c.event_id, b.c.event_id)
+        ).all()
+
+        co_likes = defaultdict(list)
+        involved = set(event_ids)
+        for event_id, other_id, count in rows:
+            co_likes[event_id].append((other_id, count))
+            involved.add(other_id)
+
+        totals = dict(db.session.execute(
+            db.select(Event.id, Event.likes_count).where(Event.id.in_(involved))
+        ).all())
+
+        result = {}
+        for event_id in event_ids:
+            own = totals.get(event_id) or 0
+            scored = [
+                (count / math.sqrt(own * (totals.get(other_id) or count)), other_id)
+                for other_id, count in co_likes.get(event_id, ())
+                if own
+            ]
+            scored.sort(reverse=True)
+            result[event_id] = scored[:self.neighbors_per_event]
+        return result
+
+    def refresh(self, since=None):
+        """Recompute neighbors of the events liked or unliked since a time, or of every liked event
+
+        since is when the previous refresh started; likes are looked up from
+        RECOMMENDATION_WINDOW_OVERLAP seconds before it, so a like stamped
+        before that start but committed after it is still seen. Runs in the
+        caller's transaction (the job's, or the CLI command's); returns how
+        many events were recomputed.
+        """
+        now = datetime.utcnow()
+        query = db.select(user_likes_events.c.event_id).distinct()
+        if since is not None:
+            # A new like changes the pair (liked event, every other event of that user)
+            recent = user_likes_events.alias('recent')
+            query = query.join(recent, recent.c.user_id == user_likes_events.c.user_id).where(
+                recent.c.created_at > since - timedelta(seconds=self.window_overlap)
+            )
+        changed = {row[0] for row in db.session.execute(query)}
+
+        # Unlikes delete their rows, so they are only known through the counter toggle_like bumps
+        counted = db.session.execute(db.select(Event.id, Event.like_changes).where(Event.like_changes > 0)).all()
+        changed = list(changed | {event_id for event_id, _ in counted})
+
+        for start in range(0, len(changed), self.batch_size):
+            batch = changed[start:start + self.batch_size]
+            neighbors = self._compute_neighbors(batch)
+            db.session.execute(db.delete(EventNeighbor).where(EventNeighbor.event_id.in_(batch)))
+            rows = [
+                {'event_id': event_id, 'neighbor_id': other_id, 'score': score, 'computed_at': now}
+                for event_id, best in neighbors.items() for score, other_id in best
+            ]
+            if rows:
+                db.session.execute(db.insert(EventNeighbor), rows)
+        if counted:
+            # Subtract what was read rather than zeroing, so changes made meanwhile count next time
+            table = Event.__table__
+            db.session.execute(
+                db.update(table).where(table.c.id == db.bindparam('event_id'))
+                .values(like_changes=table.c.like_changes - db.bindparam('seen')),
+                [{'event_id': event_id, 'seen': count} for event_id, count in counted]
+            )
+        return len(changed)
+
+    def schedule(self, delay=0, since=None):
+        """Queue a refresh_recommendations job unless one is already waiting
+
+        since (the start of the refresh queuing it) limits the next run to
+        likes from then on; without it the next run recomputes every event.
+        """
+        waiting = db.select(Job.id).where(Job.name == 'refresh_recommendations', Job.status == 'pending').exists()
+        if not db.session.execute(db.select(waiting)).scalar():
+            payload = {'since': since.isoformat()} if since is not None else None
+            jobs.enqueue('refresh_recommendations', payload, delay=delay)
+
+    def note_like_change(self, user_id, event_id):
+        """Drop the user's cached results; the event itself is recomputed by the next refresh"""
+        with self._lock:
+            self._user_cache.pop(user_id, None)
+
+    def _popular_by_category(self, exclude, limit):
+        """Cold-start fallback: the most liked upcoming events, round-robin across categories"""
+        rows = db.session.execute(
+            db.select(Event.id, Event.category, Event.likes_count)
+            .where(Event.is_published.is_(True), Event.event_date > datetime.utcnow())
+            .order_by(Event.likes_count.desc(), Event.event_date)
+            .limit(limit * 10)
+        ).all()
+        by_category = OrderedDict()
+        for row in rows:
+            if row.id not in exclude:
+                by_category.setdefault(row.category or '', []).append((row.id, float(row.likes_count)))
+
+        picks = []
+        while by_category and len(picks) < limit:
+            for category in list(by_category):
+                picks.append(by_category[category].pop(0))
+                if not by_category[category]:
+                    del by_category[category]
+                if len(picks) == limit:
+                    break
+        return picks
+
+    def recommend(self, user_id, limit=10):
+        """(event_id, score) pairs for a user, best first"""
+        with self._lock:
+            cached = self._user_cache.get(user_id)
+            if cached is not None and cached[0] >= limit and cached[1] > time.monotonic():
+                self._user_cache.move_to_end(user_id)
+                return cached[2][:limit]
+
+        liked = {row[0] for row in db.session.execute(
+            db.select(user_likes_events.c.event_id).where(user_likes_events.c.user_id == user_id)
+        )}
+
+        picks = []
+        if liked:
+            # Sum the precomputed neighbor scores of everything the user liked, live events only
+            total = db.func.sum(EventNeighbor.score).label('score')
+            picks = [(row.neighbor_id, row.score) for row in db.session.execute(
+                db.select(EventNeighbor.neighbor_id, total)
+                .join(Event, Event.id == EventNeighbor.neighbor_id)
+                .where(
+                    EventNeighbor.event_id.in_(liked),
+                    EventNeighbor.neighbor_id.not_in(liked),
+                    Event.is_published.is_(True),
+                    Event.event_date > datetime.utcnow()
+                )
+                .group_by(EventNeighbor.neighbor_id)
+                .order_by(total.desc(), EventNeighbor.neighbor_id)
+                .limit(limit)
+            )]
+        if len(picks) < limit:
+            seen = liked | {event_id for event_id, _ in picks}
+            picks += [(event_id, 0.0) for event_id, _ in self._popular_by_category(seen, limit - len(picks))]
+
+        with self._lock:
+            self._user_cache[user_id] = (limit, time.monotonic() + self.refresh_interval, picks)
+            self._user_cache.move_to_end(user_id)
+            while len(self._user_cache) > self.cache_size:
+                self._user_cache.popitem(last=False)
+        return picks
+
+
+recommender = Recommender()
@@ -1,54 +1,124 @@
-from flask import Blueprint, request, jsonify, send_from_directory
-from app.models import db, User, Society, Event, Comment
+from flask import Blueprint, Response, current_app, request, jsonify
+from app.models import db, User, Society, Event, Comment, user_follows_categories, user_follows_societies
+from app.cache import response_cache
+from app.assets import assets
+from app.media import InvalidImage, image_url, media, variant_url
+from app.jobs import jobs
+from app.pubsub import change_feed
+from app.trending import trending
+from app.recommendations import recommender
+from app import search
+from app.digests import add_category_follow, add_society_follow, list_follows, normalize_category, remove_follow
+from app.memberships import (
+    APPROVED, PENDING, REVIEW_MAX_REQUESTS, list_members, membership_status, remove_membership, request_membership, review
+)
+from app.hashing import HashingBusy
+from app.tokens import (
+    current_principal, issue_token_pair, login_required, principal_cache,
+    revoke_refresh_token, role_required, rotate_refresh_token
+)
+from app.view_counter import view_counter
+from app import bulk
+from app.ical import ical_response
+from app.streaming import stream_format, stream_query
+from app.projections import COMMENT_PROJECTION, EVENT_PROJECTION, SOCIETY_PROJECTION, dumps, json_response
+from app.pagination import InvalidCursor, decode_cursor, encode_cursor, get_page_size, paginated_response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import joinedload
 from datetime import datetime
-import os
+import concurrent.futures
 
 main = Blueprint('main', __name__)
 
-# Get the frontend directory path
-FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'frontend')
 
-# Serve HTML pages from frontend folder
+def parse_date_arg(value, end_of_day=False):
+    """Parse a YYYY-MM-DD or ISO datetime query argument; date-only upper bounds cover the whole day"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if end_of_day and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed
+
+
+EVENT_STATUSES = ('upcoming', 'past')
+
+
+def filter_events(query, args, now):
+    """Apply ?from=&to=&category=&society_id=&status= to an Event query in SQL
+
+    Equality filters lead so the (category, event_date) and (society_id, event_date)
+    indexes turn the date window into a single range scan. Raises ValueError on bad input.
+    """
+    date_from = parse_date_arg(args.get('from'))
+    date_to = parse_date_arg(args.get('to'), end_of_day=True)
+    status = args.get('status')
+    if status and status not in EVENT_STATUSES:
+        raise ValueError(f'status must be one of {", ".join(EVENT_STATUSES)}')
+    
+    if args.get('category'):
+        query = query.filter(Event.category == args['category'])
+    if args.get('society_id'):
+        query = query.filter(Event.society_id == int(args['society_id']))
+    if date_from:
+        query = query.filter(Event.event_date >= date_from)
+    if date_to:
+        query = query.filter(Event.event_date <= date_to)
+    if status == 'upcoming':
+        query = query.filter(Event.event_date > now)
+    elif status == 'past':
+        query = query.filter(Event.event_date <= now)
+    return query, status
+
+
+# Serve HTML pages from frontend folder (asset references rewritten to fingerprinted URLs, see assets.py)
 @main.route('/')
 def index():
-    return send_from_directory(FRONTEND_DIR, 'app.html')
+    return assets.send_page('app.html')
 @main.route('/login')
 def login_user():
-    return send_from_directory(FRONTEND_DIR, 'login-signup.html')
+    return assets.send_page('login-signup.html')
 
 @main.route('/dashboard')
 def dashboard():
-    return send_from_directory(FRONTEND_DIR, 'dashboard.html')
+    return assets.send_page('dashboard.html')
 @main.route('/society-register')
 def society_register():
-    return send_from_directory(FRONTEND_DIR, 'societyRegForm.html')
+    return assets.send_page('societyRegForm.html')
 
 @main.route('/app')
 def app_page():
-    return send_from_directory(FRONTEND_DIR, 'app.html')
+    return assets.send_page('app.html')
 
 @main.route('/join-society')
 def join_society():
-    return send_from_directory(FRONTEND_DIR, 'join-society.html')
+    return assets.send_page('join-society.html')
 
 @main.route('/society-form')
 def society_form():
-    return send_from_directory(FRONTEND_DIR, 'societyRegForm.html')
+    return assets.send_page('societyRegForm.html')
 
-# Serve CSS files
+# Serve CSS files (precompressed, immutable when requested by hashed name)
 @main.route('/style/<path:filename>')
 def serve_css(filename):
-    css_dir = os.path.join(FRONTEND_DIR, 'style')
-    return send_from_directory(css_dir, filename)
+    return assets.send_asset('style', filename)
 
 @main.route('/societyRegForm.html')
 def society_reg_form_html():
-    return send_from_directory(FRONTEND_DIR, 'societyRegForm.html')
+    return assets.send_page('societyRegForm.html')
 # Serve JS files
 @main.route('/script/<path:filename>')
 def serve_js(filename):
-    js_dir = os.path.join(FRONTEND_DIR, 'script')
-    return send_from_directory(js_dir, filename)
+    return assets.send_asset('script', filename)
+
+# Serve uploaded images and their WebP variants (content-addressed, Range/ETag via send_file)
+@main.route('/media/<image_id>')
+def serve_media(image_id):
+    return media.send(image_id)
+
+@main.route('/media/<image_id>/<variant>.webp')
+def serve_media_variant(image_id, variant):
+    return media.send(image_id, variant)
 
 # ==================== AUTH ROUTES ====================
 
@@ -73,7 +143,8 @@ def register():
             email=data['email'],
             first_name=data.get('first_name', ''),
             last_name=data.get('last_name', ''),
-            role=data.get('role', 'student')
+            # Elevated roles come from society registration or an admin, never from signup
+            role='student'
         )
         user.set_password(data['password'])
         
@@ -85,6 +156,12 @@ def register():
             'user_id': user.id
         }), 201
         
+    except HashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
+    except concurrent.futures.TimeoutError:
+        db.session.rollback()
+        return jsonify({'error': 'Password check timed out, please retry shortly'}), 503, {'Retry-After': '5'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
@@ -106,27 +183,58 @@ def login():
         
         # Verify password
         if user.check_password(data['password']):
+            # Upgrade hashes made with older cost parameters while we have the plaintext
+            if user.password_needs_rehash():
+                user.set_password(data['password'])
+            tokens = issue_token_pair(user)
+            db.session.commit()
             return jsonify({
                 'message': 'Login successful',
-                'user': user.to_dict(include_email=True, include_society=True)
+                'user': user.to_dict(include_email=True, include_society=True),
+                **tokens
             }), 200
         else:
             return jsonify({'error': 'Invalid email or password'}), 401
             
+    except HashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 429, {'Retry-After': '1'}
+    except concurrent.futures.TimeoutError:
+        db.session.rollback()
+        return jsonify({'error': 'Password check timed out, please retry shortly'}), 503, {'Retry-After': '5'}
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': 'Something went wrong. Please try again.'}), 400
 
+# Exchange a refresh token for a new access/refresh pair (the old refresh token is spent)
+@main.route('/api/token/refresh', methods=['POST'])
+def refresh_token():
+    jti = request.form.get('refresh_token', '')
+    tokens = rotate_refresh_token(jti)
+    db.session.commit()
+    if tokens is None:
+        return jsonify({'error': 'Invalid or expired refresh token'}), 401
+    return jsonify(tokens), 200
+
+# Logout (revokes the refresh token; access tokens expire on their own)
+@main.route('/api/logout', methods=['POST'])
+def logout():
+    revoke_refresh_token(request.form.get('refresh_token', ''))
+    db.session.commit()
+    return jsonify({'message': 'Logged out'}), 200
+
 # ==================== SOCIETY ROUTES ====================
 
 # Create Society
 @main.route('/api/societies', methods=['POST'])
+@login_required
 def create_society():
     data = request.form
     try:
-        user_id = data.get('user_id')
+        user_id = current_principal().id
         
         # Check if user exists
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
@@ -155,11 +263,16 @@ def create_society():
         
         db.session.add(society)
         db.session.commit()
+        response_cache.invalidate('societies')
+        # Only this process's entry; elsewhere the new token's role forces a re-read (see PrincipalCache.get)
+        principal_cache.invalidate(user_id)
+        change_feed.publish('society', society.id, is_verified=False)
         
         return jsonify({
             'message': 'Society registered successfully. Pending admin approval.',
             'society': society.to_dict(),
-            'user': user.to_dict(include_email=True, include_society=True)
+            'user': user.to_dict(include_email=True, include_society=True),
+            **issue_token_pair(user)
         }), 201
         
     except Exception as e:
@@ -168,11 +281,16 @@ def create_society():
 
 # Verify Society (Admin only)
 @main.route('/api/societies/<int:society_id>/verify', methods=['POST'])
+@role_required('admin')
 def verify_society(society_id):
     try:
         society = Society.query.get_or_404(society_id)
+        if not society.is_verified:
+            jobs.enqueue('society_verified', {'society_id': society_id}, key=f'society-verified:{society_id}')
         society.is_verified = True
         db.session.commit()
+        response_cache.invalidate('societies', f'society:{society_id}')
+        change_feed.publish('society', society_id, is_verified=True)
         
         return jsonify({
             'message': 'Society verified successfully',
@@ -183,30 +301,75 @@ def verify_society(society_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
     
-# Get All Societies
+# Get All Societies (?verified=true|false, keyset paginated on id, ?format=ndjson|stream for exports)
 @main.route('/api/societies', methods=['GET'])
+@response_cache.cached('societies')
 def get_societies():
-    societies = Society.query.filter_by(is_active=True).all()
-    return jsonify([s.to_dict(include_event_count=True) for s in societies]), 200
+    limit = get_page_size(request.args, default=50, maximum=200)
+    try:
+        names = SOCIETY_PROJECTION.resolve(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query, serialize = SOCIETY_PROJECTION.query(names, datetime.utcnow())
+    query = query.filter(Society.is_active.is_(True))
+    
+    verified = request.args.get('verified')
+    if verified is not None:
+        query = query.filter(Society.is_verified.is_(verified.lower() in ('1', 'true', 'yes')))
+    
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            (last_id,) = decode_cursor(cursor)
+        except (InvalidCursor, ValueError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(Society.id > last_id)
+    query = query.order_by(Society.id)
+    
+    fmt = stream_format(request.args)
+    if fmt:
+        return stream_query(query, lambda batch: [serialize(row) for row in batch], fmt, dumps=dumps)
+    
+    societies = [serialize(row) for row in query.limit(limit + 1)]
+    next_cursor = None
+    if len(societies) > limit:
+        societies = societies[:limit]
+        next_cursor = encode_cursor(societies[-1]['id'])
+    
+    return paginated_response(json_response(societies), next_cursor), 200
 
 # Get Single Society
 @main.route('/api/societies/<int:society_id>', methods=['GET'])
+@response_cache.cached('society:{society_id}')
 def get_society(society_id):
-    society = Society.query.get_or_404(society_id)
+    society = Society.query.options(joinedload(Society.user)).filter_by(id=society_id).first_or_404()
     return jsonify(society.to_dict(include_owner=True, include_event_count=True)), 200
 
 # ==================== EVENT ROUTES ====================
 
 # Create Event
 @main.route('/api/events', methods=['POST'])
+@role_required('society', 'admin')
 def create_event():
     data = request.form
+    poster = request.files.get('poster')
+    stored = None
     try:
+        principal = current_principal()
+        if principal.role != 'admin':
+            owns_society = db.session.query(
+                Society.query.filter_by(id=data['society_id'], user_id=principal.id).exists()
+            ).scalar()
+            if not owns_society:
+                return jsonify({'error': 'You can only create events for your own society'}), 403
+        
         event_date_raw = data['event_date']
         # If date is just YYYY-MM-DD, add time so isoformat doesn't crash
         if len(event_date_raw) == 10:
             event_date_raw += "T00:00:00"
         
+        if poster:
+            stored = _store_image(poster.stream)
         event = Event(
             society_id=data['society_id'],
             title=data['title'],
@@ -215,10 +378,15 @@ def create_event():
             category=data.get('category', ''),
             event_date=datetime.fromisoformat(event_date_raw),
             venue=data.get('venue', ''),
+            poster=image_url(stored[0]) if stored else None,
             google_form_link=data.get('google_form_link', '')
             )
         db.session.add(event)
+        db.session.flush()
+        jobs.enqueue('fan_out_events', {'event_ids': [event.id]})
         db.session.commit()
+        response_cache.invalidate('events', 'societies', f'society:{event.society_id}')
+        change_feed.publish('event', event.id, likes_count=0, comments_count=0)
         
         return jsonify({
             'message': 'Event created successfully',
@@ -227,60 +395,578 @@ def create_event():
         
     except Exception as e:
         db.session.rollback()
+        _discard_image(stored)
+        return jsonify({'error': str(e)}), 400
+
+def _uploaded_image():
+    """The request's image stream: a multipart 'file' or the raw body"""
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('file')
+        if upload is None:
+            raise InvalidImage('No image uploaded')
+        return upload.stream
+    return request.stream
+
+def _store_image(stream):
+    """Store an upload and queue its variants with the caller's commit; returns (image_id, created)"""
+    image_id, created = media.store(stream)
+    jobs.enqueue('render_image_variants', {'image_id': image_id}, key=f'image-variants:{image_id}')
+    return image_id, created
+
+def _discard_image(stored):
+    """Undo _store_image when the caller's commit failed; files that were already there stay"""
+    if stored and stored[1]:
+        media.discard(stored[0])
+
+def _image_urls(url):
+    return {
+        'url': url,
+        'thumbnail': variant_url(url, 'thumbnail'),
+        'large': variant_url(url, 'large')
+    }
+
+# Upload Image (multipart 'file' or raw body; identical bytes share one URL, e.g. for logo_url/cover_image)
+@main.route('/api/media', methods=['POST'])
+@role_required('society', 'admin')
+def upload_media():
+    try:
+        image_id, created = _store_image(_uploaded_image())
+        db.session.commit()
+    except InvalidImage as e:
         return jsonify({'error': str(e)}), 400
+    return jsonify({**_image_urls(image_url(image_id)), 'created': created}), 201 if created else 200
 
-# Get All Events
+# Replace Event Poster
+@main.route('/api/events/<int:event_id>/poster', methods=['POST'])
+@role_required('society', 'admin')
+def upload_event_poster(event_id):
+    principal = current_principal()
+    query = db.select(Event.society_id).where(Event.id == event_id)
+    if principal.role != 'admin':
+        query = query.join(Society, Society.id == Event.society_id).where(Society.user_id == principal.id)
+    society_id = db.session.execute(query).scalar()
+    if society_id is None:
+        return jsonify({'error': 'Event not found'}), 404
+    
+    stored = None
+    try:
+        stored = _store_image(_uploaded_image())
+        url = image_url(stored[0])
+        db.session.execute(
+            db.update(Event)
+            .where(Event.id == event_id)
+            .values(poster=url, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except InvalidImage as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        _discard_image(stored)
+        return jsonify({'error': str(e)}), 400
+    
+    response_cache.invalidate('events', f'event:{event_id}', f'society:{society_id}')
+    return jsonify({'message': 'Poster updated', 'poster': _image_urls(url)}), 200
+
+# Bulk Import Events (CSV or NDJSON body, or a multipart 'file'; societies import into their own society)
+@main.route('/api/events/bulk', methods=['POST'])
+@role_required('society', 'admin')
+def bulk_import_events():
+    principal = current_principal()
+    forced_society_id = None
+    if principal.role != 'admin':
+        forced_society_id = db.session.execute(
+            db.select(Society.id).where(Society.user_id == principal.id)
+        ).scalar()
+        if forced_society_id is None:
+            return jsonify({'error': 'Society profile not found'}), 403
+    
+    upload = request.files.get('file') if request.mimetype == 'multipart/form-data' else None
+    if upload:
+        stream = upload.stream
+        fmt = request.args.get('format') or ('csv' if upload.filename.lower().endswith('.csv') else 'ndjson')
+    else:
+        stream = request.stream
+        fmt = request.args.get('format') or ('csv' if request.mimetype == 'text/csv' else 'ndjson')
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    
+    try:
+        report, touched = bulk.import_events(bulk.read_rows(stream, fmt), forced_society_id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    
+    if report.imported:
+        response_cache.invalidate('events', 'societies', *(f'society:{sid}' for sid in touched))
+        change_feed.publish('event_batch', None, imported=report.imported)
+    return jsonify(report.to_dict()), 201 if report.imported else 400
+
+# Bulk Export Events (?format=csv|ndjson, streamed; societies export their own events)
+@main.route('/api/events/export', methods=['GET'])
+@role_required('society', 'admin')
+def bulk_export_events():
+    fmt = request.args.get('format', 'csv')
+    if fmt not in bulk.EXPORT_FORMATS:
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    
+    principal = current_principal()
+    if principal.role == 'admin':
+        society_id = request.args.get('society_id', type=int)
+    else:
+        society_id = db.session.execute(
+            db.select(Society.id).where(Society.user_id == principal.id)
+        ).scalar()
+        if society_id is None:
+            return jsonify({'error': 'Society profile not found'}), 403
+    return bulk.export_events(fmt, society_id)
+
+def _event_views_tag(**kwargs):
+    """Cache tag for event lists that include view_count, which changes on every view-counter flush"""
+    try:
+        names = EVENT_PROJECTION.resolve(request.args)
+    except ValueError:
+        return None
+    return 'event-views' if 'view_count' in names else None
+
+# Get All Events (keyset paginated on event_date, id, ?format=ndjson|stream for exports)
 @main.route('/api/events', methods=['GET'])
+@response_cache.cached('events', 'societies', _event_views_tag)
 def get_events():
-    events = Event.query.filter_by(is_published=True).order_by(Event.event_date.desc()).all()
-    return jsonify([e.to_dict(include_organizer=True) for e in events]), 200
+    limit = get_page_size(request.args)
+    now = datetime.utcnow()
+    try:
+        names = EVENT_PROJECTION.resolve(request.args)
+        query, serialize = EVENT_PROJECTION.query(names, now, keys=(Event.event_date, Event.id))
+        query, status = filter_events(query.filter(Event.is_published.is_(True)), request.args, now)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Upcoming events read soonest first; everything else newest first
+    ascending = status == 'upcoming'
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            last_date, last_id = decode_cursor(cursor)
+            last_date = datetime.fromisoformat(last_date)
+        except (InvalidCursor, ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        if ascending:
+            query = query.filter(or_(
+                Event.event_date > last_date,
+                and_(Event.event_date == last_date, Event.id > last_id)
+            ))
+        else:
+            query = query.filter(or_(
+                Event.event_date < last_date,
+                and_(Event.event_date == last_date, Event.id < last_id)
+            ))
+    if ascending:
+        query = query.order_by(Event.event_date.asc(), Event.id.asc())
+    else:
+        query = query.order_by(Event.event_date.desc(), Event.id.desc())
+    
+    fmt = stream_format(request.args)
+    if fmt:
+        return stream_query(query, lambda batch: [serialize(row) for row in batch], fmt, dumps=dumps)
+    
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_date, last_id = rows[-1][-2:]
+        next_cursor = encode_cursor(last_date.isoformat(), last_id)
+    
+    return paginated_response(json_response([serialize(row) for row in rows]), next_cursor), 200
+
+# iCal Feed (same filters as GET /api/events, streamed in date order)
+@main.route('/api/events/calendar.ics', methods=['GET'])
+def events_calendar():
+    query = Event.query.options(joinedload(Event.organizer)).filter_by(is_published=True)
+    try:
+        query, _ = filter_events(query, request.args, datetime.utcnow())
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query = query.order_by(Event.event_date.asc(), Event.id.asc())
+    return ical_response(query, request.host)
+
+# Full-text Event Search (?q=&category=&from=&to=, ranked by BM25; 'search' is bumped when the index job commits)
+@main.route('/api/events/search', methods=['GET'])
+@response_cache.cached('search', 'events', 'societies', _event_views_tag)
+def search_events():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+    
+    try:
+        date_from = parse_date_arg(request.args.get('from'))
+        date_to = parse_date_arg(request.args.get('to'), end_of_day=True)
+        offset = int(decode_cursor(request.args['cursor'])[0]) if request.args.get('cursor') else 0
+    except (InvalidCursor, ValueError, TypeError):
+        return jsonify({'error': 'Invalid date or cursor'}), 400
+    
+    try:
+        names = EVENT_PROJECTION.resolve(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    limit = get_page_size(request.args)
+    ids = search.search_event_ids(
+        q,
+        category=request.args.get('category') or None,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit + 1,
+        offset=offset
+    )
+    next_cursor = encode_cursor(offset + limit) if len(ids) > limit else None
+    ids = ids[:limit]
+    
+    events = EVENT_PROJECTION.by_id(names, ids, datetime.utcnow())
+    response = json_response([events[i] for i in ids if i in events])
+    return paginated_response(response, next_cursor), 200
+
+# Trending Events (?category=&society_id=&limit=, served from the precomputed ranking)
+# Each refresh bumps 'trending'; the short TTL covers per-process caches that a worker process cannot reach
+@main.route('/api/events/trending', methods=['GET'])
+@response_cache.cached('trending', 'events', 'societies', _event_views_tag, ttl=30)
+def trending_events():
+    try:
+        names = EVENT_PROJECTION.resolve(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    ranked = trending.top(
+        limit=get_page_size(request.args, default=10, maximum=50),
+        category=request.args.get('category') or None,
+        society_id=request.args.get('society_id', type=int)
+    )
+    events = EVENT_PROJECTION.by_id(names, [event_id for event_id, _ in ranked], datetime.utcnow())
+    
+    results = []
+    for event_id, score in ranked:
+        if event_id in events:
+            data = events[event_id]
+            data['trending_score'] = round(score, 3)
+            results.append(data)
+    return json_response(results)
+
+def _views_flushed(deltas):
+    """View-counter flush listener: only event details and lists that asked for view_count carry it"""
+    response_cache.invalidate('event-views', *(f'event:{event_id}' for event_id in deltas))
 
-# Get Single Event
+view_counter.add_flush_listener(_views_flushed)
+
+# Get Single Event (views are counted even when the body comes from cache; view_count lags by one flush)
 @main.route('/api/events/<int:event_id>', methods=['GET'])
 def get_event(event_id):
+    # make_response: with caching disabled the view's (body, status) tuple comes back as-is
+    response = current_app.make_response(_event_detail(event_id=event_id))
+    if response.status_code in (200, 304):
+        view_counter.increment(event_id)
+    return response
+
+@response_cache.cached('event:{event_id}', 'societies')
+def _event_detail(event_id):
     event = Event.query.get_or_404(event_id)
-    event.increment_view()
     return jsonify(event.to_dict(include_organizer=True, include_comments=True)), 200
 
 # Like/Unlike Event
 @main.route('/api/events/<int:event_id>/like', methods=['POST'])
+@login_required
 def like_event(event_id):
-    data = request.form
     try:
-        user = User.query.get_or_404(data['user_id'])
-        event = Event.query.get_or_404(event_id)
-        
-        if event in user.liked_events:
-            user.liked_events.remove(event)
-            message = 'Event unliked'
-        else:
-            user.liked_events.append(event)
-            message = 'Event liked'
+        result = Event.toggle_like(current_principal().id, event_id)
+        if result is None:
+            db.session.rollback()
+            return jsonify({'error': 'Event not found'}), 404
         
+        liked, likes_count = result
         db.session.commit()
+        recommender.note_like_change(current_principal().id, event_id)
+        response_cache.invalidate('events', f'event:{event_id}')
+        change_feed.publish('event', event_id, likes_count=likes_count)
         return jsonify({
-            'message': message,
-            'likes_count': event.liked_by.count()
+            'message': 'Event liked' if liked else 'Event unliked',
+            'likes_count': likes_count
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
+# ==================== USER ROUTES ====================
+
+# Personalized Event Recommendations (own account, or any account for admins)
+@main.route('/api/users/<int:user_id>/recommendations', methods=['GET'])
+@login_required
+def user_recommendations(user_id):
+    principal = current_principal()
+    if principal.id != user_id and principal.role != 'admin':
+        return jsonify({'error': 'You do not have permission to do this'}), 403
+    try:
+        names = EVENT_PROJECTION.resolve(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    ranked = recommender.recommend(user_id, limit=get_page_size(request.args, default=10, maximum=50))
+    events = EVENT_PROJECTION.by_id(names, [event_id for event_id, _ in ranked], datetime.utcnow())
+    
+    results = []
+    for event_id, score in ranked:
+        if event_id in events:
+            data = events[event_id]
+            data['recommendation_score'] = round(score, 3)
+            results.append(data)
+    return json_response(results)
+
+# ==================== FOLLOW ROUTES ====================
+
+# Follow / Unfollow Society (new events reach followers in batched digests, see digests.py)
+@main.route('/api/societies/<int:society_id>/follow', methods=['POST'])
+@login_required
+def follow_society(society_id):
+    try:
+        added = add_society_follow(current_principal().id, society_id)
+        if added is None:
+            db.session.rollback()
+            return jsonify({'error': 'Society not found'}), 404
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'following': True}), 201 if added else 200
+
+@main.route('/api/societies/<int:society_id>/follow', methods=['DELETE'])
+@login_required
+def unfollow_society(society_id):
+    removed = remove_follow(user_follows_societies, current_principal().id, 'society_id', society_id)
+    db.session.commit()
+    return jsonify({'following': False, 'removed': removed}), 200
+
+# Follow / Unfollow Category (case-insensitive, e.g. /api/categories/tech/follow)
+@main.route('/api/categories/<category>/follow', methods=['POST'])
+@login_required
+def follow_category(category):
+    try:
+        category = normalize_category(category)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        added = add_category_follow(current_principal().id, category)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'following': True, 'category': category}), 201 if added else 200
+
+@main.route('/api/categories/<category>/follow', methods=['DELETE'])
+@login_required
+def unfollow_category(category):
+    try:
+        category = normalize_category(category)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    removed = remove_follow(user_follows_categories, current_principal().id, 'category', category)
+    db.session.commit()
+    return jsonify({'following': False, 'category': category, 'removed': removed}), 200
+
+# List Follows (own account, or any account for admins)
+@main.route('/api/users/<int:user_id>/follows', methods=['GET'])
+@login_required
+def user_follows(user_id):
+    principal = current_principal()
+    if principal.id != user_id and principal.role != 'admin':
+        return jsonify({'error': 'You do not have permission to do this'}), 403
+    return jsonify(list_follows(user_id)), 200
+
+# ==================== MEMBERSHIP ROUTES ====================
+
+def _manages_society(society_id):
+    """Whether the caller is an admin or owns the society"""
+    principal = current_principal()
+    query = db.select(Society.id).where(Society.id == society_id)
+    if principal is None:
+        return False
+    if principal.role != 'admin':
+        query = query.where(Society.user_id == principal.id)
+    return db.session.execute(query).scalar() is not None
+
+def _publish_member_counts(member_counts):
+    if not member_counts:
+        return
+    response_cache.invalidate('societies', *(f'society:{society_id}' for society_id in member_counts))
+    for society_id, member_count in member_counts.items():
+        change_feed.publish('society', society_id, member_count=member_count)
+
+# Request to Join / Leave Society (requests stay pending until the owner or an admin approves them)
+@main.route('/api/societies/<int:society_id>/membership', methods=['POST'])
+@login_required
+def join_society_request(society_id):
+    try:
+        status, created = request_membership(current_principal().id, society_id)
+        if status is None:
+            db.session.rollback()
+            return jsonify({'error': 'Society not found'}), 404
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'status': status}), 201 if created else 200
+
+@main.route('/api/societies/<int:society_id>/membership', methods=['DELETE'])
+@login_required
+def leave_society(society_id):
+    try:
+        status, member_count = remove_membership(society_id, current_principal().id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    if member_count is not None:
+        _publish_member_counts({society_id: member_count})
+    return jsonify({'status': None, 'removed': status is not None}), 200
+
+# List Members (?status=pending for the owner or admins; keyset paginated on user id)
+@main.route('/api/societies/<int:society_id>/members', methods=['GET'])
+def get_society_members(society_id):
+    limit = get_page_size(request.args, default=50, maximum=200)
+    status = request.args.get('status', APPROVED)
+    if status not in (APPROVED, PENDING):
+        return jsonify({'error': f'status must be {APPROVED} or {PENDING}'}), 400
+    if status == PENDING and not _manages_society(society_id):
+        return jsonify({'error': 'You do not have permission to do this'}), 403
+    
+    after = 0
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            (after,) = decode_cursor(cursor)
+            after = int(after)
+        except (InvalidCursor, ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+    
+    members = list_members(society_id, status, after, limit + 1)
+    next_cursor = None
+    if len(members) > limit:
+        members = members[:limit]
+        next_cursor = encode_cursor(members[-1]['id'])
+    return paginated_response(json_response(members), next_cursor), 200
+
+# Approve Join Request (society owner or admin)
+@main.route('/api/societies/<int:society_id>/members/<int:user_id>/approve', methods=['POST'])
+@role_required('society', 'admin')
+def approve_member(society_id, user_id):
+    if not _manages_society(society_id):
+        return jsonify({'error': 'Society not found'}), 404
+    try:
+        reviewed, member_counts = review([(society_id, user_id)], approve=True)
+        if not reviewed:
+            db.session.rollback()
+            if membership_status(society_id, user_id) == APPROVED:
+                return jsonify({'status': APPROVED}), 200
+            return jsonify({'error': 'No pending request from this user'}), 404
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    _publish_member_counts(member_counts)
+    return jsonify({'status': APPROVED, 'member_count': member_counts[society_id]}), 200
+
+# Reject Join Request / Remove Member (society owner or admin)
+@main.route('/api/societies/<int:society_id>/members/<int:user_id>', methods=['DELETE'])
+@role_required('society', 'admin')
+def remove_member(society_id, user_id):
+    if not _manages_society(society_id):
+        return jsonify({'error': 'Society not found'}), 404
+    try:
+        status, member_count = remove_membership(society_id, user_id)
+        if status is None:
+            db.session.rollback()
+            return jsonify({'error': 'Not a member of this society'}), 404
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    if member_count is not None:
+        _publish_member_counts({society_id: member_count})
+    return jsonify({'removed': status}), 200
+
+# Batch Review Join Requests (Admin only; JSON {"decision": "approve"|"reject", "requests": [{"society_id", "user_id"}]})
+@main.route('/api/memberships/review', methods=['POST'])
+@role_required('admin')
+def review_memberships():
+    data = request.get_json(silent=True) or {}
+    decision = data.get('decision')
+    if decision not in ('approve', 'reject'):
+        return jsonify({'error': 'decision must be approve or reject'}), 400
+    try:
+        requests = [(int(item['society_id']), int(item['user_id'])) for item in data.get('requests') or []]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'requests must be a list of {society_id, user_id}'}), 400
+    if len(requests) > REVIEW_MAX_REQUESTS:
+        return jsonify({'error': f'At most {REVIEW_MAX_REQUESTS} requests per batch'}), 400
+    
+    try:
+        reviewed, member_counts = review(requests, approve=decision == 'approve')
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 400
+    _publish_member_counts(member_counts)
+    return jsonify({
+        'decision': decision,
+        'reviewed': sum(reviewed.values()),
+        'skipped': len(set(requests)) - sum(reviewed.values()),
+        'member_counts': {str(society_id): count for society_id, count in member_counts.items()}
+    }), 200
+
+# ==================== CHANGE STREAM ====================
+
+# Server-Sent Events feed of change notifications (?entities=event,society to filter)
+@main.route('/api/stream', methods=['GET'])
+def change_stream():
+    entities = set(filter(None, request.args.get('entities', '').split(',')))
+    heartbeat = current_app.config['SSE_HEARTBEAT_INTERVAL']
+    dumps = current_app.json.dumps
+    
+    def generate():
+        with change_feed.subscribe() as subscription:
+            yield 'retry: 3000\n\n'
+            while True:
+                message = subscription.get(timeout=heartbeat)
+                if message is None:
+                    yield ': keepalive\n\n'
+                elif not entities or message['entity'] in entities:
+                    yield f"id: {message['version']}\nevent: change\ndata: {dumps(message)}\n\n"
+    
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 # ==================== COMMENT ROUTES ====================
 
 # Add Comment
 @main.route('/api/events/<int:event_id>/comments', methods=['POST'])
+@login_required
 def add_comment(event_id):
     data = request.form
     try:
         comment = Comment(
-            user_id=data['user_id'],
+            user_id=current_principal().id,
             event_id=event_id,
             content=data['content']
         )
         db.session.add(comment)
+        comments_count = Event.adjust_comments_count(event_id, 1)
+        if comments_count is None:
+            db.session.rollback()
+            return jsonify({'error': 'Event not found'}), 404
         db.session.commit()
+        response_cache.invalidate('events', f'event:{event_id}')
+        change_feed.publish('event', event_id, comments_count=comments_count)
         
         return jsonify({
             'message': 'Comment added successfully',
@@ -291,13 +977,43 @@ def add_comment(event_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
-# Get Comments for Event
+# Get Comments for Event (keyset paginated on created_at, id; ?format=ndjson|stream for the whole thread)
 @main.route('/api/events/<int:event_id>/comments', methods=['GET'])
 def get_comments(event_id):
-    comments = Comment.query.filter_by(
-        event_id=event_id,
-        is_approved=True,
-        is_deleted=False
-    ).order_by(Comment.created_at.desc()).all()
+    try:
+        names = COMMENT_PROJECTION.resolve(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    query, serialize = COMMENT_PROJECTION.query(names, keys=(Comment.created_at, Comment.id))
+    query = query.filter(
+        Comment.event_id == event_id,
+        Comment.is_approved.is_(True),
+        Comment.is_deleted.is_(False)
+    )
+    
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            created_at, comment_id = decode_cursor(cursor)
+            created_at, comment_id = datetime.fromisoformat(created_at), int(comment_id)
+        except (InvalidCursor, ValueError, TypeError):
+            return jsonify({'error': 'Invalid cursor'}), 400
+        query = query.filter(or_(
+            Comment.created_at < created_at,
+            and_(Comment.created_at == created_at, Comment.id < comment_id)
+        ))
+    query = query.order_by(Comment.created_at.desc(), Comment.id.desc())
+    
+    fmt = stream_format(request.args)
+    if fmt:
+        return stream_query(query, lambda batch: [serialize(row) for row in batch], fmt, dumps=dumps)
+    
+    limit = get_page_size(request.args)
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_created, last_id = rows[-1][-2:]
+        next_cursor = encode_cursor(last_created.isoformat(), last_id)
     
-    return jsonify([c.to_dict(include_author=True) for c in comments]), 200
\ No newline at end of file
+    return paginated_response(json_response([serialize(row) for row in rows]), next_cursor), 200
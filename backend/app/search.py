@@ -0,0 +1,147 @@
+import re
+from sqlalchemy import event as sa_event, text
+from app.models import db, Society, Event
+from app.jobs import jobs
+
+FTS_TABLE = 'events_fts'
+
+# Column weights for bm25(), in the order the columns are declared below
+BM25_WEIGHTS = '10.0, 4.0, 1.0, 2.0, 3.0, 3.0'
+
+_CREATE_SQL = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    title, short_description, description, venue, category, society_name,
+    tokenize = 'porter unicode61'
+)
+"""
+
+# The FTS rowid is the event id, so re-indexing is a delete + insert on the same key
+_INDEX_SELECT = f"""
+INSERT INTO {FTS_TABLE} (rowid, title, short_description, description, venue, category, society_name)
+SELECT e.id, e.title, coalesce(e.short_description, ''), e.description, coalesce(e.venue, ''),
+       coalesce(e.category, ''), s.name
+FROM events e JOIN societies s ON s.id = e.society_id
+"""
+
+
+def is_supported(connection):
+    """FTS5 is SQLite-only; other databases fall back to a LIKE scan"""
+    return connection.dialect.name == 'sqlite'
+
+
+def create_index(connection=None):
+    """Create the FTS table if it does not exist yet"""
+    connection = connection or db.session.connection()
+    if is_supported(connection):
+        connection.execute(text(_CREATE_SQL))
+
+
+def rebuild_index():
+    """Drop and repopulate the FTS table from events and societies, returning the row count"""
+    connection = db.session.connection()
+    if not is_supported(connection):
+        return 0
+    connection.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
+    connection.execute(text(_CREATE_SQL))
+    connection.execute(text(_INDEX_SELECT))
+    return connection.execute(text(f'SELECT count(*) FROM {FTS_TABLE}')).scalar()
+
+
+def index_events(connection, event_ids=None, society_id=None):
+    """Re-index the given events (or every event of a society) on the caller's connection"""
+    if not is_supported(connection):
+        return
+    if event_ids is not None:
+        ids = ','.join(str(int(event_id)) for event_id in event_ids)
+        if not ids:
+            return
+        connection.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({ids})'))
+        connection.execute(text(f'{_INDEX_SELECT} WHERE e.id IN ({ids})'))
+    elif society_id is not None:
+        connection.execute(
+            text(f'DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT id FROM events WHERE society_id = :sid)'),
+            {'sid': society_id}
+        )
+        connection.execute(text(f'{_INDEX_SELECT} WHERE e.society_id = :sid'), {'sid': society_id})
+
+
+def build_match_query(q):
+    """Turn free text into a safe FTS5 query: every word becomes a quoted prefix term"""
+    terms = re.findall(r'\w+', q or '')
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_event_ids(q, category=None, date_from=None, date_to=None, limit=20, offset=0):
+    """Return published event ids matching q, best BM25 rank first"""
+    match = build_match_query(q)
+    if not match:
+        return []
+
+    connection = db.session.connection()
+    params = {'limit': limit, 'offset': offset}
+    filters = ['e.is_published = 1']
+    if category:
+        filters.append('e.category = :category')
+        params['category'] = category
+    if date_from:
+        filters.append('e.event_date >= :date_from')
+        params['date_from'] = date_from
+    if date_to:
+        filters.append('e.event_date <= :date_to')
+        params['date_to'] = date_to
+
+    if not is_supported(connection):
+        like = Event.query.join(Society).filter(Event.is_published.is_(True))
+        for term in re.findall(r'\w+', q):
+            pattern = f'%{term}%'
+            like = like.filter(db.or_(
+                Event.title.ilike(pattern),
+                Event.short_description.ilike(pattern),
+                Event.description.ilike(pattern),
+                Event.venue.ilike(pattern),
+                Event.category.ilike(pattern),
+                Society.name.ilike(pattern)
+            ))
+        if category:
+            like = like.filter(Event.category == category)
+        if date_from:
+            like = like.filter(Event.event_date >= date_from)
+        if date_to:
+            like = like.filter(Event.event_date <= date_to)
+        rows = like.with_entities(Event.id).order_by(Event.event_date.desc()).limit(limit).offset(offset)
+        return [row.id for row in rows]
+
+    # SQLite stores DateTime as text, so bind the bounds in the same format
+    for key in ('date_from', 'date_to'):
+        if key in params:
+            params[key] = params[key].strftime('%Y-%m-%d %H:%M:%S.%f')
+    params['match'] = match
+    sql = f"""
+        SELECT e.id FROM {FTS_TABLE} JOIN events e ON e.id = {FTS_TABLE}.rowid
+        WHERE {FTS_TABLE} MATCH :match AND {' AND '.join(filters)}
+        ORDER BY bm25({FTS_TABLE}, {BM25_WEIGHTS})
+        LIMIT :limit OFFSET :offset
+    """
+    return [row[0] for row in connection.execute(text(sql), params)]
+
+
+# Keep the index in step with ORM writes: indexing is queued in the same transaction and run by
+# the job workers after the commit (tasks.py); deletes stay inline so removed events never match
+
+@sa_event.listens_for(Event, 'after_insert')
+@sa_event.listens_for(Event, 'after_update')
+def _index_event(mapper, connection, target):
+    if is_supported(connection):
+        jobs.enqueue('index_events', {'event_ids': [target.id]}, connection=connection)
+
+
+@sa_event.listens_for(Event, 'after_delete')
+def _unindex_event(mapper, connection, target):
+    if is_supported(connection):
+        connection.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid = :id'), {'id': target.id})
+
+
+@sa_event.listens_for(Society, 'after_update')
+def _reindex_society(mapper, connection, target):
+    if is_supported(connection) and db.inspect(target).attrs.name.history.has_changes():
+        jobs.enqueue('index_events', {'society_id': target.id}, connection=connection)
@@ -0,0 +1,59 @@
+from flask import Response, current_app, stream_with_context
+from app.models import db
+
+STREAM_BATCH_SIZE = 500
+
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'stream': 'application/json'
+}
+
+
+def stream_format(args):
+    """Return the requested streaming format (?format=ndjson|stream) or None"""
+    fmt = args.get('format')
+    return fmt if fmt in STREAM_FORMATS else None
+
+
+def iter_batches(query, batch_size=STREAM_BATCH_SIZE):
+    """Yield lists of rows from a server-side cursor
+
+    The view's session was already removed at its teardown by the time a
+    streamed body is read; rebinding to the current session lets the
+    streaming context's own teardown release the connection.
+    """
+    batch = []
+    for row in query.with_session(db.session()).yield_per(batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_query(query, serialize_batch, fmt, batch_size=STREAM_BATCH_SIZE, dumps=None):
+    """Stream a query as NDJSON or a chunked JSON array without materializing it
+
+    Rows are read from a server-side cursor in batches of batch_size;
+    serialize_batch turns one batch into a list of dicts, which lets callers
+    bulk-load related data once per batch instead of once per row.
+    """
+    dumps = dumps or current_app.json.dumps
+
+    def generate():
+        if fmt == 'ndjson':
+            for batch in iter_batches(query, batch_size):
+                yield ''.join(dumps(item) + '\n' for item in serialize_batch(batch))
+            return
+
+        yield '['
+        first = True
+        for batch in iter_batches(query, batch_size):
+            chunk = ','.join(dumps(item) for item in serialize_batch(batch))
+            if chunk:
+                yield chunk if first else ',' + chunk
+                first = False
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype=STREAM_FORMATS[fmt])
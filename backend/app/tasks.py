@@ -0,0 +1,64 @@
+from datetime import datetime
+from app.cache import response_cache
+from app.digests import digests
+from app.jobs import jobs
+from app.mail import mailer
+from app.media import media
+from app.models import db
+from app.recommendations import recommender
+from app.trending import trending
+from app import search
+
+
+@jobs.task('index_events')
+def index_events(event_ids=None, society_id=None):
+    """Re-index events for search after an ORM insert or update (see search.py hooks)"""
+    search.index_events(db.session.connection(), event_ids=event_ids, society_id=society_id)
+    # Searches served between the write's commit and this one cached the old index
+    db.session.commit()
+    response_cache.invalidate('search')
+
+
+@jobs.task('render_image_variants', max_attempts=3)
+def render_image_variants(image_id):
+    """Render the WebP thumbnail/large variants of an uploaded image"""
+    media.render_variants(image_id)
+
+
+@jobs.task('fan_out_events')
+def fan_out_events(event_ids):
+    """Add newly created events to their followers' digests"""
+    digests.fan_out(event_ids=event_ids)
+
+
+@jobs.task('society_verified')
+def society_verified(society_id):
+    """Release the society's upcoming events to its followers' digests, then tell the owner"""
+    digests.fan_out(society_id=society_id)
+    # Mail last, so a failed fan-out retries without mailing the owner twice
+    message = digests.society_verified_message(society_id)
+    if message is not None:
+        mailer.send([message])
+
+
+@jobs.task('refresh_trending')
+def refresh_trending():
+    """Fold recent activity into the trending ranking, then queue the next refresh"""
+    trending.refresh()
+    trending.schedule(delay=trending.refresh_interval)
+    db.session.commit()
+    response_cache.invalidate('trending')
+
+
+@jobs.task('refresh_recommendations')
+def refresh_recommendations(since=None):
+    """Recompute "also liked" neighbors of recently liked events, then queue the next refresh"""
+    started = datetime.utcnow()
+    recommender.refresh(since=datetime.fromisoformat(since) if since else None)
+    recommender.schedule(delay=recommender.refresh_interval, since=started)
+
+
+@jobs.task('send_digests')
+def send_digests():
+    """Mail the digests collected over the window that just ended"""
+    digests.send_due()
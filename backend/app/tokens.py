@@ -0,0 +1,167 @@
+import secrets
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import current_app, g, jsonify, request
+from itsdangerous import BadSignature, SignatureExpired, URLSafeTimedSerializer
+from app.models import db, User, RefreshToken
+
+Principal = namedtuple('Principal', ['id', 'role'])
+
+
+class PrincipalCache:
+    """Short-TTL map of user id -> (role, is_active) so most requests skip the users table"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, ttl, role=None):
+        """(role, is_active) of a user, or None if it is gone
+
+        An entry whose role differs from the given one (the role the token
+        claims) is re-read: the cache is per process, so after a role change
+        another worker's entry can be older than a token issued since.
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry and entry[2] > time.monotonic() and (role is None or entry[0] == role):
+            return entry[0], entry[1]
+        row = db.session.execute(
+            db.select(User.role, User.is_active).where(User.id == user_id)
+        ).first()
+        if row is None:
+            self.invalidate(user_id)
+            return None
+        with self._lock:
+            self._entries[user_id] = (row.role, row.is_active, time.monotonic() + ttl)
+        return row.role, row.is_active
+
+    def invalidate(self, user_id):
+        """Forget a user after a role or status change so the next request re-reads it"""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+principal_cache = PrincipalCache()
+
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='access-token')
+
+
+def issue_access_token(user):
+    """Signed, short-lived token carrying the user's id and role"""
+    return _serializer().dumps({'sub': user.id, 'role': user.role})
+
+
+def issue_refresh_token(user_id):
+    """Create and store a single-use refresh token (the caller commits)"""
+    token = RefreshToken(
+        user_id=user_id,
+        jti=secrets.token_urlsafe(32),
+        expires_at=datetime.utcnow() + timedelta(seconds=current_app.config['REFRESH_TOKEN_TTL'])
+    )
+    db.session.add(token)
+    return token.jti
+
+
+def issue_token_pair(user):
+    return {
+        'access_token': issue_access_token(user),
+        'refresh_token': issue_refresh_token(user.id),
+        'expires_in': current_app.config['ACCESS_TOKEN_TTL']
+    }
+
+
+def rotate_refresh_token(jti):
+    """Exchange a refresh token for a new pair, or return None if it is not usable
+
+    Presenting an already-rotated token means it leaked, so every token of
+    that user is revoked. The token is spent with a conditional UPDATE, so
+    of two requests racing with the same token only one gets a new pair.
+    The caller commits.
+    """
+    token = RefreshToken.query.filter_by(jti=jti).first()
+    if token is None:
+        return None
+    if not token.is_usable():
+        if token.replaced_by:
+            RefreshToken.query.filter_by(user_id=token.user_id, revoked_at=None).update(
+                {'revoked_at': datetime.utcnow()}
+            )
+        return None
+
+    user = db.session.get(User, token.user_id)
+    if user is None or not user.is_active:
+        return None
+    spent = db.session.execute(
+        db.update(RefreshToken)
+        .where(RefreshToken.id == token.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    if spent.rowcount != 1:
+        return None
+    pair = issue_token_pair(user)
+    token.replaced_by = pair['refresh_token']
+    return pair
+
+
+def revoke_refresh_token(jti):
+    """Revoke a refresh token on logout (the caller commits)"""
+    RefreshToken.query.filter_by(jti=jti, revoked_at=None).update({'revoked_at': datetime.utcnow()})
+
+
+def current_principal():
+    """The authenticated principal for this request, or None
+
+    The access token is verified without touching the database; the cached
+    principal entry confirms the user is still active and has the role
+    the token claims, and is re-read from the database when it disagrees.
+    """
+    if 'principal' in g:
+        return g.principal
+    g.principal = None
+
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        claims = _serializer().loads(header[7:], max_age=current_app.config['ACCESS_TOKEN_TTL'])
+    except (SignatureExpired, BadSignature):
+        return None
+
+    state = principal_cache.get(claims['sub'], current_app.config['PRINCIPAL_CACHE_TTL'], role=claims['role'])
+    if state is None:
+        return None
+    role, is_active = state
+    if not is_active or role != claims['role']:
+        return None
+
+    g.principal = Principal(claims['sub'], role)
+    return g.principal
+
+
+def login_required(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if current_principal() is None:
+            return jsonify({'error': 'Authentication required'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def role_required(*roles):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            principal = current_principal()
+            if principal is None:
+                return jsonify({'error': 'Authentication required'}), 401
+            if principal.role not in roles:
+                return jsonify({'error': 'You do not have permission to do this'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,136 @@
+import heapq
+from collections import defaultdict
+from datetime import datetime, timedelta
+from app.jobs import jobs
+from app.models import db, Event, Comment, Job, TrendingScore, user_likes_events
+
+
+class TrendingRanker:
+    """Time-decayed popularity ranking, refreshed incrementally off the request path
+
+    Each refresh decays every score by 0.5 ** (elapsed / half-life) and adds
+    the likes, comments and views recorded since the previous refresh, so
+    no refresh rescans old activity. Views are read from
+    events.trending_views, which every process's view counter increments,
+    and subtracted once folded in. Only the best TRENDING_CAPACITY events
+    are kept in trending_scores. The refresh_trending job rewrites that
+    table every TRENDING_REFRESH_INTERVAL seconds; requests only read it.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('TRENDING_HALF_LIFE_HOURS', 24)
+        app.config.setdefault('TRENDING_REFRESH_INTERVAL', 60)
+        app.config.setdefault('TRENDING_CAPACITY', 2000)
+        app.config.setdefault('TRENDING_BOOTSTRAP_DAYS', 7)
+        app.config.setdefault('TRENDING_WEIGHTS', {'like': 3.0, 'comment': 5.0, 'view': 0.2})
+
+        self.half_life = app.config['TRENDING_HALF_LIFE_HOURS'] * 3600
+        self.refresh_interval = app.config['TRENDING_REFRESH_INTERVAL']
+        self.capacity = app.config['TRENDING_CAPACITY']
+        self.bootstrap_days = app.config['TRENDING_BOOTSTRAP_DAYS']
+        self.weights = app.config['TRENDING_WEIGHTS']
+        app.extensions['trending'] = self
+
+    def _activity_since(self, since, until):
+        """Weighted new activity per event in (since, until], one grouped query per source"""
+        activity = defaultdict(float)
+        likes = db.session.execute(
+            db.select(user_likes_events.c.event_id, db.func.count())
+            .where(user_likes_events.c.created_at > since, user_likes_events.c.created_at <= until)
+            .group_by(user_likes_events.c.event_id)
+        )
+        for event_id, count in likes:
+            activity[event_id] += self.weights['like'] * count
+
+        comments = db.session.execute(
+            db.select(Comment.event_id, db.func.count(Comment.id))
+            .where(
+                Comment.created_at > since,
+                Comment.created_at <= until,
+                Comment.is_approved.is_(True),
+                Comment.is_deleted.is_(False)
+            )
+            .group_by(Comment.event_id)
+        )
+        for event_id, count in comments:
+            activity[event_id] += self.weights['comment'] * count
+        return activity
+
+    def refresh(self):
+        """Fold activity since the last refresh into trending_scores; returns how many events are ranked
+
+        Runs in the caller's transaction (the job's, or the CLI command's).
+        """
+        rows = db.session.execute(db.select(TrendingScore.event_id, TrendingScore.score, TrendingScore.updated_at)).all()
+        now = datetime.utcnow()
+        if rows:
+            watermark = max(row.updated_at for row in rows)
+        else:
+            watermark = now - timedelta(days=self.bootstrap_days)
+        elapsed = max((now - watermark).total_seconds(), 0)
+        decay = 0.5 ** (elapsed / self.half_life)
+
+        scores = {row.event_id: row.score * decay for row in rows}
+        for event_id, points in self._activity_since(watermark, now).items():
+            scores[event_id] = scores.get(event_id, 0.0) + points
+        views = db.session.execute(
+            db.select(Event.id, Event.trending_views).where(Event.trending_views > 0)
+        ).all()
+        for event_id, count in views:
+            scores[event_id] = scores.get(event_id, 0.0) + self.weights['view'] * count
+
+        # Drop unpublished and long-past events
+        eligible = set(db.session.execute(
+            db.select(Event.id).where(
+                Event.id.in_(list(scores)),
+                Event.is_published.is_(True),
+                Event.event_date >= now - timedelta(days=1)
+            )
+        ).scalars()) if scores else set()
+        candidates = [
+            (score, event_id) for event_id, score in scores.items()
+            if score >= 0.01 and event_id in eligible
+        ]
+        ranked = heapq.nlargest(self.capacity, candidates)
+
+        db.session.execute(db.delete(TrendingScore))
+        if ranked:
+            db.session.execute(db.insert(TrendingScore), [
+                {'event_id': event_id, 'score': score, 'updated_at': now} for score, event_id in ranked
+            ])
+        if views:
+            # Subtract what was read rather than zeroing, so views flushed meanwhile count next time
+            table = Event.__table__
+            db.session.execute(
+                db.update(table).where(table.c.id == db.bindparam('event_id'))
+                .values(trending_views=table.c.trending_views - db.bindparam('seen')),
+                [{'event_id': event_id, 'seen': count} for event_id, count in views]
+            )
+        return len(ranked)
+
+    def schedule(self, delay=0):
+        """Queue a refresh_trending job unless one is already waiting"""
+        waiting = db.select(Job.id).where(Job.name == 'refresh_trending', Job.status == 'pending').exists()
+        if not db.session.execute(db.select(waiting)).scalar():
+            jobs.enqueue('refresh_trending', delay=delay)
+
+    def top(self, limit=10, category=None, society_id=None):
+        """Best (event_id, score) pairs of the last refresh, optionally restricted to a category or society"""
+        query = db.select(TrendingScore.event_id, TrendingScore.score)
+        if category or society_id:
+            query = query.join(Event, Event.id == TrendingScore.event_id)
+        if category:
+            query = query.where(Event.category == category)
+        if society_id:
+            query = query.where(Event.society_id == society_id)
+        rows = db.session.execute(
+            query.order_by(TrendingScore.score.desc(), TrendingScore.event_id.desc()).limit(limit)
+        )
+        return [(row.event_id, row.score) for row in rows]
+
+
+trending = TrendingRanker()
@@ -0,0 +1,142 @@
+import atexit
+import threading
+from collections import defaultdict
+from flask import current_app
+from app.models import db, Event
+
+
+class ViewCounterState:
+    """One app's pending increments and flusher thread, kept in app.extensions['view_counter']"""
+
+    def __init__(self, app):
+        self.app = app
+        self.interval = float(app.config['VIEW_FLUSH_INTERVAL'])
+        self.threshold = int(app.config['VIEW_FLUSH_THRESHOLD'])
+        self.pending = defaultdict(int)
+        self.pending_total = 0
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.started = False
+        self.wake = threading.Event()
+        self.stopped = threading.Event()
+
+
+class ViewCounter:
+    """In-process write-behind buffer for Event.view_count (and trending_views)
+
+    Increments are summed per event in memory and written in one batched
+    UPDATE every VIEW_FLUSH_INTERVAL seconds (sooner once
+    VIEW_FLUSH_THRESHOLD views are pending) and at interpreter shutdown.
+    Writes happen on a background thread, so a slow or locked database
+    never fails the request that recorded the view; a failed flush keeps
+    its views for the next one. With an interval of 0 there is no thread
+    and the threshold flush runs inline, logging rather than raising.
+    """
+
+    def __init__(self, app=None):
+        self._listeners = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('VIEW_FLUSH_INTERVAL', 5.0)
+        app.config.setdefault('VIEW_FLUSH_THRESHOLD', 500)
+        app.extensions['view_counter'] = ViewCounterState(app)
+
+    def _state(self, app=None):
+        return (app or current_app).extensions['view_counter']
+
+    def add_flush_listener(self, listener):
+        """Call listener({event_id: delta}) after every successful flush"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def increment(self, event_id, delta=1):
+        """Record views for an event; never writes to the database from a thread that has a flusher"""
+        state = self._state()
+        with state.lock:
+            state.pending[event_id] += delta
+            state.pending_total += delta
+            should_flush = state.pending_total >= state.threshold
+        if not state.started:
+            self._start(state)
+
+        if state.interval > 0:
+            if should_flush:
+                state.wake.set()
+        elif should_flush:
+            try:
+                self.flush(state.app)
+            except Exception as e:
+                state.app.logger.warning('View counter flush failed, keeping %d pending views: %s',
+                                         state.pending_total, getattr(e, 'orig', e))
+
+    def _start(self, state):
+        with state.lock:
+            if state.started:
+                return
+            state.started = True
+        # Started on the first view, so CLI commands and short-lived apps never get a thread
+        atexit.register(self.shutdown, state.app)
+        if state.interval > 0:
+            threading.Thread(target=self._run, args=(state,), name='view-counter-flush', daemon=True).start()
+
+    def flush(self, app=None):
+        """Write all pending increments in a single executemany UPDATE"""
+        state = self._state(app)
+        with state.flush_lock:
+            with state.lock:
+                if not state.pending:
+                    return 0
+                batch = state.pending
+                state.pending = defaultdict(int)
+                state.pending_total = 0
+
+            table = Event.__table__
+            stmt = db.update(table).where(
+                table.c.id == db.bindparam('event_id')
+            ).values(
+                view_count=table.c.view_count + db.bindparam('delta'),
+                trending_views=table.c.trending_views + db.bindparam('delta')
+            )
+            params = [{'event_id': event_id, 'delta': delta} for event_id, delta in batch.items()]
+
+            try:
+                with state.app.app_context():
+                    with db.engine.begin() as conn:
+                        conn.execute(stmt, params)
+            except Exception:
+                # Put the batch back so no views are lost; the next flush retries it
+                with state.lock:
+                    for event_id, delta in batch.items():
+                        state.pending[event_id] += delta
+                        state.pending_total += delta
+                raise
+
+            for listener in self._listeners:
+                listener(dict(batch))
+            return len(params)
+
+    def shutdown(self, app=None):
+        """Stop the app's flusher thread and write whatever is still pending"""
+        state = self._state(app)
+        state.stopped.set()
+        state.wake.set()
+        try:
+            self.flush(state.app)
+        except Exception as e:
+            state.app.logger.error('View counter flush failed at shutdown: %s', getattr(e, 'orig', e))
+
+    def _run(self, state):
+        while not state.stopped.is_set():
+            state.wake.wait(state.interval)
+            state.wake.clear()
+            if state.stopped.is_set():
+                break
+            try:
+                self.flush(state.app)
+            except Exception as e:
+                state.app.logger.warning('View counter flush failed: %s', getattr(e, 'orig', e))
+
+
+view_counter = ViewCounter()
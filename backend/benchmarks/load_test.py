@@ -0,0 +1,95 @@
+"""Concurrent read load test against a real WSGI server
+
+Run from backend/:
+
+    python -m benchmarks.load_test --workers 1,2,4,8 --duration 5
+
+Seeds a throwaway SQLite file, serves the app with werkzeug's threaded
+server and reports throughput and latency for each client concurrency.
+Pass --journal-mode DELETE to compare against SQLite's rollback journal.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.request
+from werkzeug.serving import WSGIRequestHandler, make_server
+from app import create_app
+from benchmarks.seed import seed
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log(self, type, message, *args):
+        pass
+
+
+def run_clients(base_url, path, workers, duration):
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client():
+        local = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(base_url + path) as response:
+                    response.read()
+                local.append(time.perf_counter() - started)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=client) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--path', default='/api/events?limit=20')
+    parser.add_argument('--journal-mode', default='WAL')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='unievent-bench-')
+    app = create_app({
+        'SECRET_KEY': 'benchmark',
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmpdir, 'bench.db'),
+        'SQLITE_JOURNAL_MODE': args.journal_mode,
+        'CACHE_BACKEND': 'none',
+        'VIEW_FLUSH_INTERVAL': 0
+    })
+    seed(app, events=args.events)
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}'
+
+    print(f'{args.path} on {args.events} events, journal_mode={args.journal_mode}')
+    print(f'{"workers":>8} {"req/s":>10} {"p50 ms":>8} {"p95 ms":>8} {"errors":>7}')
+    for workers in (int(w) for w in args.workers.split(',')):
+        latencies, errors = run_clients(base_url, args.path, workers, args.duration)
+        if not latencies:
+            print(f'{workers:>8} {"-":>10} {"-":>8} {"-":>8} {errors:>7}')
+            continue
+        latencies.sort()
+        p50 = statistics.median(latencies) * 1000
+        p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+        print(f'{workers:>8} {len(latencies) / args.duration:>10.1f} {p50:>8.1f} {p95:>8.1f} {errors:>7}')
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
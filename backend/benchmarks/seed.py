@@ -0,0 +1,108 @@
+"""Synthetic data for the benchmark scripts
+
+Rows go in through bulk INSERTs against the models.py schema, then the
+denormalized counters and the search index are rebuilt the same way the
+repair-counters and rebuild-search-index commands do.
+"""
+import random
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from app.models import db, User, Society, Event, Comment, user_likes_events
+
+CATEGORIES = ['workshop', 'social', 'competition', 'seminar', 'sports', 'tech']
+VENUES = ['Main Hall', 'Auditorium', 'Library Lawn', 'CS Lab 2', 'Sports Complex']
+WORDS = ['robotics', 'music', 'debate', 'coding', 'startup', 'art', 'quiz', 'football', 'ai', 'film']
+
+
+def seed(app, users=200, societies=20, events=2000, likes=0, comments=0, rng_seed=42):
+    """Populate an empty database; returns the number of rows created per table
+
+    Likes and comments are spread over the last week so the trending and
+    recommendation rankers have recent activity to work with.
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    # One hash shared by every synthetic user keeps seeding fast
+    password_hash = generate_password_hash('benchmark')
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(User), [
+            {
+                'username': f'user{i}',
+                'email': f'user{i}@bench.local',
+                'password_hash': password_hash,
+                'first_name': 'Bench',
+                'last_name': f'User{i}',
+                'role': 'society' if i < societies else 'student',
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(users)
+        ])
+        user_ids = [row[0] for row in db.session.execute(db.select(User.id).order_by(User.id))]
+
+        db.session.execute(db.insert(Society), [
+            {
+                'user_id': user_ids[i],
+                'name': f'{rng.choice(WORDS).title()} Society {i}',
+                'description': 'Synthetic society',
+                'is_verified': i % 3 != 0,
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(societies)
+        ])
+        society_ids = [row[0] for row in db.session.execute(db.select(Society.id))]
+
+        db.session.execute(db.insert(Event), [
+            {
+                'society_id': rng.choice(society_ids),
+                'title': f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} night {i}',
+                'description': ' '.join(rng.choice(WORDS) for _ in range(60)),
+                'short_description': ' '.join(rng.choice(WORDS) for _ in range(8)),
+                'category': rng.choice(CATEGORIES),
+                'event_date': now + timedelta(days=rng.randint(-180, 180), hours=rng.randint(0, 23)),
+                'venue': rng.choice(VENUES),
+                'created_at': now,
+                'updated_at': now
+            }
+            for i in range(events)
+        ])
+        event_ids = [row[0] for row in db.session.execute(db.select(Event.id))]
+
+        # Distinct (user, event) pairs, skewed so a few events collect most likes
+        pairs = set()
+        likes = min(likes, len(user_ids) * len(event_ids))
+        while len(pairs) < likes:
+            pairs.add((rng.choice(user_ids), event_ids[int(len(event_ids) * rng.random() ** 2)]))
+        if pairs:
+            db.session.execute(user_likes_events.insert(), [
+                {
+                    'user_id': user_id,
+                    'event_id': event_id,
+                    'created_at': now - timedelta(minutes=rng.randint(0, 7 * 24 * 60))
+                }
+                for user_id, event_id in pairs
+            ])
+
+        if comments:
+            db.session.execute(db.insert(Comment), [
+                {
+                    'user_id': rng.choice(user_ids),
+                    'event_id': event_ids[int(len(event_ids) * rng.random() ** 2)],
+                    'content': ' '.join(rng.choice(WORDS) for _ in range(12)),
+                    'created_at': now - timedelta(minutes=rng.randint(0, 7 * 24 * 60)),
+                    'updated_at': now
+                }
+                for _ in range(comments)
+            ])
+        db.session.commit()
+
+        from app import search
+        search.create_index()
+        search.rebuild_index()
+        Event.repair_counters()
+        db.session.commit()
+
+    return {'users': users, 'societies': societies, 'events': events, 'likes': len(pairs), 'comments': comments}
@@ -0,0 +1,93 @@
+"""Per-row serialization cost: ORM to_dict versus column projections
+
+Run from backend/:
+
+    python -m benchmarks.serializers --events 5000 --rows 500
+
+Each path fetches the same page of published events, newest first, and
+encodes it to JSON: the to_dict path loads Event and Society instances
+and goes through jsonify's encoder; the projection paths select row
+tuples for the summary and detail views and encode them with
+projections.dumps.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy.orm import joinedload
+from app import create_app
+from app.models import db, Event
+from app.projections import EVENT_PROJECTION, dumps, orjson
+from benchmarks.seed import seed
+
+
+def to_dict_path(app, rows):
+    now = datetime.utcnow()
+    events = (
+        Event.query.options(joinedload(Event.organizer))
+        .filter_by(is_published=True)
+        .order_by(Event.event_date.desc(), Event.id.desc())
+        .limit(rows).all()
+    )
+    return app.json.dumps([e.to_dict(include_organizer=True, now=now) for e in events])
+
+
+def projection_path(view):
+    names = EVENT_PROJECTION.resolve({'view': view})
+
+    def run(app, rows):
+        query, serialize = EVENT_PROJECTION.query(names, datetime.utcnow())
+        query = (
+            query.filter(Event.is_published.is_(True))
+            .order_by(Event.event_date.desc(), Event.id.desc())
+            .limit(rows)
+        )
+        return dumps([serialize(row) for row in query])
+
+    return run
+
+
+def measure(app, path, rows, repeat):
+    timings = []
+    with app.app_context():
+        body = path(app, rows)
+        for _ in range(repeat):
+            # A fresh session per run so the ORM path cannot reuse its identity map
+            db.session.remove()
+            started = time.perf_counter()
+            path(app, rows)
+            timings.append(time.perf_counter() - started)
+    return statistics.median(timings), len(body.encode())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--rows', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='unievent-bench-')
+    app = create_app({
+        'SECRET_KEY': 'benchmark',
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmpdir, 'bench.db'),
+        'CACHE_BACKEND': 'none',
+        'VIEW_FLUSH_INTERVAL': 0
+    })
+    seed(app, events=args.events)
+
+    print(f'{args.rows} rows per page, median of {args.repeat}, encoder={"orjson" if orjson else "json"}')
+    print(f'{"path":<20} {"ms/page":>9} {"us/row":>8} {"bytes":>9}')
+    for label, path in [
+        ('to_dict', to_dict_path),
+        ('projection summary', projection_path('summary')),
+        ('projection detail', projection_path('detail'))
+    ]:
+        elapsed, size = measure(app, path, args.rows, args.repeat)
+        print(f'{label:<20} {elapsed * 1000:>9.2f} {elapsed / args.rows * 1e6:>8.1f} {size:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Cold and warm start cost of the app factory
+
+Run from backend/:
+
+    python -m benchmarks.startup --runs 10
+
+Cold start spawns a fresh interpreter per run (import + create_app), which
+is what every pre-fork worker pays. Warm start calls create_app() again in
+this process, which is what each test fixture pays. Both should run no
+SQL; the warm measurement counts statements to prove it.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+COLD_SNIPPET = (
+    'import time; t = time.perf_counter(); '
+    "from app import create_app; create_app({'SECRET_KEY': 'benchmark'}); "
+    'print(time.perf_counter() - t)'
+)
+
+
+def cold_start(runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', COLD_SNIPPET],
+            check=True, capture_output=True, text=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def warm_start(runs):
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app import create_app
+
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    event.listen(Engine, 'before_cursor_execute', count)
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        create_app({'SECRET_KEY': 'benchmark', 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'VIEW_FLUSH_INTERVAL': 0})
+        timings.append(time.perf_counter() - started)
+    event.remove(Engine, 'before_cursor_execute', count)
+    return timings, statements[0]
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    print(f'{label:<12} median {statistics.median(timings) * 1000:8.1f} ms   max {timings[-1] * 1000:8.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    report('cold start', cold_start(args.runs))
+    timings, statements = warm_start(args.runs)
+    report('create_app', timings)
+    print(f'SQL statements during create_app: {statements}')
+
+
+if __name__ == '__main__':
+    main()
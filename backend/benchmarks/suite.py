@@ -0,0 +1,504 @@
+"""Benchmark suite: every /api route under concurrent load, checked against stored baselines
+
+Run from backend/:
+
+    python -m benchmarks.suite                    # report only
+    python -m benchmarks.suite --check            # exit 1 on regression against baselines.json
+    python -m benchmarks.suite --save-baseline    # record this run as the new baseline
+
+A throwaway SQLite file is seeded at the requested scale (users, societies,
+events, likes, comments). Each scenario then runs with --concurrency
+clients through the Flask test client (in-process, no socket) and through
+werkzeug's threaded WSGI server, and reports throughput, p50/p95/p99
+latency and SQL statements per request. Statements are counted on a short
+sequential pass so concurrency does not blur the number.
+
+Latency baselines are machine-specific: save them on the machine that runs
+--check. A regression is more statements per request than the baseline, or
+a p95 above baseline * (1 + --tolerance) + 1 ms. Routes without a scenario
+are listed and also fail --check, so new endpoints get benchmarked.
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import zlib
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from werkzeug.security import generate_password_hash
+from werkzeug.serving import make_server
+from app import create_app
+from app.commands import DEFAULT_ADMIN, seed_admin
+from app.models import db, User, Society, Event, society_memberships
+from app.tokens import issue_access_token, issue_refresh_token
+from app.recommendations import recommender
+from app.trending import trending
+from benchmarks.load_test import QuietHandler
+from benchmarks.seed import seed
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+QUERY_SAMPLES = 5
+
+
+class Fixture:
+    """Seeded database plus the tokens and ids the scenarios draw from"""
+
+    def __init__(self, app, scale):
+        self.app = app
+        self.scale = scale
+        self.unique = itertools.count()
+        self.password_hash = generate_password_hash('benchmark')
+        seed(app, **scale)
+
+        with app.app_context():
+            seed_admin(**DEFAULT_ADMIN)
+            admin = User.query.filter_by(role='admin').first()
+            self.admin_token = issue_access_token(admin)
+
+            society = Society.query.order_by(Society.id).first()
+            self.society_id = society.id
+            self.society_token = issue_access_token(society.user)
+            self.society_ids = [row[0] for row in db.session.execute(db.select(Society.id))]
+
+            students = User.query.filter_by(role='student').order_by(User.id).all()
+            self.students = [(user.id, issue_access_token(user)) for user in students]
+            self.event_ids = [row[0] for row in db.session.execute(
+                db.select(Event.id).where(Event.is_published.is_(True)).order_by(Event.id)
+            )]
+            self.hot_event_id = db.session.execute(
+                db.select(Event.id).order_by(Event.comments_count.desc()).limit(1)
+            ).scalar()
+
+            # Every student is an approved member of the first society, for the member listing
+            db.session.execute(society_memberships.insert(), [
+                {'society_id': self.society_id, 'user_id': user_id, 'status': 'approved', 'created_at': datetime.utcnow(),
+                 'approved_at': datetime.utcnow()}
+                for user_id, _ in self.students
+            ])
+            Society.repair_member_counts()
+            # What the refresh_trending and refresh_recommendations jobs would have built by now
+            trending.refresh()
+            recommender.refresh()
+            db.session.commit()
+
+    def pick(self, items, i):
+        return items[i % len(items)]
+
+    def refresh_tokens(self, count):
+        with self.app.app_context():
+            jtis = [issue_refresh_token(self.pick(self.students, i)[0]) for i in range(count)]
+            db.session.commit()
+        return jtis
+
+    def fresh_users(self, count):
+        """Students without a society, for the create-society scenario"""
+        with self.app.app_context():
+            now = time.time()
+            users = []
+            for _ in range(count):
+                n = next(self.unique)
+                user = User(
+                    username=f'owner{n}-{now:.0f}',
+                    email=f'owner{n}-{now:.0f}@bench.local',
+                    password_hash=self.password_hash,
+                    role='student'
+                )
+                db.session.add(user)
+                users.append(user)
+            db.session.commit()
+            return [(user.id, issue_access_token(user)) for user in users]
+
+    def pending_members(self, count, per_item=1):
+        """Join requests to the first society, per_item fresh users for each request sent"""
+        with self.app.app_context():
+            now = datetime.utcnow()
+            first = next(self.unique)
+            db.session.execute(db.insert(User), [
+                {'username': f'member{first}-{n}', 'email': f'member{first}-{n}@bench.local',
+                 'password_hash': self.password_hash, 'role': 'student', 'created_at': now, 'updated_at': now}
+                for n in range(count * per_item)
+            ])
+            user_ids = db.session.execute(
+                db.select(User.id).where(User.username.like(f'member{first}-%')).order_by(User.id)
+            ).scalars().all()
+            db.session.execute(society_memberships.insert(), [
+                {'society_id': self.society_id, 'user_id': user_id, 'status': 'pending', 'created_at': now}
+                for user_id in user_ids
+            ])
+            db.session.commit()
+            return [user_ids[n:n + per_item] for n in range(0, len(user_ids), per_item)]
+
+
+class Scenario:
+    """One route exercised by the suite
+
+    path and data may be callables taking (fixture, item); item is the
+    request's index, or its entry from prepare(fixture, count) when a
+    scenario needs one-time resources such as refresh tokens.
+    """
+
+    def __init__(self, name, method, rule, path, data=None, auth=None, expect=(200,),
+                 requests=None, prepare=None, content_type=None, stream=False):
+        self.name = name
+        self.method = method
+        self.rule = rule
+        self.path = path
+        self.data = data
+        self.auth = auth
+        self.expect = expect
+        self.requests = requests
+        self.prepare = prepare
+        self.content_type = content_type
+        self.stream = stream
+
+    def build(self, fixture, item):
+        path = self.path(fixture, item) if callable(self.path) else self.path
+        data = self.data(fixture, item) if callable(self.data) else self.data
+        headers = {}
+        if self.content_type:
+            headers['Content-Type'] = self.content_type
+        token = {
+            'admin': lambda: fixture.admin_token,
+            'society': lambda: fixture.society_token,
+            'student': lambda: fixture.pick(fixture.students, item)[1],
+            'item': lambda: item[1]
+        }[self.auth]() if self.auth else None
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        return path, data, headers
+
+
+def _bulk_body(fixture, item):
+    rows = [
+        {'title': f'Imported {item}-{n}', 'event_date': '2026-12-01', 'category': 'tech', 'venue': 'Main Hall'}
+        for n in range(100)
+    ]
+    return ''.join(json.dumps(row) + '\n' for row in rows).encode()
+
+
+def _png_body(fixture, item):
+    """A distinct 64x64 PNG per request, so every upload stores a new file"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    seed = next(fixture.unique).to_bytes(4, 'big')
+    rows = b''.join(b'\x00' + seed * 48 for _ in range(64))
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', 64, 64, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(rows))
+        + chunk(b'IEND', b'')
+    )
+
+
+SCENARIOS = [
+    Scenario('register', 'POST', '/api/register', '/api/register', requests=40, expect=(201,), data=lambda f, i: {
+        'username': f'bench{next(f.unique)}-{i}', 'email': f'bench{next(f.unique)}-{i}@bench.local', 'password': 'benchmark'
+    }),
+    Scenario('login', 'POST', '/api/login', '/api/login', requests=40, data=lambda f, i: {
+        'email': f'user{f.scale["societies"] + i % 50}@bench.local', 'password': 'benchmark'
+    }),
+    Scenario('token_refresh', 'POST', '/api/token/refresh', '/api/token/refresh',
+             prepare=Fixture.refresh_tokens, data=lambda f, jti: {'refresh_token': jti}),
+    Scenario('logout', 'POST', '/api/logout', '/api/logout',
+             prepare=Fixture.refresh_tokens, data=lambda f, jti: {'refresh_token': jti}),
+    Scenario('create_society', 'POST', '/api/societies', '/api/societies', auth='item', expect=(201,),
+             requests=50, prepare=Fixture.fresh_users, data=lambda f, item: {'name': f'Bench Society {item[0]}'}),
+    Scenario('verify_society', 'POST', '/api/societies/<int:society_id>/verify', auth='admin',
+             path=lambda f, i: f'/api/societies/{f.pick(f.society_ids, i)}/verify'),
+    Scenario('list_societies', 'GET', '/api/societies', '/api/societies?limit=50'),
+    Scenario('get_society', 'GET', '/api/societies/<int:society_id>',
+             lambda f, i: f'/api/societies/{f.pick(f.society_ids, i)}'),
+    Scenario('create_event', 'POST', '/api/events', '/api/events', auth='society', expect=(201,), data=lambda f, i: {
+        'society_id': f.society_id, 'title': f'Bench event {i}', 'event_date': '2026-12-01', 'category': 'tech'
+    }),
+    Scenario('bulk_import', 'POST', '/api/events/bulk', '/api/events/bulk?format=ndjson', auth='society',
+             expect=(201,), requests=20, data=_bulk_body, content_type='application/x-ndjson'),
+    Scenario('upload_media', 'POST', '/api/media', '/api/media', auth='society', expect=(201,), requests=50,
+             data=_png_body, content_type='image/png'),
+    Scenario('event_poster', 'POST', '/api/events/<int:event_id>/poster', auth='admin', requests=50,
+             path=lambda f, i: f'/api/events/{f.pick(f.event_ids, i)}/poster', data=_png_body, content_type='image/png'),
+    Scenario('export', 'GET', '/api/events/export', '/api/events/export?format=ndjson', auth='admin', requests=20),
+    Scenario('list_events', 'GET', '/api/events', '/api/events?limit=20'),
+    Scenario('list_events_detail', 'GET', '/api/events', '/api/events?limit=20&view=detail'),
+    Scenario('list_events_upcoming', 'GET', '/api/events', '/api/events?limit=20&status=upcoming&category=tech'),
+    Scenario('calendar', 'GET', '/api/events/calendar.ics',
+             lambda f, i: f'/api/events/calendar.ics?society_id={f.pick(f.society_ids, i)}&status=upcoming'),
+    Scenario('search', 'GET', '/api/events/search', '/api/events/search?q=robotics%20music'),
+    Scenario('trending', 'GET', '/api/events/trending', '/api/events/trending'),
+    Scenario('get_event', 'GET', '/api/events/<int:event_id>', lambda f, i: f'/api/events/{f.pick(f.event_ids, i)}'),
+    Scenario('like', 'POST', '/api/events/<int:event_id>/like', auth='student',
+             path=lambda f, i: f'/api/events/{f.pick(f.event_ids, i * 7)}/like'),
+    Scenario('recommendations', 'GET', '/api/users/<int:user_id>/recommendations', auth='student',
+             path=lambda f, i: f'/api/users/{f.pick(f.students, i)[0]}/recommendations'),
+    Scenario('follow_society', 'POST', '/api/societies/<int:society_id>/follow', auth='student', expect=(200, 201),
+             path=lambda f, i: f'/api/societies/{f.pick(f.society_ids, i)}/follow'),
+    Scenario('unfollow_society', 'DELETE', '/api/societies/<int:society_id>/follow', auth='student',
+             path=lambda f, i: f'/api/societies/{f.pick(f.society_ids, i)}/follow'),
+    Scenario('follow_category', 'POST', '/api/categories/<category>/follow', auth='student', expect=(200, 201),
+             path=lambda f, i: f"/api/categories/{('tech', 'music', 'sports')[i % 3]}/follow"),
+    Scenario('unfollow_category', 'DELETE', '/api/categories/<category>/follow', auth='student',
+             path=lambda f, i: f"/api/categories/{('tech', 'music', 'sports')[i % 3]}/follow"),
+    Scenario('user_follows', 'GET', '/api/users/<int:user_id>/follows', auth='student',
+             path=lambda f, i: f'/api/users/{f.pick(f.students, i)[0]}/follows'),
+    Scenario('join_society', 'POST', '/api/societies/<int:society_id>/membership', auth='student',
+             expect=(200, 201), path=lambda f, i: f'/api/societies/{f.pick(f.society_ids, i + 1)}/membership'),
+    Scenario('leave_society', 'DELETE', '/api/societies/<int:society_id>/membership', auth='student',
+             path=lambda f, i: f'/api/societies/{f.pick(f.society_ids, i + 1)}/membership'),
+    Scenario('society_members', 'GET', '/api/societies/<int:society_id>/members',
+             lambda f, i: f'/api/societies/{f.society_id}/members?limit=50'),
+    Scenario('approve_member', 'POST', '/api/societies/<int:society_id>/members/<int:user_id>/approve',
+             auth='society', prepare=Fixture.pending_members,
+             path=lambda f, item: f'/api/societies/{f.society_id}/members/{item[0]}/approve'),
+    Scenario('remove_member', 'DELETE', '/api/societies/<int:society_id>/members/<int:user_id>',
+             auth='society', prepare=Fixture.pending_members,
+             path=lambda f, item: f'/api/societies/{f.society_id}/members/{item[0]}'),
+    Scenario('review_memberships', 'POST', '/api/memberships/review', '/api/memberships/review', auth='admin',
+             requests=20, prepare=lambda f, count: f.pending_members(count, per_item=500),
+             content_type='application/json', data=lambda f, item: json.dumps({
+                 'decision': 'approve', 'requests': [{'society_id': f.society_id, 'user_id': user_id} for user_id in item]
+             }).encode()),
+    Scenario('stream', 'GET', '/api/stream', '/api/stream', stream=True),
+    Scenario('add_comment', 'POST', '/api/events/<int:event_id>/comments', auth='student', expect=(201,),
+             path=lambda f, i: f'/api/events/{f.pick(f.event_ids, i)}/comments',
+             data=lambda f, i: {'content': f'Benchmark comment {i}'}),
+    Scenario('get_comments', 'GET', '/api/events/<int:event_id>/comments',
+             lambda f, i: f'/api/events/{f.hot_event_id}/comments?limit=20')
+]
+
+
+def uncovered_routes(app):
+    covered = {(scenario.rule, scenario.method) for scenario in SCENARIOS}
+    missing = []
+    for rule in app.url_map.iter_rules():
+        if not rule.rule.startswith('/api/'):
+            continue
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            if (rule.rule, method) not in covered:
+                missing.append(f'{method} {rule.rule}')
+    return missing
+
+
+def test_client_sender(app):
+    local = threading.local()
+
+    def send(method, path, data, headers, stream):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        response = local.client.open(path, method=method, data=data, headers=headers, buffered=not stream)
+        if stream:
+            next(iter(response.response))
+        else:
+            response.get_data()
+        response.close()
+        return response.status_code
+
+    return send
+
+
+def wsgi_sender(base_url):
+    def send(method, path, data, headers, stream):
+        if isinstance(data, dict):
+            data = urllib.parse.urlencode(data).encode()
+        request = urllib.request.Request(base_url + path, data=data, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.readline() if stream else response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            e.read()
+            return e.code
+
+    return send
+
+
+def count_queries(fixture, scenario):
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+
+    items = scenario.prepare(fixture, QUERY_SAMPLES) if scenario.prepare else range(QUERY_SAMPLES)
+    send = test_client_sender(fixture.app)
+    requests = [scenario.build(fixture, item) for item in items]
+    event.listen(Engine, 'before_cursor_execute', count)
+    try:
+        for path, data, headers in requests:
+            send(scenario.method, path, data, headers, scenario.stream)
+    finally:
+        event.remove(Engine, 'before_cursor_execute', count)
+    return statements[0] / QUERY_SAMPLES
+
+
+def run_scenario(fixture, scenario, send, total, concurrency):
+    total = min(total, scenario.requests or total)
+    items = scenario.prepare(fixture, total) if scenario.prepare else range(total)
+    requests = [scenario.build(fixture, item) for item in items]
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def client():
+        local, failed = [], 0
+        for i in iter(lambda: next(counter), None):
+            if i >= total:
+                break
+            path, data, headers = requests[i]
+            started = time.perf_counter()
+            try:
+                status = send(scenario.method, path, data, headers, scenario.stream)
+            except Exception:
+                status = None
+            local.append(time.perf_counter() - started)
+            if status not in scenario.expect:
+                failed += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'requests': total,
+        'rps': round(total / elapsed, 1),
+        'p50_ms': round(cuts[49] * 1000, 2),
+        'p95_ms': round(cuts[94] * 1000, 2),
+        'p99_ms': round(cuts[98] * 1000, 2),
+        'errors': errors[0]
+    }
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if result['queries'] > previous['queries'] + 0.5:
+            regressions.append(f"{key}: {result['queries']} queries/request, baseline {previous['queries']}")
+        limit = previous['p95_ms'] * (1 + tolerance) + 1
+        if result['p95_ms'] > limit:
+            regressions.append(f"{key}: p95 {result['p95_ms']} ms, baseline {previous['p95_ms']} ms (limit {limit:.2f})")
+        if result['errors'] > previous.get('errors', 0):
+            regressions.append(f"{key}: {result['errors']} unexpected statuses")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--societies', type=int, default=50)
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--likes', type=int, default=20000)
+    parser.add_argument('--comments', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=200, help='requests per scenario and client')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--clients', default='test,wsgi')
+    parser.add_argument('--only', help='comma-separated scenario names')
+    parser.add_argument('--cache', default='none', help="CACHE_BACKEND for the run ('none' measures the handlers)")
+    parser.add_argument('--instrumentation', action='store_true', help='run with INSTRUMENTATION_ENABLED to gauge its overhead')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.5)
+    parser.add_argument('--check', action='store_true')
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix='unievent-bench-')
+    app = create_app({
+        'SECRET_KEY': 'benchmark',
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(tmpdir, 'bench.db'),
+        'CACHE_BACKEND': args.cache,
+        'VIEW_FLUSH_INTERVAL': 0,
+        'SSE_HEARTBEAT_INTERVAL': 1,
+        'MEDIA_DIR': os.path.join(tmpdir, 'media'),
+        # Measure the request path only; queued follow-up jobs are left unrun
+        'JOBS_WORKER_THREADS': 0,
+        'MAIL_TRANSPORT': 'memory',
+        'INSTRUMENTATION_ENABLED': args.instrumentation
+    })
+    scale = {
+        'users': args.users, 'societies': args.societies, 'events': args.events,
+        'likes': args.likes, 'comments': args.comments
+    }
+    started = time.perf_counter()
+    fixture = Fixture(app, scale)
+    print(f'Seeded {scale} in {time.perf_counter() - started:.1f}s')
+
+    scenarios = SCENARIOS
+    if args.only:
+        wanted = set(args.only.split(','))
+        scenarios = [scenario for scenario in SCENARIOS if scenario.name in wanted]
+
+    server = None
+    senders = {}
+    for client in args.clients.split(','):
+        if client == 'test':
+            senders[client] = test_client_sender(app)
+        elif client == 'wsgi':
+            server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            senders[client] = wsgi_sender(f'http://127.0.0.1:{server.server_port}')
+        else:
+            parser.error(f'unknown client {client!r}')
+
+    queries = {scenario.name: count_queries(fixture, scenario) for scenario in scenarios}
+
+    results = {}
+    print(f'{args.concurrency} concurrent clients, up to {args.requests} requests per scenario')
+    print(f'{"scenario":<28} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"q/req":>6} {"errors":>6}')
+    for client, send in senders.items():
+        for scenario in scenarios:
+            result = run_scenario(fixture, scenario, send, args.requests, args.concurrency)
+            result['queries'] = queries[scenario.name]
+            key = f'{client}/{scenario.name}'
+            results[key] = result
+            print(f"{key:<28} {result['rps']:>8} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+                  f"{result['p99_ms']:>8} {result['queries']:>6} {result['errors']:>6}")
+    if server is not None:
+        server.shutdown()
+
+    missing = uncovered_routes(app)
+    if missing:
+        print('Routes without a scenario: ' + ', '.join(missing))
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'scale': scale, 'concurrency': args.concurrency, 'results': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'Baseline written to {args.baseline}')
+
+    if args.check:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != scale or baseline.get('concurrency') != args.concurrency:
+            print('Warning: baseline was recorded with a different scale or concurrency')
+        regressions = compare(results, baseline['results'], args.tolerance)
+        regressions += [f'no scenario for {route}' for route in missing]
+        if regressions:
+            print('Regressions:')
+            for line in regressions:
+                print('  ' + line)
+            sys.exit(1)
+        print('No regressions against baseline')
+
+
+if __name__ == '__main__':
+    main()
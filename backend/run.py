@@ -1,10 +1,27 @@
+import os
 from app import create_app
-
-app = create_app()
+from app.jobs import jobs
 
 if __name__ == '__main__':
+    # Development convenience (debug mode, so a throwaway SECRET_KEY is used if none is set);
+    # deployments export SECRET_KEY and run `flask init-db` and `flask seed-admin` once instead
+    app = create_app({'DEBUG': True})
+    from app.commands import init_db, seed_admin, DEFAULT_ADMIN
+    with app.app_context():
+        init_db()
+        if seed_admin(**DEFAULT_ADMIN):
+            print("✅ Default admin created!")
+            print(f"📧 Email: {DEFAULT_ADMIN['email']}")
+            print(f"🔑 Password: {DEFAULT_ADMIN['password']}")
+        print("Database ready!")
+    # One in-process job worker, in the reloader's serving child only
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        jobs.start(app, threads=max(1, app.config['JOBS_WORKER_THREADS']))
     app.run(debug=True, port=5000)
 
+# Nothing else runs on import: `flask --app run <command>` calls create_app itself (no job workers, see
+# wsgi.py and run-worker), and the password-hashing pool's spawned workers re-import this file
+
 
 ## Step 4: Update requirements.txt
 
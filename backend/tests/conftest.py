@@ -0,0 +1,96 @@
+import os
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from app.commands import init_db
+from app.models import db, Event, Society, User
+from app.tokens import issue_access_token
+
+
+@pytest.fixture
+def app_config():
+    """Config a test module adds on top of the defaults below; override the fixture to change it"""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'test.db'),
+        'MEDIA_DIR': str(tmp_path / 'media'),
+        'JOBS_WORKER_THREADS': 0,
+        'VIEW_FLUSH_INTERVAL': 0,
+        'MAIL_TRANSPORT': 'memory',
+        'PASSWORD_HASH_WORKERS': 0,
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+        **app_config
+    })
+    with app.app_context():
+        init_db()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user, returning (id, access token)"""
+    def make_user(username, role='student'):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.com', role=role)
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+            return user.id, issue_access_token(user)
+    return make_user
+
+
+@pytest.fixture
+def society(app, make_user):
+    """A verified society and its owner, returning (society id, owner's access token)"""
+    owner_id, token = make_user('owner', role='society')
+    with app.app_context():
+        society = Society(user_id=owner_id, name='Robotics', is_verified=True)
+        db.session.add(society)
+        db.session.commit()
+        return society.id, token
+
+
+@pytest.fixture
+def seeded_event(app, society):
+    """One upcoming published event of the society, returning its id"""
+    with app.app_context():
+        event = Event(society_id=society[0], title='Demo', description='d', event_date=datetime(2030, 1, 1))
+        db.session.add(event)
+        db.session.commit()
+        return event.id
+
+
+@pytest.fixture
+def capture_sql():
+    """Context manager collecting the SQL statements executed inside it"""
+    @contextmanager
+    def capture_sql():
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sa_event.listen(Engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            sa_event.remove(Engine, 'before_cursor_execute', record)
+    return capture_sql
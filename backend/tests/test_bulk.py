@@ -0,0 +1,39 @@
+import json
+
+from app.models import db, Event
+
+
+def ndjson(*rows):
+    return '\n'.join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+
+def test_import_reports_bad_rows_and_keeps_the_good_ones(app, client, society):
+    society_id, token = society
+    body = ndjson(
+        {'title': 5, 'event_date': '2031-01-01', 'venue': 12},
+        {'title': {'en': 'Object'}, 'event_date': '2031-01-01'},
+        {'title': 'No date'},
+        {'title': 'Bad date', 'event_date': 'next friday'},
+        '{not json',
+        {'title': 'Hackathon', 'event_date': '2031-01-02', 'start_time': '10:00'}
+    )
+    response = client.post('/api/events/bulk', data=body, content_type='application/x-ndjson',
+                           headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 201
+    report = response.get_json()
+    assert report['imported'] == 2
+    assert [error['row'] for error in report['errors']] == [2, 3, 4, 5]
+    assert report['errors'][0]['error'] == 'title must be text'
+    with app.app_context():
+        rows = db.session.execute(
+            db.select(Event.title, Event.venue, Event.society_id).order_by(Event.id)
+        ).all()
+    assert [tuple(row) for row in rows] == [('5', '12', society_id), ('Hackathon', '', society_id)]
+
+
+def test_import_with_no_valid_rows_is_rejected(client, society):
+    response = client.post('/api/events/bulk', data=ndjson({'title': 'No date'}), content_type='application/x-ndjson',
+                           headers={'Authorization': f'Bearer {society[1]}'})
+    assert response.status_code == 400
+    assert response.get_json() == {'imported': 0, 'error_count': 1, 'errors': [{'row': 1, 'error': 'event_date is required'}]}
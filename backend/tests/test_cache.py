@@ -0,0 +1,59 @@
+import fnmatch
+
+import pytest
+
+from app.cache import RedisBackend, response_cache
+
+
+class FakeRedis:
+    """The slice of redis.Redis the backend uses, with its byte-string storage"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+
+    def incr(self, key):
+        value = int(self.data.get(key, b'0')) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+    def scan_iter(self, pattern):
+        return [key for key in list(self.data) if fnmatch.fnmatch(key, pattern)]
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+
+def test_redis_backend_serves_cached_responses_across_invalidation(app, client):
+    response_cache.backend = RedisBackend(None, client=FakeRedis())
+
+    first = client.get('/api/societies')
+    assert first.status_code == 200
+    assert client.get('/api/societies').status_code == 200
+
+    response_cache.invalidate('societies')
+    assert response_cache.backend.generation('tag:societies') == 1
+
+    after = client.get('/api/societies')
+    assert after.status_code == 200
+    assert after.get_json() == first.get_json()
+
+
+@pytest.mark.parametrize('app_config', [{'VIEW_FLUSH_THRESHOLD': 1}])
+def test_view_flush_only_drops_responses_that_carry_view_count(client, seeded_event):
+    generation = response_cache._generation('events')
+    summary = client.get('/api/events').get_json()
+    detail = client.get('/api/events?view=detail').get_json()
+    assert detail[0]['view_count'] == 0
+
+    # The threshold of 1 flushes this view inline
+    client.get(f'/api/events/{seeded_event}')
+    assert response_cache._generation('events') == generation
+    assert client.get('/api/events').get_json() == summary
+    assert client.get('/api/events?view=detail').get_json()[0]['view_count'] == 1
+    assert client.get(f'/api/events/{seeded_event}').get_json()['view_count'] == 1
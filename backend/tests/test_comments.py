@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import db, Comment
+
+
+@pytest.fixture
+def app_config():
+    return {'CACHE_BACKEND': 'none'}
+
+
+def test_comments_page_newest_first_with_a_cursor(app, client, seeded_event, make_user):
+    user_id, _ = make_user('alice')
+    start = datetime(2029, 1, 1)
+    with app.app_context():
+        # Two comments share a timestamp so the id breaks the tie
+        db.session.add_all([
+            Comment(user_id=user_id, event_id=seeded_event, content=f'c{n}', created_at=start + timedelta(minutes=min(n, 3)))
+            for n in range(5)
+        ])
+        db.session.commit()
+
+    seen = []
+    path = f'/api/events/{seeded_event}/comments?limit=2'
+    cursor = None
+    while True:
+        response = client.get(path + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page) <= 2
+        seen += [comment['content'] for comment in page]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert seen == ['c4', 'c3', 'c2', 'c1', 'c0']
+
+
+def test_bad_comment_cursor_is_400(client, seeded_event):
+    assert client.get(f'/api/events/{seeded_event}/comments?cursor=nope').status_code == 400
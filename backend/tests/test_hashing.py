@@ -0,0 +1,31 @@
+import concurrent.futures
+
+from werkzeug.security import generate_password_hash
+
+from app.hashing import PasswordHasher
+from app.models import User
+
+
+def test_pool_calibrates_needs_rehash_without_forking(app):
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_METHOD='pbkdf2:sha256:1000')
+    hasher = PasswordHasher(app)
+    try:
+        assert not hasher.needs_rehash(hasher.hash('secret'))
+        assert hasher.needs_rehash(generate_password_hash('secret', 'pbkdf2:sha256:2000'))
+        assert hasher._executor._mp_context.get_start_method() != 'fork'
+    finally:
+        hasher._executor.shutdown()
+
+
+def test_pool_timeout_is_503_with_retry_after(client, make_user, monkeypatch):
+    make_user('alice')
+
+    def timed_out(self, password):
+        raise concurrent.futures.TimeoutError()
+
+    monkeypatch.setattr(User, 'check_password', timed_out)
+    monkeypatch.setattr(User, 'set_password', timed_out)
+    login = client.post('/api/login', data={'email': 'alice@example.com', 'password': 'secret'})
+    assert login.status_code == 503 and login.headers['Retry-After']
+    register = client.post('/api/register', data={'username': 'bob', 'email': 'bob@example.com', 'password': 'x'})
+    assert register.status_code == 503 and register.headers['Retry-After']
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from app.ical import _fold
+from app.models import db, Event
+
+
+def test_calendar_feed_escapes_and_folds(app, client, society):
+    with app.app_context():
+        db.session.add(Event(
+            society_id=society[0], title='Talks; demos, and ' + 'x' * 80, description='line one\nline two',
+            event_date=datetime(2030, 1, 1, 18, 0)
+        ))
+        db.session.commit()
+
+    response = client.get('/api/events/calendar.ics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/calendar'
+    body = response.get_data(as_text=True)
+    assert body.startswith('BEGIN:VCALENDAR\r\n') and body.endswith('END:VCALENDAR\r\n')
+    assert all(len(line.encode('utf-8')) <= 75 for line in body.split('\r\n'))
+
+    unfolded = body.replace('\r\n ', '')
+    assert 'SUMMARY:Talks\\; demos\\, and ' + 'x' * 80 + '\r\n' in unfolded
+    assert 'DESCRIPTION:line one\\nline two\r\n' in unfolded
+    assert 'DTSTART:20300101T180000Z\r\n' in unfolded
+    assert 'DTEND:20300101T200000Z\r\n' in unfolded
+
+
+def test_fold_never_splits_a_multibyte_character():
+    folded = _fold('SUMMARY:' + 'é' * 60)
+    parts = folded.rstrip('\r\n').split('\r\n ')
+    assert len(parts) > 1
+    assert ''.join(parts) == 'SUMMARY:' + 'é' * 60
@@ -0,0 +1,42 @@
+import pytest
+
+from app import create_app
+
+
+@pytest.mark.parametrize('app_config', [{'INSTRUMENTATION_ENABLED': True, 'CACHE_BACKEND': 'none'}])
+def test_server_timing_leaves_out_sql_text(client):
+    header = client.get('/api/societies').headers['Server-Timing']
+    assert 'sql1;dur=' in header
+    assert 'SELECT' not in header.upper()
+
+
+@pytest.mark.parametrize('app_config', [{'INSTRUMENTATION_ENABLED': True, 'CACHE_BACKEND': 'none', 'DEBUG': True}])
+def test_server_timing_shows_sql_text_in_debug_mode(client):
+    assert 'SELECT' in client.get('/api/societies').headers['Server-Timing'].upper()
+
+
+@pytest.mark.parametrize('app_config', [{'INSTRUMENTATION_ENABLED': True, 'CACHE_BACKEND': 'none'}])
+def test_metrics_are_admin_only(client, make_user):
+    _, student = make_user('alice')
+    _, admin = make_user('root', role='admin')
+    client.get('/api/societies')
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': f'Bearer {student}'}).status_code == 403
+    metrics = client.get('/metrics', headers={'Authorization': f'Bearer {admin}'})
+    assert metrics.status_code == 200
+    assert 'unievent_request_duration_seconds_count{method="GET",route="/api/societies"} 1' in metrics.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('app_config', [{'INSTRUMENTATION_ENABLED': True, 'CACHE_BACKEND': 'none'}])
+def test_a_later_app_does_not_change_this_apps_settings(app, client, tmp_path):
+    create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + str(tmp_path / 'other.db'),
+        'JOBS_WORKER_THREADS': 0,
+        'VIEW_FLUSH_INTERVAL': 0,
+        'DEBUG': True
+    })
+    header = client.get('/api/societies').headers['Server-Timing']
+    assert 'serialize;dur=' in header
+    assert 'SELECT' not in header.upper()
@@ -0,0 +1,31 @@
+import pytest
+
+from app.models import db, Event
+
+
+@pytest.fixture
+def app_config():
+    return {'CACHE_BACKEND': 'none'}
+
+
+def test_like_toggles_and_keeps_the_counter_in_step(app, client, seeded_event, make_user):
+    _, alice = make_user('alice')
+    _, bob = make_user('bob')
+    path = f'/api/events/{seeded_event}/like'
+
+    liked = client.post(path, headers={'Authorization': f'Bearer {alice}'})
+    assert liked.status_code == 200
+    assert liked.get_json() == {'message': 'Event liked', 'likes_count': 1}
+    assert client.post(path, headers={'Authorization': f'Bearer {bob}'}).get_json()['likes_count'] == 2
+
+    unliked = client.post(path, headers={'Authorization': f'Bearer {alice}'})
+    assert unliked.get_json() == {'message': 'Event unliked', 'likes_count': 1}
+    with app.app_context():
+        assert db.session.get(Event, seeded_event).likes_count == 1
+    assert client.get(f'/api/events/{seeded_event}').get_json()['likes_count'] == 1
+
+
+def test_like_of_a_missing_event_is_404(client, make_user):
+    _, token = make_user('alice')
+    response = client.post('/api/events/999/like', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 404
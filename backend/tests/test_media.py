@@ -0,0 +1,36 @@
+import io
+import os
+
+import pytest
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\0' * 32
+
+
+@pytest.fixture
+def app_config():
+    return {'CACHE_BACKEND': 'none'}
+
+
+def stored_files(app):
+    root = app.config['MEDIA_DIR']
+    return [name for _, _, names in os.walk(root) for name in names] if os.path.isdir(root) else []
+
+
+def test_failed_event_create_leaves_no_poster_behind(app, client, society):
+    society_id, token = society
+    form = {'society_id': str(society_id), 'title': 'Demo', 'event_date': 'next friday'}
+    response = client.post(
+        '/api/events', data={**form, 'poster': (io.BytesIO(PNG), 'poster.png')},
+        headers={'Authorization': f'Bearer {token}'}, content_type='multipart/form-data'
+    )
+    assert response.status_code == 400
+    assert stored_files(app) == []
+
+    form['event_date'] = '2030-01-01'
+    created = client.post(
+        '/api/events', data={**form, 'poster': (io.BytesIO(PNG), 'poster.png')},
+        headers={'Authorization': f'Bearer {token}'}, content_type='multipart/form-data'
+    )
+    assert created.status_code == 201
+    assert len(stored_files(app)) == 1
+    assert client.get(created.get_json()['event']['poster']).data == PNG
@@ -0,0 +1,47 @@
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {'CACHE_BACKEND': 'none'}
+
+
+def test_join_request_waits_for_the_owner(client, society, make_user):
+    society_id, owner = society
+    student_id, student = make_user('alice')
+    auth = {'Authorization': f'Bearer {student}'}
+
+    requested = client.post(f'/api/societies/{society_id}/membership', headers=auth)
+    assert requested.status_code == 201 and requested.get_json() == {'status': 'pending'}
+    assert client.post(f'/api/societies/{society_id}/membership', headers=auth).status_code == 200
+    assert client.get(f'/api/societies/{society_id}/members').get_json() == []
+    assert client.get(f'/api/societies/{society_id}/members?status=pending', headers=auth).status_code == 403
+
+    approved = client.post(
+        f'/api/societies/{society_id}/members/{student_id}/approve', headers={'Authorization': f'Bearer {owner}'}
+    )
+    assert approved.get_json() == {'status': 'approved', 'member_count': 1}
+    assert [member['id'] for member in client.get(f'/api/societies/{society_id}/members').get_json()] == [student_id]
+
+    left = client.delete(f'/api/societies/{society_id}/membership', headers=auth)
+    assert left.get_json() == {'status': None, 'removed': True}
+    assert client.get(f'/api/societies/{society_id}').get_json()['member_count'] == 0
+
+
+def test_follows_are_listed_for_their_owner_only(client, society, make_user):
+    society_id, _ = society
+    alice_id, alice = make_user('alice')
+    _, bob = make_user('bob')
+    auth = {'Authorization': f'Bearer {alice}'}
+
+    assert client.post(f'/api/societies/{society_id}/follow', headers=auth).status_code == 201
+    assert client.post(f'/api/societies/{society_id}/follow', headers=auth).status_code == 200
+    assert client.post('/api/categories/Tech/follow', headers=auth).get_json() == {'following': True, 'category': 'tech'}
+    assert client.get(f'/api/users/{alice_id}/follows', headers=auth).get_json() == {
+        'societies': [{'id': society_id, 'name': 'Robotics'}],
+        'categories': ['tech']
+    }
+    assert client.get(f'/api/users/{alice_id}/follows', headers={'Authorization': f'Bearer {bob}'}).status_code == 403
+
+    assert client.delete(f'/api/societies/{society_id}/follow', headers=auth).get_json()['removed']
+    assert client.get(f'/api/users/{alice_id}/follows', headers=auth).get_json()['societies'] == []
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import db, Event, user_likes_events
+from app.recommendations import recommender
+
+
+@pytest.fixture
+def app_config():
+    return {'CACHE_BACKEND': 'none'}
+
+
+@pytest.fixture
+def likes(app, society, make_user):
+    """Three events; s0 and s1 like events 0 and 1, s2 likes only event 0. Returns (s2's id, event ids)"""
+    students = [make_user(f's{n}')[0] for n in range(3)]
+    with app.app_context():
+        events = [
+            Event(society_id=society[0], title=f'Event {n}', description='d', event_date=datetime(2030, 1, n + 1))
+            for n in range(3)
+        ]
+        db.session.add_all(events)
+        db.session.flush()
+        for user, event in [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0)]:
+            Event.toggle_like(students[user], events[event].id)
+        db.session.commit()
+        return students[2], [event.id for event in events]
+
+
+def test_requests_fall_back_until_the_job_computed_neighbors(app, likes, capture_sql):
+    student, events = likes
+    with app.app_context():
+        with capture_sql() as statements:
+            picks = recommender.recommend(student, limit=1)
+        # Popular fallback, and no co-like self-join on the request path
+        assert picks == [(events[1], 0.0)]
+        assert not any(f"JOIN {user_likes_events.name}" in statement for statement in statements)
+        assert all(statement.lstrip().upper().startswith('SELECT') for statement in statements)
+
+        assert recommender.refresh() == 2
+        db.session.commit()
+        assert not db.session.execute(db.select(Event.id).where(Event.like_changes > 0)).all()
+        recommender.note_like_change(student, events[0])
+        (event_id, score), = recommender.recommend(student, limit=1)
+        assert event_id == events[1] and score == pytest.approx(2 / 6 ** 0.5)
+
+
+def test_unlike_marks_the_event_for_the_next_refresh(app, likes):
+    student, events = likes
+    with app.app_context():
+        recommender.refresh()
+        db.session.commit()
+        Event.toggle_like(student, events[0])
+        db.session.commit()
+        assert db.session.get(Event, events[0]).like_changes == 1
+        # Past the window overlap no like is recent, so only the counter selects the event
+        assert recommender.refresh(since=datetime.utcnow() + timedelta(hours=1)) == 1
+
+
+def test_changes_during_a_refresh_are_kept(app, likes, monkeypatch):
+    student, events = likes
+    compute = recommender._compute_neighbors
+
+    def compute_with_a_concurrent_unlike(event_ids):
+        Event.toggle_like(student, events[0])
+        return compute(event_ids)
+
+    with app.app_context():
+        monkeypatch.setattr(recommender, '_compute_neighbors', compute_with_a_concurrent_unlike)
+        recommender.refresh()
+        db.session.commit()
+        assert db.session.get(Event, events[0]).like_changes == 1
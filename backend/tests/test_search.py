@@ -0,0 +1,17 @@
+from datetime import datetime
+
+from app.jobs import jobs
+from app.models import db, Event
+
+
+def test_search_cache_dropped_when_the_index_job_commits(app, client, society):
+    with app.app_context():
+        db.session.add(Event(society_id=society[0], title='Drone racing', description='d', event_date=datetime(2030, 1, 1)))
+        db.session.commit()
+
+    # Served (and cached) before the index job ran
+    assert client.get('/api/events/search?q=drone').get_json() == []
+
+    with app.app_context():
+        jobs.work(burst=True)
+    assert [event['title'] for event in client.get('/api/events/search?q=drone').get_json()] == ['Drone racing']
@@ -0,0 +1,14 @@
+import pytest
+
+from app import create_app
+
+
+def test_create_app_refuses_to_start_without_secret_key(monkeypatch):
+    monkeypatch.delenv('FLASK_DEBUG', raising=False)
+    with pytest.raises(RuntimeError, match='SECRET_KEY'):
+        create_app({'SECRET_KEY': None, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'JOBS_WORKER_THREADS': 0})
+
+
+def test_testing_app_gets_a_random_secret_key(app):
+    assert app.config['SECRET_KEY']
+    assert app.config['SECRET_KEY'] != 'your-secret-key-here'
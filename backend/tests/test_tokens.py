@@ -0,0 +1,47 @@
+from app.models import db, RefreshToken, User
+from app.tokens import issue_access_token, issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+
+
+def test_new_role_token_accepted_while_another_worker_cached_the_old_role(app, client, make_user):
+    user_id, old_token = make_user('student')
+    path = f'/api/users/{user_id}/recommendations'
+    assert client.get(path, headers={'Authorization': f'Bearer {old_token}'}).status_code == 200
+
+    # The role changes in another process, so this process's cache entry is not invalidated
+    with app.app_context():
+        user = db.session.get(User, user_id)
+        user.role = 'society'
+        db.session.commit()
+        new_token = issue_access_token(user)
+
+    assert client.get(path, headers={'Authorization': f'Bearer {new_token}'}).status_code == 200
+    assert client.get(path, headers={'Authorization': f'Bearer {old_token}'}).status_code == 401
+
+
+def test_refresh_token_is_single_use_and_reuse_revokes_the_family(client, make_user):
+    make_user('alice')
+    login = client.post('/api/login', data={'email': 'alice@example.com', 'password': 'secret'}).get_json()
+
+    rotated = client.post('/api/token/refresh', data={'refresh_token': login['refresh_token']})
+    assert rotated.status_code == 200
+    successor = rotated.get_json()['refresh_token']
+    assert successor != login['refresh_token']
+
+    # Replaying the spent token is refused and takes its successor down with it
+    assert client.post('/api/token/refresh', data={'refresh_token': login['refresh_token']}).status_code == 401
+    assert client.post('/api/token/refresh', data={'refresh_token': successor}).status_code == 401
+
+
+def test_refresh_token_spent_by_a_concurrent_request_issues_nothing(app, make_user, monkeypatch):
+    user_id, _ = make_user('alice')
+    with app.app_context():
+        jti = issue_refresh_token(user_id)
+        db.session.commit()
+        # The other request revoked the token after this one found it usable
+        revoke_refresh_token(jti)
+        db.session.commit()
+        monkeypatch.setattr(RefreshToken, 'is_usable', lambda self: True)
+
+        assert rotate_refresh_token(jti) is None
+        db.session.commit()
+        assert db.session.execute(db.select(db.func.count()).select_from(RefreshToken)).scalar() == 1
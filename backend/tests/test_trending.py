@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from app.jobs import jobs
+from app.models import db, Event, Job
+from app.view_counter import view_counter
+
+
+@pytest.fixture
+def app_config():
+    return {'VIEW_FLUSH_THRESHOLD': 1, 'CACHE_BACKEND': 'none'}
+
+
+def test_trending_get_only_reads(app, client, seeded_event, capture_sql):
+    assert client.get(f'/api/events/{seeded_event}').status_code == 200
+    with app.app_context():
+        assert db.session.get(Event, seeded_event).trending_views == 1
+
+    with capture_sql() as statements:
+        response = client.get('/api/events/trending')
+    assert response.status_code == 200
+    assert response.get_json() == []
+    assert all(statement.lstrip().upper().startswith('SELECT') for statement in statements)
+
+
+def test_refresh_job_folds_views_and_reschedules(app, client, seeded_event):
+    client.get(f'/api/events/{seeded_event}')
+    with app.app_context():
+        # init-db queued the first refresh; running it queues the next one
+        jobs.work(burst=True)
+        assert db.session.get(Event, seeded_event).trending_views == 0
+        pending = db.session.execute(db.select(Job).where(Job.name == 'refresh_trending')).scalars().all()
+        assert [job.status for job in pending] == ['pending']
+        assert pending[0].run_at > datetime.utcnow()
+
+    ranked = client.get('/api/events/trending').get_json()
+    assert [event['id'] for event in ranked] == [seeded_event]
+    assert ranked[0]['trending_score'] == pytest.approx(0.2)
+    with app.app_context():
+        assert view_counter.flush() == 0
+
+
+@pytest.mark.parametrize('app_config', [{'VIEW_FLUSH_THRESHOLD': 1, 'CACHE_BACKEND': 'memory'}])
+def test_cached_ranking_is_replaced_by_the_next_refresh(app, client, seeded_event, capture_sql):
+    assert client.get('/api/events/trending').get_json() == []
+    client.get(f'/api/events/{seeded_event}')
+    with capture_sql() as statements:
+        assert client.get('/api/events/trending').get_json() == []
+    assert statements == []
+
+    with app.app_context():
+        jobs.work(burst=True)
+    assert [event['id'] for event in client.get('/api/events/trending').get_json()] == [seeded_event]
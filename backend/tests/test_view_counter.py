@@ -0,0 +1,26 @@
+import sqlite3
+
+import pytest
+
+from app.models import db, Event
+from app.view_counter import view_counter
+
+
+@pytest.fixture
+def app_config():
+    return {'SQLITE_BUSY_TIMEOUT_MS': 50, 'VIEW_FLUSH_THRESHOLD': 1, 'CACHE_BACKEND': 'none'}
+
+
+def test_failed_threshold_flush_keeps_views_and_the_response(app, client, seeded_event, tmp_path):
+    locker = sqlite3.connect(str(tmp_path / 'test.db'))
+    locker.execute('BEGIN EXCLUSIVE')
+    try:
+        assert client.get(f'/api/events/{seeded_event}').status_code == 200
+        assert view_counter._state(app).pending == {seeded_event: 1}
+    finally:
+        locker.rollback()
+        locker.close()
+
+    assert client.get(f'/api/events/{seeded_event}').status_code == 200
+    with app.app_context():
+        assert db.session.get(Event, seeded_event).view_count == 2
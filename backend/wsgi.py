@@ -0,0 +1,10 @@
+"""WSGI entry point for production servers, e.g. `gunicorn wsgi:app` (without --preload)
+
+Each server process starts JOBS_WORKER_THREADS job workers. Leave it at 0
+to process jobs in a separate `flask --app run run-worker` instead.
+"""
+from app import create_app
+from app.jobs import jobs
+
+app = create_app()
+jobs.start(app)
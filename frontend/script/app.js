@@ -154,4 +154,35 @@ function toggleModal(id) {
         // Wait for transition to finish before hiding
         setTimeout(() => modal.classList.add('hidden'), 300);
     }
-}
\ No newline at end of file
+}
+
+// --- 7. Trending Events (ranked server-side) ---
+// Titles, venues and society names are user input, so escape them before they reach innerHTML
+function escapeHtml(value) {
+    return String(value ?? '').replace(/[&<>"']/g, ch => ({
+        '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+    })[ch]);
+}
+
+async function loadTrending() {
+    const section = document.getElementById('trending');
+    const grid = document.getElementById('trendingGrid');
+    if (!section || !grid) return;
+    try {
+        const response = await fetch('http://localhost:5000/api/events/trending?limit=6');
+        const events = await response.json();
+        if (!response.ok || events.length === 0) return;
+        grid.innerHTML = events.map(e => `
+            <div class="card-shadow bg-white rounded-[2rem] p-8 border border-slate-100">
+                <span class="bg-indigo-50 text-indigo-600 px-3 py-1 rounded-full text-xs font-bold uppercase tracking-wider">${escapeHtml(e.organizer?.name)}</span>
+                <h3 class="text-2xl font-bold mt-4">${escapeHtml(e.title)}</h3>
+                <p class="text-slate-500 font-medium mt-1 italic">${escapeHtml(e.venue)} • ${new Date(e.event_date).toLocaleDateString()}</p>
+                <p class="text-slate-400 text-xs font-bold mt-4"><i class="fa-solid fa-fire mr-1"></i>${e.likes_count} interested</p>
+            </div>`).join('');
+        section.classList.remove('hidden');
+    } catch (error) {
+        console.error('Error loading trending events:', error);
+    }
+}
+
+window.addEventListener('load', loadTrending);
@@ -0,0 +1,30 @@
+// Shared auth helpers: attaches the access token and transparently rotates it once on 401
+const API_BASE = 'http://localhost:5000';
+
+async function refreshTokens() {
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (!refreshToken) return false;
+    const formData = new FormData();
+    formData.append('refresh_token', refreshToken);
+    const response = await fetch(`${API_BASE}/api/token/refresh`, { method: 'POST', body: formData });
+    if (!response.ok) return false;
+    storeTokens(await response.json());
+    return true;
+}
+
+function storeTokens(data) {
+    if (data.access_token) localStorage.setItem('access_token', data.access_token);
+    if (data.refresh_token) localStorage.setItem('refresh_token', data.refresh_token);
+}
+
+async function authFetch(url, options = {}) {
+    const withAuth = () => ({
+        ...options,
+        headers: { ...(options.headers || {}), 'Authorization': `Bearer ${localStorage.getItem('access_token') || ''}` }
+    });
+    let response = await fetch(url, withAuth());
+    if (response.status === 401 && await refreshTokens()) {
+        response = await fetch(url, withAuth());
+    }
+    return response;
+}
@@ -61,8 +61,7 @@ function showSection(sectionId) {
 // 5. Society Management (Admin only)
 async function loadSocieties() {
     try {
-        const response = await fetch('http://localhost:5000/api/societies');
-        dbSocieties = await response.json();
+        dbSocieties = await fetchAllPages('http://localhost:5000/api/societies?limit=200');
         renderSocieties();
     } catch (error) {
         console.error('Error loading societies:', error);
@@ -76,11 +75,11 @@ function renderSocieties() {
         return;
     }
     list.innerHTML = dbSocieties.map(s => `
-        <tr class="border-b border-slate-50 hover:bg-slate-50 transition">
+        <tr class="border-b border-slate-50 hover:bg-slate-50 transition" data-society-id="${s.id}">
             <td class="py-6">
                 <div><p class="font-bold text-slate-800">${s.name}</p><p class="text-xs text-slate-400">${s.email || 'No email'}</p></div>
             </td>
-            <td class="py-6">${s.member_count} Members</td>
+            <td class="py-6"><span data-counter="member_count">${s.member_count}</span> Members</td>
             <td class="py-6"><span class="px-3 py-1 ${s.is_verified ? 'bg-emerald-100 text-emerald-600' : 'bg-yellow-100 text-yellow-600'} rounded-full text-[10px] font-black uppercase">${s.is_verified ? '✓ Verified' : '⏳ Pending'}</span></td>
             <td class="py-6 text-right">
                 ${!s.is_verified ? `<button onclick="approve(${s.id})" class="px-5 py-2 bg-indigo-600 text-white rounded-xl text-xs font-bold shadow-md">Approve</button>` : '<span class="text-slate-300">Approved ✓</span>'}
@@ -91,24 +90,36 @@ function renderSocieties() {
 async function approve(id) {
     if (!confirm('Approve this society?')) return;
     try {
-        const response = await fetch(`http://localhost:5000/api/societies/${id}/verify`, { method: 'POST' });
+        const response = await authFetch(`http://localhost:5000/api/societies/${id}/verify`, { method: 'POST' });
         if (response.ok) { alert('Verified!'); loadSocieties(); }
     } catch (error) { console.error(error); }
 }
 
+// Follows X-Next-Cursor until the paginated list endpoint is exhausted
+async function fetchAllPages(url) {
+    let items = [];
+    let cursor = null;
+    do {
+        const sep = url.includes('?') ? '&' : '?';
+        const response = await fetch(cursor ? `${url}${sep}cursor=${encodeURIComponent(cursor)}` : url);
+        items = items.concat(await response.json());
+        cursor = response.headers.get('X-Next-Cursor');
+    } while (cursor);
+    return items;
+}
+
 // 6. Event Management (Society/Admin)
 async function renderEvents() {
     const list = document.getElementById('events-section');
     list.innerHTML = '<p class="text-slate-400">Loading events...</p>';
     try {
-        const response = await fetch('http://localhost:5000/api/events');
-        const events = await response.json();
+        const events = await fetchAllPages('http://localhost:5000/api/events?limit=100');
         if (events.length === 0) {
             list.innerHTML = '<p class="text-slate-400 p-8">No active events found.</p>';
             return;
         }
         list.innerHTML = events.map(e => `
-            <div class="bg-white p-6 rounded-3xl border border-slate-100 shadow-sm">
+            <div class="bg-white p-6 rounded-3xl border border-slate-100 shadow-sm" data-event-id="${e.id}">
                 <div class="flex justify-between items-start">
                     <span class="text-[10px] font-black text-indigo-500 uppercase">${e.category || 'Event'}</span>
                     <span class="text-[10px] font-bold text-slate-400">${e.organizer?.name || ''}</span>
@@ -118,6 +129,8 @@ async function renderEvents() {
                 <div class="mt-4 pt-4 border-t border-slate-50 flex flex-col gap-1">
                     <p class="text-slate-400 text-xs"><i class="fa-solid fa-location-dot mr-2"></i>${e.venue}</p>
                     <p class="text-slate-400 text-xs"><i class="fa-solid fa-calendar mr-2"></i>${new Date(e.event_date).toLocaleDateString()}</p>
+                    <p class="text-slate-400 text-xs"><i class="fa-solid fa-heart mr-2"></i><span data-counter="likes_count">${e.likes_count}</span>
+                        <i class="fa-solid fa-comment ml-4 mr-2"></i><span data-counter="comments_count">${e.comments_count}</span></p>
                 </div>
             </div>`).join('');
     } catch (error) { list.innerHTML = '<p class="text-red-400">Failed to load events.</p>'; }
@@ -141,7 +154,7 @@ async function publishEvent() {
     formData.append('google_form_link', document.getElementById('db-form').value);
 
     try {
-        const response = await fetch('http://localhost:5000/api/events', { method: 'POST', body: formData });
+        const response = await authFetch('http://localhost:5000/api/events', { method: 'POST', body: formData });
         if (response.ok) {
             showStatus("🎉 Event Created Successfully!", "indigo");
             document.querySelectorAll('#create-event-section input, #create-event-section textarea').forEach(i => i.value = "");
@@ -165,4 +178,42 @@ function showStatus(msg, color) {
     statusDiv.innerText = msg;
     statusDiv.style.display = 'block';
     setTimeout(() => { statusDiv.style.display = 'none'; }, 4000);
-}
\ No newline at end of file
+}
+// 7. Live updates: counter changes are patched into the rendered cards in place; only new
+// or removed entities (or a bulk import) refetch the list, at most once per second
+const changeStream = new EventSource('http://localhost:5000/api/stream?entities=society,event,event_batch');
+const counterVersions = {};
+const refetchTimers = {};
+
+function refetchSoon(name, load) {
+    clearTimeout(refetchTimers[name]);
+    refetchTimers[name] = setTimeout(load, 1000);
+}
+
+// Returns false when the entity is not on screen, i.e. the list itself changed
+function patchCounters(selector, change) {
+    const row = document.querySelector(selector);
+    if (!row) return false;
+    const key = `${change.entity}:${change.id}`;
+    if (counterVersions[key] > change.version) return true; // an older delta arrived late
+    counterVersions[key] = change.version;
+    let patched = false;
+    for (const [name, value] of Object.entries(change.counters || {})) {
+        const cell = row.querySelector(`[data-counter="${name}"]`);
+        if (cell) { cell.textContent = value; patched = true; }
+    }
+    return patched;
+}
+
+changeStream.addEventListener('change', (e) => {
+    const change = JSON.parse(e.data);
+    const visible = (id) => !document.getElementById(id).classList.contains('hidden');
+    if (change.entity === 'society' && visible('societies-section')) {
+        if (!patchCounters(`[data-society-id="${change.id}"]`, change)) refetchSoon('societies', loadSocieties);
+    }
+    if (change.entity !== 'society' && visible('events-section')) {
+        if (change.entity === 'event_batch' || !patchCounters(`[data-event-id="${change.id}"]`, change)) {
+            refetchSoon('events', renderEvents);
+        }
+    }
+});
@@ -44,6 +44,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
             if (response.ok) {
                 localStorage.setItem('user', JSON.stringify(data.user));
+                storeTokens(data);
                 setTimeout(() => { window.location.href = '/app'; }, 1000);
             } else {
                 alert(data.error || 'Login Error');
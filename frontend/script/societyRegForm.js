@@ -72,10 +72,8 @@ document.addEventListener('DOMContentLoaded', () => {
         btn.style.pointerEvents = "none";
 
         const formData = new FormData(form);
-        formData.append('user_id', user.id);
-        
         try {
-            const response = await fetch('http://localhost:5000/api/societies', {
+            const response = await authFetch('http://localhost:5000/api/societies', {
                 method: 'POST',
                 body: formData
             });
@@ -90,6 +88,7 @@ document.addEventListener('DOMContentLoaded', () => {
                 user.role = 'society';
                 user.society = data.society;
                 localStorage.setItem('user', JSON.stringify(user));
+                storeTokens(data);
                 
                 setTimeout(() => {
                     alert("Boom! Registration complete. Welcome to the Network.");